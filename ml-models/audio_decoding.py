@@ -0,0 +1,201 @@
+"""
+Streaming decode of uploaded audio for the speech endpoints
+Accepts WAV, FLAC, Ogg (Vorbis/Opus) and WebM/Opus, decodes in fixed-size
+blocks, resamples them to the training rate and folds each block into the MFCC
+features, so a request never holds the full decoded PCM in memory
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import threading
+import wave
+import logging
+
+import numpy as np
+import librosa
+import soundfile as sf
+import soxr
+
+logger = logging.getLogger(__name__)
+
+BLOCK_FRAMES = 16384
+MAX_AUDIO_SECONDS = float(os.environ.get('ISL_MAX_AUDIO_SECONDS', '60'))
+N_FFT = 2048
+HOP_LENGTH = 512
+
+AUDIO_SIGNATURES = {
+    b'RIFF': 'wav',
+    b'fLaC': 'flac',
+    b'OggS': 'ogg',
+    b'\x1aE\xdf\xa3': 'webm'
+}
+
+def sniff_audio_format(data):
+    """Container format from the leading bytes, or None"""
+    return AUDIO_SIGNATURES.get(bytes(data[:4]))
+
+# ==== Decoders ==== #
+
+def wav_blocks(data, block_frames=BLOCK_FRAMES):
+    """(sample_rate, iterator of mono float32 blocks) for 16-bit PCM WAV"""
+    wav_file = wave.open(io.BytesIO(data), 'rb')
+    if wav_file.getsampwidth() != 2:
+        raise ValueError("Only 16-bit PCM WAV is supported")
+    channels = wav_file.getnchannels()
+
+    def blocks():
+        with wav_file:
+            while True:
+                frames = wav_file.readframes(block_frames)
+                if not frames:
+                    return
+                samples = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+                yield samples.reshape(-1, channels).mean(axis=1)
+    return wav_file.getframerate(), blocks()
+
+def soundfile_blocks(data, block_frames=BLOCK_FRAMES):
+    """(sample_rate, iterator of mono float32 blocks) for formats libsndfile decodes"""
+    sound_file = sf.SoundFile(io.BytesIO(data))
+
+    def blocks():
+        with sound_file:
+            for block in sound_file.blocks(blocksize=block_frames, dtype='float32', always_2d=True):
+                yield block.mean(axis=1)
+    return sound_file.samplerate, blocks()
+
+def ffmpeg_blocks(data, sample_rate, block_frames=BLOCK_FRAMES):
+    """(sample_rate, iterator of mono float32 blocks) decoded by an ffmpeg subprocess
+
+    Used for WebM (which libsndfile cannot read) and as a fallback for Ogg/Opus
+    on older libsndfile builds. The upload is fed to stdin from a thread while
+    PCM is read back one block at a time.
+    """
+    if shutil.which('ffmpeg') is None:
+        raise ValueError("ffmpeg is required to decode this audio format")
+    process = subprocess.Popen(
+        ['ffmpeg', '-loglevel', 'error', '-i', 'pipe:0', '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+
+    def feed():
+        try:
+            process.stdin.write(data)
+        except BrokenPipeError:
+            pass
+        finally:
+            process.stdin.close()
+
+    def blocks():
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        try:
+            while True:
+                chunk = process.stdout.read(block_frames * 2)
+                if not chunk:
+                    break
+                yield np.frombuffer(chunk[:len(chunk) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768.0
+        finally:
+            process.stdout.close()
+            process.kill()
+            process.wait()
+            writer.join()
+        if process.returncode not in (0, -9):
+            raise ValueError("ffmpeg could not decode the audio")
+    return sample_rate, blocks()
+
+def resample_blocks(blocks, source_rate, target_rate):
+    """Resample a block stream with soxr's streaming resampler
+
+    Uses the same soxr high-quality filter as ``librosa.load(sr=...)`` does in
+    training, so features do not depend on the upload's native rate.
+    """
+    if source_rate == target_rate:
+        yield from blocks
+        return
+    resampler = soxr.ResampleStream(source_rate, target_rate, 1, dtype='float32', quality='HQ')
+    for block in blocks:
+        resampled = resampler.resample_chunk(np.ascontiguousarray(block, dtype=np.float32))
+        if len(resampled):
+            yield resampled
+    tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+    if len(tail):
+        yield tail
+
+def decode_audio_blocks(data, sample_rate=16000, block_frames=BLOCK_FRAMES):
+    """Iterator of mono float32 blocks at ``sample_rate`` for an uploaded audio file"""
+    audio_format = sniff_audio_format(data)
+    if audio_format == 'wav':
+        source_rate, blocks = wav_blocks(data, block_frames)
+    elif audio_format in ('flac', 'ogg'):
+        try:
+            source_rate, blocks = soundfile_blocks(data, block_frames)
+        except RuntimeError as e:
+            if audio_format == 'flac':
+                raise ValueError(f"Could not decode FLAC audio: {e}")
+            logger.debug(f"libsndfile could not open {audio_format} audio ({e}), trying ffmpeg")
+            source_rate, blocks = ffmpeg_blocks(data, sample_rate, block_frames)
+    elif audio_format == 'webm':
+        source_rate, blocks = ffmpeg_blocks(data, sample_rate, block_frames)
+    else:
+        raise ValueError("Unsupported audio format (expected WAV, FLAC, Ogg or WebM)")
+    return resample_blocks(blocks, source_rate, sample_rate)
+
+# ==== Features ==== #
+
+class StreamingMFCC:
+    """Mean MFCCs of a signal fed block by block
+
+    Frames the concatenated signal exactly as ``librosa.feature.mfcc`` does on
+    the whole array (centered, zero-padded), keeping only the samples that
+    overlap the next frame between blocks. Mel power frames are accumulated and
+    converted to decibels at the end, so the result matches the batch path.
+    """
+
+    def __init__(self, sample_rate, n_mfcc=13, n_fft=N_FFT, hop_length=HOP_LENGTH,
+                 max_seconds=MAX_AUDIO_SECONDS):
+        self.sample_rate = sample_rate
+        self.n_mfcc = n_mfcc
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.max_samples = int(max_seconds * sample_rate)
+        self.samples = 0
+        self.pending = np.zeros(n_fft // 2, dtype=np.float32)  # centered framing pads the start
+        self.mel_frames = []
+
+    def update(self, block):
+        self.samples += len(block)
+        if self.samples > self.max_samples:
+            raise ValueError(f"Audio longer than {self.max_samples / self.sample_rate:.0f} seconds")
+        self.pending = np.concatenate([self.pending, block])
+        self.consume()
+
+    def consume(self):
+        """Compute mel power for every complete frame in the pending samples"""
+        if len(self.pending) < self.n_fft:
+            return
+        frames = 1 + (len(self.pending) - self.n_fft) // self.hop_length
+        span = (frames - 1) * self.hop_length + self.n_fft
+        self.mel_frames.append(librosa.feature.melspectrogram(
+            y=self.pending[:span], sr=self.sample_rate, n_fft=self.n_fft,
+            hop_length=self.hop_length, center=False
+        ))
+        self.pending = self.pending[frames * self.hop_length:]
+
+    def finish(self):
+        """Mean MFCC vector over all frames"""
+        if self.samples == 0:
+            raise ValueError("Audio contains no samples")
+        self.pending = np.concatenate([self.pending, np.zeros(self.n_fft // 2, dtype=np.float32)])
+        self.consume()
+        mel = np.concatenate(self.mel_frames, axis=1)
+        mfccs = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=self.n_mfcc)
+        return np.mean(mfccs.T, axis=0)
+
+def extract_streaming_mfcc(data, n_mfcc=13, sample_rate=16000):
+    """Mean MFCC features of an uploaded audio file, decoded block by block at ``sample_rate``"""
+    features = StreamingMFCC(sample_rate, n_mfcc)
+    for block in decode_audio_blocks(data, sample_rate):
+        features.update(block)
+    return features.finish()
@@ -0,0 +1,321 @@
+"""
+Data augmentation engine for ISL training data
+Pluggable text, audio and landmark transforms run across a process pool with
+deterministic per-sample seeds, streaming outputs into sharded directories
+"""
+
+import copy
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import logging
+
+import numpy as np
+
+from text_normalization import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AUGMENTATION_CONFIG = {
+    'seed': 42,
+    'workers': None,
+    'num_shards': 16,
+    'text': {
+        'copies': 2,
+        'transforms': {
+            'synonym': {'probability': 0.5},
+            'case': {},
+            'punctuation': {}
+        }
+    },
+    'audio': {
+        'copies': 3,
+        'sample_rate': 16000,
+        'transforms': {
+            'gain': {'db': [-6.0, 6.0]},
+            'time_stretch': {'rate': [0.9, 1.1]},
+            'pitch_shift': {'steps': [-2.0, 2.0]},
+            'noise': {'snr_db': [10.0, 30.0]}
+        }
+    },
+    'landmarks': {
+        'copies': 3,
+        'transforms': {
+            'scale': {'range': [0.9, 1.1]},
+            'jitter': {'sigma': 0.005},
+            'mirror': {'probability': 0.5}
+        }
+    }
+}
+
+TRANSFORMS = {'text': {}, 'audio': {}, 'landmarks': {}}
+
+# Landmark frames: 2 hands x 21 points x (x, y, z)
+HANDS = 2
+HAND_POINTS = 21
+
+def register_transform(modality, name):
+    """Register an augmentation transform for a modality"""
+    def decorator(func):
+        TRANSFORMS[modality][name] = func
+        return func
+    return decorator
+
+def stable_int(value):
+    """Process-independent 64-bit hash (unlike the salted built-in hash)"""
+    return int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+
+def sample_rng(seed, key, copy_index):
+    """Deterministic RNG for one augmented copy of one sample"""
+    return np.random.default_rng([seed, stable_int(key), copy_index])
+
+def uniform(rng, bounds):
+    """Draw from a [low, high] range"""
+    return rng.uniform(bounds[0], bounds[1])
+
+# ==== Text transforms ==== #
+
+@register_transform('text', 'case')
+def text_case(text, rng, params, context):
+    return [text.upper(), text.lower(), text.title()][rng.integers(3)]
+
+@register_transform('text', 'punctuation')
+def text_punctuation(text, rng, params, context):
+    return text + ['.', '!', '?', ','][rng.integers(4)]
+
+@register_transform('text', 'synonym')
+def text_synonym(text, rng, params, context):
+    """Swap known phrases for another phrase with the same sign"""
+    synonyms = context.get('synonyms', {})
+    tokens = tokenize(text)
+    output = []
+    position = 0
+    while position < len(tokens):
+        replaced = False
+        for length in range(min(context.get('max_ngram', 1), len(tokens) - position), 0, -1):
+            phrase = ' '.join(tokens[position:position + length])
+            alternatives = synonyms.get(phrase)
+            if alternatives and rng.random() < params.get('probability', 0.5):
+                output.append(alternatives[rng.integers(len(alternatives))])
+                position += length
+                replaced = True
+                break
+        if not replaced:
+            output.append(tokens[position])
+            position += 1
+    return ' '.join(output)
+
+def build_synonym_table(vocabulary):
+    """Map each normalized phrase to the other phrases of the same sign
+
+    Phrases listed under more than one sign are left out, so a swap can never
+    change the meaning of a sample.
+    """
+    signs_per_phrase = {}
+    for sign, variations in vocabulary.items():
+        for variation in variations:
+            signs_per_phrase.setdefault(' '.join(tokenize(variation)), set()).add(sign)
+    unambiguous = {phrase for phrase, signs in signs_per_phrase.items() if len(signs) == 1}
+
+    synonyms = {}
+    for variations in vocabulary.values():
+        normalized = [' '.join(tokenize(v)) for v in variations]
+        normalized = [v for v in normalized if v in unambiguous]
+        for phrase in normalized:
+            alternatives = [v for v in normalized if v != phrase]
+            if alternatives:
+                synonyms[phrase] = alternatives
+    max_ngram = max((len(p.split()) for p in synonyms), default=1)
+    return {'synonyms': synonyms, 'max_ngram': max_ngram}
+
+# ==== Audio transforms ==== #
+
+@register_transform('audio', 'gain')
+def audio_gain(audio, rng, params, context):
+    return audio * (10.0 ** (uniform(rng, params['db']) / 20.0))
+
+@register_transform('audio', 'time_stretch')
+def audio_time_stretch(audio, rng, params, context):
+    import librosa
+    return librosa.effects.time_stretch(audio, rate=uniform(rng, params['rate']))
+
+@register_transform('audio', 'pitch_shift')
+def audio_pitch_shift(audio, rng, params, context):
+    import librosa
+    return librosa.effects.pitch_shift(audio, sr=context['sample_rate'], n_steps=uniform(rng, params['steps']))
+
+@register_transform('audio', 'noise')
+def audio_noise(audio, rng, params, context):
+    """Add white noise at a target signal-to-noise ratio"""
+    signal_power = np.mean(audio ** 2) + 1e-12
+    noise_power = signal_power / (10.0 ** (uniform(rng, params['snr_db']) / 10.0))
+    return audio + rng.standard_normal(audio.shape).astype(audio.dtype) * np.sqrt(noise_power)
+
+# ==== Landmark transforms ==== #
+
+def as_hands(landmarks):
+    """View (frames, 126) landmarks as (frames, hands, points, xyz)"""
+    return landmarks.reshape(len(landmarks), HANDS, HAND_POINTS, 3)
+
+def present_hands(hands):
+    """Mask of hands that were detected (all-zero hands are padding)"""
+    return np.any(hands != 0, axis=(2, 3), keepdims=True)
+
+@register_transform('landmarks', 'scale')
+def landmarks_scale(landmarks, rng, params, context):
+    """Scale each hand about its wrist"""
+    hands = as_hands(landmarks)
+    wrist = hands[:, :, :1, :]
+    scaled = wrist + (hands - wrist) * uniform(rng, params['range'])
+    return np.where(present_hands(hands), scaled, 0.0).reshape(landmarks.shape)
+
+@register_transform('landmarks', 'jitter')
+def landmarks_jitter(landmarks, rng, params, context):
+    hands = as_hands(landmarks)
+    noise = rng.normal(0.0, params['sigma'], size=hands.shape)
+    return np.where(present_hands(hands), hands + noise, 0.0).reshape(landmarks.shape)
+
+@register_transform('landmarks', 'mirror')
+def landmarks_mirror(landmarks, rng, params, context):
+    """Flip horizontally (normalized x -> 1 - x) and swap the hand slots"""
+    if rng.random() >= params.get('probability', 0.5):
+        return landmarks
+    hands = as_hands(landmarks).copy()
+    mask = present_hands(hands)[..., 0]
+    hands[..., 0] = np.where(mask, 1.0 - hands[..., 0], 0.0)
+    return hands[:, ::-1].reshape(landmarks.shape)
+
+# ==== Workers ==== #
+
+def apply_transforms(data, modality, rng, config, context):
+    """Apply the configured transforms of a modality in order"""
+    for name, params in config[modality]['transforms'].items():
+        data = TRANSFORMS[modality][name](data, rng, params, context)
+    return data
+
+def shard_dir(output_dir, key, num_shards):
+    """Deterministic shard directory for a source sample"""
+    path = Path(output_dir) / f"aug-shard-{stable_int(key) % num_shards:03d}"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def augment_text_chunk(samples, output_path, config, context):
+    """Worker: write augmented copies of a chunk of (text, sign) samples to a shard file
+
+    Shard files are named by chunk position and content, so a chunk that is
+    already done is skipped.
+    """
+    output_path = Path(output_path)
+    if output_path.exists():
+        return 0
+    lines = []
+    for text, sign in samples:
+        for copy_index in range(config['text']['copies']):
+            rng = sample_rng(config['seed'], f"{text}\t{sign}", copy_index)
+            lines.append(f"{apply_transforms(text, 'text', rng, config, context)}\t{sign}\n")
+    tmp_path = output_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    os.replace(tmp_path, output_path)
+    return len(lines)
+
+def read_text_shard(path):
+    """Yield the (text, sign) samples of a text shard file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            text, sign = line.rstrip('\n').split('\t')
+            yield text, sign
+
+def augment_audio_file(audio_path, output_dir, config):
+    """Worker: write augmented copies of one WAV file into its shard (skips done files)"""
+    import librosa
+    import soundfile as sf
+
+    audio_path = Path(audio_path)
+    target = shard_dir(output_dir, audio_path.name, config['num_shards'])
+    outputs = [target / f"{audio_path.stem}-aug{i}.wav" for i in range(config['audio']['copies'])]
+    if all(path.exists() for path in outputs):
+        return 0
+
+    sample_rate = config['audio']['sample_rate']
+    audio, _ = librosa.load(str(audio_path), sr=sample_rate)
+    context = {'sample_rate': sample_rate}
+
+    for copy_index, output_path in enumerate(outputs):
+        rng = sample_rng(config['seed'], audio_path.name, copy_index)
+        augmented = apply_transforms(audio.astype(np.float32), 'audio', rng, config, context)
+        sf.write(str(output_path), np.clip(augmented, -1.0, 1.0), sample_rate, subtype='PCM_16')
+    return len(outputs)
+
+def augment_landmark_file(landmark_path, output_dir, config):
+    """Worker: write augmented copies of one (frames, 126) landmark .npy file"""
+    landmark_path = Path(landmark_path)
+    target = shard_dir(output_dir, landmark_path.name, config['num_shards'])
+    outputs = [target / f"{landmark_path.stem}-aug{i}.npy" for i in range(config['landmarks']['copies'])]
+    if all(path.exists() for path in outputs):
+        return 0
+
+    landmarks = np.load(landmark_path).astype(np.float32)
+    for copy_index, output_path in enumerate(outputs):
+        rng = sample_rng(config['seed'], landmark_path.name, copy_index)
+        augmented = apply_transforms(landmarks, 'landmarks', rng, config, {})
+        np.save(output_path, augmented.astype(np.float32))
+    return len(outputs)
+
+class AugmentationEngine:
+    """Run configured augmentations over text, audio and landmark data"""
+
+    def __init__(self, config=None, workers=None):
+        # Modality sections are merged key by key, so {'audio': {'copies': 2}}
+        # keeps the default audio transforms
+        self.config = copy.deepcopy(DEFAULT_AUGMENTATION_CONFIG)
+        for key, value in (config or {}).items():
+            if key in TRANSFORMS and isinstance(value, dict):
+                self.config[key].update(value)
+            else:
+                self.config[key] = value
+        self.workers = workers or self.config.get('workers') or os.cpu_count() or 1
+
+        for modality in TRANSFORMS:
+            unknown = set(self.config[modality]['transforms']) - set(TRANSFORMS[modality])
+            if unknown:
+                raise ValueError(f"Unknown {modality} transforms: {sorted(unknown)}")
+
+    def map_jobs(self, func, jobs):
+        """Run jobs inline or across the process pool, preserving order"""
+        if self.workers == 1 or len(jobs) <= 1:
+            return [func(*job) for job in jobs]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(func, *zip(*jobs)))
+
+    def augment_text(self, samples, vocabulary, output_dir, chunk_size=2048):
+        """Write augmented (text, sign) samples into sharded subdirectories of output_dir
+
+        Synonyms come from the sign vocabulary. Returns the shard files, in
+        input order; read them back with ``read_text_shard``.
+        """
+        context = build_synonym_table(vocabulary)
+        jobs = []
+        for start in range(0, len(samples), chunk_size):
+            chunk = samples[start:start + chunk_size]
+            key = stable_int(f"{start}\n" + ''.join(f"{text}\t{sign}\n" for text, sign in chunk))
+            path = shard_dir(output_dir, key, self.config['num_shards']) / f"text-{key:016x}.txt"
+            jobs.append((chunk, str(path), self.config, context))
+        written = sum(self.map_jobs(augment_text_chunk, jobs))
+        logger.info(f"Wrote {written} augmented text samples from {len(samples)} samples")
+        return [Path(job[1]) for job in jobs]
+
+    def augment_audio(self, audio_files, output_dir):
+        """Write augmented WAV copies into sharded subdirectories of output_dir"""
+        jobs = [(str(path), str(output_dir), self.config) for path in audio_files]
+        written = sum(self.map_jobs(augment_audio_file, jobs))
+        logger.info(f"Wrote {written} augmented audio clips from {len(jobs)} files")
+        return written
+
+    def augment_landmarks(self, landmark_files, output_dir):
+        """Write augmented landmark copies into sharded subdirectories of output_dir"""
+        jobs = [(str(path), str(output_dir), self.config) for path in landmark_files]
+        written = sum(self.map_jobs(augment_landmark_file, jobs))
+        logger.info(f"Wrote {written} augmented landmark sequences from {len(jobs)} files")
+        return written
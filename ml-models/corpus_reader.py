@@ -0,0 +1,183 @@
+"""
+Streaming reader for tab-separated text/sign corpora
+Encodes lines chunk by chunk into preallocated int32 buffers or a memory-mapped
+file, so corpora larger than RAM can be ingested without per-line Python arrays
+"""
+
+import os
+import numpy as np
+from pathlib import Path
+import logging
+
+from text_normalization import tokenize
+
+logger = logging.getLogger(__name__)
+
+class GrowableArray:
+    """Preallocated array that doubles its capacity as rows are appended"""
+
+    def __init__(self, row_shape, dtype=np.int32, capacity=1024):
+        self.data = np.zeros((capacity,) + tuple(row_shape), dtype=dtype)
+        self.size = 0
+
+    def extend(self, rows):
+        """Append a block of rows, growing the buffer if needed"""
+        needed = self.size + len(rows)
+        if needed > len(self.data):
+            capacity = len(self.data)
+            while capacity < needed:
+                capacity *= 2
+            grown = np.zeros((capacity,) + self.data.shape[1:], dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+
+        self.data[self.size:needed] = rows
+        self.size = needed
+
+    def view(self):
+        """Filled part of the buffer, without copying"""
+        return self.data[:self.size]
+
+class TextCorpusReader:
+    """Stream (token_ids, label) chunks from 'text<TAB>sign' files"""
+
+    def __init__(self, vocabulary, max_length=50, chunk_size=8192):
+        self.vocabulary = vocabulary
+        self.unk_idx = vocabulary.get('<UNK>', 0)
+        self.max_length = max_length
+        self.chunk_size = chunk_size
+        self.label_index = {}
+        self.stats = {'lines': 0, 'samples': 0, 'blank': 0, 'malformed': 0}
+
+    def label_names(self):
+        """Label names in label-ID order"""
+        names = np.empty(len(self.label_index), dtype=object)
+        for label, idx in self.label_index.items():
+            names[idx] = label
+        return names
+
+    def iter_chunks(self, files):
+        """Yield (token_ids [n, max_length] int32, label_ids [n] int32) chunks
+
+        The yielded arrays are reused for the next chunk; copy them if they
+        need to outlive the iteration step.
+        """
+        token_ids = np.zeros((self.chunk_size, self.max_length), dtype=np.int32)
+        label_ids = np.zeros(self.chunk_size, dtype=np.int32)
+        row = 0
+
+        for text_file in files:
+            with open(text_file, 'rb') as f:
+                for raw_line in f:
+                    self.stats['lines'] += 1
+                    try:
+                        line = raw_line.decode('utf-8').rstrip('\r\n')
+                    except UnicodeDecodeError:
+                        self.stats['malformed'] += 1
+                        continue
+                    if not line.strip():
+                        self.stats['blank'] += 1
+                        continue
+
+                    fields = line.split('\t')
+                    if len(fields) != 2 or not fields[0].strip() or not fields[1].strip():
+                        self.stats['malformed'] += 1
+                        continue
+
+                    text, isl_sign = fields[0], fields[1].strip()
+                    ids = [self.vocabulary.get(word, self.unk_idx) for word in tokenize(text)[:self.max_length]]
+                    token_ids[row, :len(ids)] = ids
+                    label_ids[row] = self.label_index.setdefault(isl_sign, len(self.label_index))
+                    self.stats['samples'] += 1
+                    row += 1
+
+                    if row == self.chunk_size:
+                        yield token_ids, label_ids
+                        token_ids.fill(0)
+                        row = 0
+
+        if row:
+            yield token_ids[:row], label_ids[:row]
+
+    def read(self, files, memmap_path=None):
+        """Read every file into (token_ids, label_ids)
+
+        With ``memmap_path`` token IDs are streamed to disk and returned as a
+        read-only memory map; otherwise they are kept in a growable buffer.
+        The file is replaced atomically, so maps of an earlier read stay valid.
+        """
+        labels = GrowableArray((), dtype=np.int32)
+
+        if memmap_path is None:
+            tokens = GrowableArray((self.max_length,), dtype=np.int32)
+            for token_ids, label_ids in self.iter_chunks(files):
+                tokens.extend(token_ids)
+                labels.extend(label_ids)
+            token_array = tokens.view()
+        else:
+            memmap_path = Path(memmap_path)
+            memmap_path.parent.mkdir(parents=True, exist_ok=True)
+            rows = 0
+            tmp_path = memmap_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                for token_ids, label_ids in self.iter_chunks(files):
+                    f.write(token_ids.tobytes())
+                    labels.extend(label_ids)
+                    rows += len(token_ids)
+            os.replace(tmp_path, memmap_path)
+
+            if rows:
+                token_array = np.memmap(memmap_path, dtype=np.int32, mode='r', shape=(rows, self.max_length))
+            else:
+                token_array = np.zeros((0, self.max_length), dtype=np.int32)
+
+        if self.stats['malformed']:
+            logger.warning(f"Skipped {self.stats['malformed']} malformed corpus lines")
+        logger.info(f"Read {self.stats['samples']} text samples from {self.stats['lines']} lines")
+
+        return token_array, labels.view()
+
+class RowView:
+    """Rows of an array selected by an index array, read on demand
+
+    Lets a train/validation split of a memory-mapped corpus be passed around
+    without copying it; indexing reads only the requested rows.
+    """
+
+    def __init__(self, data, rows):
+        self.data = data
+        self.rows = np.asarray(rows, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def shape(self):
+        return (len(self.rows),) + tuple(self.data.shape[1:])
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def __getitem__(self, key):
+        rows, columns = (key[0], key[1:]) if isinstance(key, tuple) else (key, ())
+        block = np.asarray(self.data[self.rows[rows]])
+        return block[(slice(None),) + columns] if columns else block
+
+def split_rows(num_rows, test_size=0.2, seed=42):
+    """Sorted (train, validation) row indices of a seeded random split"""
+    order = np.random.default_rng(seed).permutation(num_rows)
+    num_test = int(np.ceil(num_rows * test_size))
+    return np.sort(order[num_test:]), np.sort(order[:num_test])
+
+def remap_label_ids(label_ids, label_names, sign_table):
+    """Reader label IDs re-indexed into a sign table
+
+    Returns the mask of rows whose label is in the table and their indices;
+    the lookup is built over the label table, not per row.
+    """
+    class_index = {sign: idx for idx, sign in enumerate(sign_table)}
+    mapping = np.array([class_index.get(name, -1) for name in label_names], dtype=np.int32)
+    mapped = mapping[label_ids] if len(mapping) else np.zeros(len(label_ids), dtype=np.int32)
+    known = mapped >= 0
+    return known, mapped[known]
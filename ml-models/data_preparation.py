@@ -5,6 +5,8 @@ Prepares training data from various sources
 
 import os
 import json
+import hashlib
+import time
 import numpy as np
 import pandas as pd
 from pathlib import Path
@@ -16,14 +18,94 @@ import logging
 from tqdm import tqdm
 import requests
 import zipfile
+from phrase_index import PhraseIndex
+from spelling_index import build_spelling_index
+from text_normalization import normalize_text, tokenize
+from augmentation import AugmentationEngine, read_text_shard
+from sign_index import build_sign_index
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Common ISL vocabulary with Hindi/English mappings
+ISL_VOCABULARY = {
+    'hello': ['hello', 'hi', 'नमस्ते', 'हैलो'],
+    'thank_you': ['thank you', 'thanks', 'धन्यवाद', 'शुक्रिया'],
+    'please': ['please', 'कृपया', 'प्लीज'],
+    'sorry': ['sorry', 'माफ करना', 'सॉरी'],
+    'good_morning': ['good morning', 'सुप्रभात', 'गुड मॉर्निंग'],
+    'good_evening': ['good evening', 'शुभ संध्या', 'गुड इवनिंग'],
+    'yes': ['yes', 'हाँ', 'जी हाँ'],
+    'no': ['no', 'नहीं', 'ना'],
+    'help': ['help', 'मदद', 'सहायता'],
+    'water': ['water', 'पानी', 'जल'],
+    'food': ['food', 'खाना', 'भोजन'],
+    'home': ['home', 'घर', 'होम'],
+    'school': ['school', 'स्कूल', 'विद्यालय'],
+    'book': ['book', 'किताब', 'पुस्तक'],
+    'pen': ['pen', 'कलम', 'पेन'],
+    'mother': ['mother', 'mom', 'माँ', 'माता'],
+    'father': ['father', 'dad', 'पिता', 'पापा'],
+    'friend': ['friend', 'दोस्त', 'मित्र'],
+    'teacher': ['teacher', 'शिक्षक', 'टीचर'],
+    'student': ['student', 'छात्र', 'विद्यार्थी'],
+    'love': ['love', 'प्यार', 'प्रेम'],
+    'happy': ['happy', 'खुश', 'प्रसन्न'],
+    'sad': ['sad', 'दुखी', 'उदास'],
+    'beautiful': ['beautiful', 'सुंदर', 'खूबसूरत'],
+    'good': ['good', 'अच्छा', 'बढ़िया'],
+    'bad': ['bad', 'बुरा', 'खराब'],
+    'big': ['big', 'बड़ा', 'विशाल'],
+    'small': ['small', 'छोटा', 'नन्हा'],
+    'hot': ['hot', 'गर्म', 'तेज़'],
+    'cold': ['cold', 'ठंडा', 'शीत'],
+    'fast': ['fast', 'तेज़', 'जल्दी'],
+    'slow': ['slow', 'धीमा', 'आराम से'],
+    'come': ['come', 'आओ', 'आना'],
+    'go': ['go', 'जाओ', 'जाना'],
+    'sit': ['sit', 'बैठो', 'बैठना'],
+    'stand': ['stand', 'खड़े हो', 'खड़ा होना'],
+    'eat': ['eat', 'खाओ', 'खाना'],
+    'drink': ['drink', 'पीओ', 'पीना'],
+    'sleep': ['sleep', 'सोओ', 'सोना'],
+    'wake_up': ['wake up', 'जागो', 'उठना'],
+    'work': ['work', 'काम', 'कार्य'],
+    'play': ['play', 'खेलो', 'खेलना'],
+    'read': ['read', 'पढ़ो', 'पढ़ना'],
+    'write': ['write', 'लिखो', 'लिखना'],
+    'listen': ['listen', 'सुनो', 'सुनना'],
+    'speak': ['speak', 'बोलो', 'बोलना'],
+    'see': ['see', 'देखो', 'देखना'],
+    'understand': ['understand', 'समझो', 'समझना'],
+    'learn': ['learn', 'सीखो', 'सीखना'],
+    'teach': ['teach', 'सिखाओ', 'सिखाना'],
+    'money': ['money', 'पैसा', 'धन'],
+    'time': ['time', 'समय', 'वक्त'],
+    'day': ['day', 'दिन', 'दिवस'],
+    'night': ['night', 'रात', 'रात्रि'],
+    'morning': ['morning', 'सुबह', 'प्रातः'],
+    'evening': ['evening', 'शाम', 'संध्या']
+}
+
+MANIFEST_VERSION = 1
+
+# One in TEST_SPLIT_MODULUS samples goes to the test split, chosen by hash so
+# the split of existing samples never changes when new ones are appended
+TEST_SPLIT_MODULUS = 5
+
+def sample_hash(text, sign):
+    """Stable 64-bit hash of a normalized text/sign sample"""
+    key = f"{normalize_text(text)}\t{sign}".encode('utf-8')
+    return hashlib.blake2b(key, digest_size=8).hexdigest()
+
+def chain_hash(previous_hash, payload):
+    """Extend a file content hash with newly appended bytes"""
+    return hashlib.sha256((previous_hash + hashlib.sha256(payload).hexdigest()).encode('ascii')).hexdigest()
+
 class ISLDatasetBuilder:
     """Build ISL dataset from various sources"""
     
-    def __init__(self, data_dir="ml-models/data"):
+    def __init__(self, data_dir="ml-models/data", augmentation_config=None):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
@@ -42,119 +124,244 @@ class ISLDatasetBuilder:
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
+        
+        self.manifest_path = self.data_dir / "dataset_manifest.json"
+        self.hashes_path = self.data_dir / "sample_hashes.txt"
+        self.manifest = None
+        self.sample_hashes = None
+        self.augmentation_engine = AugmentationEngine(augmentation_config)
+    
+    def load_manifest(self):
+        """Load the dataset manifest, rebuilding it if files changed outside the builder"""
+        if self.manifest is not None:
+            return self.manifest
+        
+        manifest = None
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        
+        if manifest is None or not self.manifest_is_current(manifest):
+            return self.rebuild_manifest()
+        
+        self.manifest = manifest
+        return self.manifest
+    
+    def load_sample_hashes(self):
+        """Hash set of every stored sample, read on first use by the dedup path"""
+        self.load_manifest()
+        if self.sample_hashes is None:
+            with open(self.hashes_path, 'r', encoding='utf-8') as f:
+                self.sample_hashes = {int(line, 16) for line in f if line.strip()}
+        return self.sample_hashes
+    
+    def manifest_is_current(self, manifest):
+        """Cheap staleness check: file sizes only, no content reads"""
+        if manifest.get('version') != MANIFEST_VERSION or not self.hashes_path.exists():
+            return False
+        
+        text_files = {
+            str(path.relative_to(self.data_dir))
+            for split in ('train', 'test')
+            for path in (self.data_dir / split / "text_data").glob("*.txt")
+        }
+        if text_files != set(manifest['files']):
+            return False
+        
+        return all(
+            (self.data_dir / path).stat().st_size == entry['bytes']
+            for path, entry in manifest['files'].items()
+        )
+    
+    def rebuild_manifest(self):
+        """Scan existing text data once and rebuild the manifest and hash set"""
+        logger.info("Rebuilding dataset manifest from existing files...")
+        
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'files': {},
+            'augmented_offsets': {},
+            'vocabulary_size': 0,
+            'vocabulary_version': 1,
+            'signs': 0,
+            'updated_at': time.time()
+        }
+        hashes = []
+        
+        for split in ('train', 'test'):
+            for path in sorted((self.data_dir / split / "text_data").glob("*.txt")):
+                payload = path.read_bytes()
+                samples = 0
+                for line in payload.decode('utf-8').splitlines():
+                    if '\t' in line:
+                        text, sign = line.split('\t', 1)
+                        hashes.append(sample_hash(text, sign.strip()))
+                        samples += 1
+                
+                manifest['files'][str(path.relative_to(self.data_dir))] = {
+                    'samples': samples,
+                    'bytes': len(payload),
+                    'content_hash': chain_hash('', payload)
+                }
+        
+        # Existing augmentations cover every line already on disk
+        for path, entry in manifest['files'].items():
+            if path.startswith('train/') and not path.endswith('augmented_data.txt'):
+                manifest['augmented_offsets'][path] = entry['bytes']
+        
+        with open(self.hashes_path, 'w', encoding='utf-8') as f:
+            f.writelines(h + '\n' for h in hashes)
+        
+        self.sample_hashes = {int(h, 16) for h in hashes}
+        self.manifest = manifest
+        manifest['vocabulary_size'] = len(self.load_vocabulary())
+        manifest['signs'] = len(self.load_sign_mappings())
+        self.save_manifest()
+        return manifest
+    
+    def save_manifest(self):
+        """Atomically write the manifest"""
+        self.manifest['updated_at'] = time.time()
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def append_samples(self, samples, name, split=None):
+        """Append unseen (text, sign) samples to the named text data file
+
+        Samples already present (after normalization) are skipped. Without an
+        explicit split, each sample is assigned to train or test by its hash.
+        Returns the number of samples added per split.
+        """
+        manifest = self.load_manifest()
+        sample_hashes = self.load_sample_hashes()
+        lines = {'train': [], 'test': []}
+        new_hashes = []
+        
+        for text, sign in samples:
+            digest = sample_hash(text, sign)
+            value = int(digest, 16)
+            if value in sample_hashes:
+                continue
+            sample_hashes.add(value)
+            new_hashes.append(digest)
+            
+            sample_split = split or ('test' if value % TEST_SPLIT_MODULUS == 0 else 'train')
+            lines[sample_split].append(f"{text}\t{sign}\n")
+        
+        for sample_split, split_lines in lines.items():
+            if not split_lines:
+                continue
+            
+            relative_path = f"{sample_split}/text_data/{name}.txt"
+            payload = ''.join(split_lines).encode('utf-8')
+            with open(self.data_dir / relative_path, 'ab') as f:
+                f.write(payload)
+            
+            entry = manifest['files'].setdefault(
+                relative_path, {'samples': 0, 'bytes': 0, 'content_hash': ''}
+            )
+            entry['samples'] += len(split_lines)
+            entry['bytes'] += len(payload)
+            entry['content_hash'] = chain_hash(entry['content_hash'], payload)
+        
+        with open(self.hashes_path, 'a', encoding='utf-8') as f:
+            f.writelines(h + '\n' for h in new_hashes)
+        
+        return {sample_split: len(split_lines) for sample_split, split_lines in lines.items()}
+    
+    def load_vocabulary(self):
+        """Load the current vocabulary, or the reserved tokens if none exists"""
+        vocab_file = self.data_dir / "vocabulary.json"
+        if vocab_file.exists():
+            with open(vocab_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'<PAD>': 0, '<UNK>': 1}
+    
+    def update_vocabulary(self, texts):
+        """Append unseen words with new IDs; existing IDs never change"""
+        vocab = self.load_vocabulary()
+        idx = max(vocab.values()) + 1
+        added = 0
+        
+        for text in texts:
+            for word in tokenize(text):
+                if word not in vocab:
+                    vocab[word] = idx
+                    idx += 1
+                    added += 1
+        
+        manifest = self.load_manifest()
+        if added:
+            vocab_file = self.data_dir / "vocabulary.json"
+            with open(vocab_file, 'w', encoding='utf-8') as f:
+                json.dump(vocab, f, ensure_ascii=False, indent=2)
+            manifest['vocabulary_version'] = manifest.get('vocabulary_version', 0) + 1
+        
+        manifest['vocabulary_size'] = len(vocab)
+        return added
+    
+    def load_sign_mappings(self):
+        """Load current sign animation mappings"""
+        mappings_file = self.data_dir / "sign_mappings.json"
+        if mappings_file.exists():
+            with open(mappings_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+    
+    def update_sign_mappings(self, signs):
+        """Add default animations for new signs, keeping existing (possibly edited) ones"""
+        sign_mappings = self.load_sign_mappings()
+        added = 0
+        
+        for sign in signs:
+            if sign not in sign_mappings:
+                sign_mappings[sign] = self.generate_default_animation(sign)
+                added += 1
+        
+        if added:
+            mappings_file = self.data_dir / "sign_mappings.json"
+            with open(mappings_file, 'w', encoding='utf-8') as f:
+                json.dump(sign_mappings, f, indent=2)
+        
+        self.load_manifest()['signs'] = len(sign_mappings)
+        return added
     
     def create_synthetic_dataset(self):
         """Create synthetic dataset for initial training"""
         logger.info("Creating synthetic ISL dataset...")
         
-        # Common ISL vocabulary with Hindi/English mappings
-        isl_vocabulary = {
-            'hello': ['hello', 'hi', 'नमस्ते', 'हैलो'],
-            'thank_you': ['thank you', 'thanks', 'धन्यवाद', 'शुक्रिया'],
-            'please': ['please', 'कृपया', 'प्लीज'],
-            'sorry': ['sorry', 'माफ करना', 'सॉरी'],
-            'good_morning': ['good morning', 'सुप्रभात', 'गुड मॉर्निंग'],
-            'good_evening': ['good evening', 'शुभ संध्या', 'गुड इवनिंग'],
-            'yes': ['yes', 'हाँ', 'जी हाँ'],
-            'no': ['no', 'नहीं', 'ना'],
-            'help': ['help', 'मदद', 'सहायता'],
-            'water': ['water', 'पानी', 'जल'],
-            'food': ['food', 'खाना', 'भोजन'],
-            'home': ['home', 'घर', 'होम'],
-            'school': ['school', 'स्कूल', 'विद्यालय'],
-            'book': ['book', 'किताब', 'पुस्तक'],
-            'pen': ['pen', 'कलम', 'पेन'],
-            'mother': ['mother', 'mom', 'माँ', 'माता'],
-            'father': ['father', 'dad', 'पिता', 'पापा'],
-            'friend': ['friend', 'दोस्त', 'मित्र'],
-            'teacher': ['teacher', 'शिक्षक', 'टीचर'],
-            'student': ['student', 'छात्र', 'विद्यार्थी'],
-            'love': ['love', 'प्यार', 'प्रेम'],
-            'happy': ['happy', 'खुश', 'प्रसन्न'],
-            'sad': ['sad', 'दुखी', 'उदास'],
-            'beautiful': ['beautiful', 'सुंदर', 'खूबसूरत'],
-            'good': ['good', 'अच्छा', 'बढ़िया'],
-            'bad': ['bad', 'बुरा', 'खराब'],
-            'big': ['big', 'बड़ा', 'विशाल'],
-            'small': ['small', 'छोटा', 'नन्हा'],
-            'hot': ['hot', 'गर्म', 'तेज़'],
-            'cold': ['cold', 'ठंडा', 'शीत'],
-            'fast': ['fast', 'तेज़', 'जल्दी'],
-            'slow': ['slow', 'धीमा', 'आराम से'],
-            'come': ['come', 'आओ', 'आना'],
-            'go': ['go', 'जाओ', 'जाना'],
-            'sit': ['sit', 'बैठो', 'बैठना'],
-            'stand': ['stand', 'खड़े हो', 'खड़ा होना'],
-            'eat': ['eat', 'खाओ', 'खाना'],
-            'drink': ['drink', 'पीओ', 'पीना'],
-            'sleep': ['sleep', 'सोओ', 'सोना'],
-            'wake_up': ['wake up', 'जागो', 'उठना'],
-            'work': ['work', 'काम', 'कार्य'],
-            'play': ['play', 'खेलो', 'खेलना'],
-            'read': ['read', 'पढ़ो', 'पढ़ना'],
-            'write': ['write', 'लिखो', 'लिखना'],
-            'listen': ['listen', 'सुनो', 'सुनना'],
-            'speak': ['speak', 'बोलो', 'बोलना'],
-            'see': ['see', 'देखो', 'देखना'],
-            'understand': ['understand', 'समझो', 'समझना'],
-            'learn': ['learn', 'सीखो', 'सीखना'],
-            'teach': ['teach', 'सिखाओ', 'सिखाना'],
-            'money': ['money', 'पैसा', 'धन'],
-            'time': ['time', 'समय', 'वक्त'],
-            'day': ['day', 'दिन', 'दिवस'],
-            'night': ['night', 'रात', 'रात्रि'],
-            'morning': ['morning', 'सुबह', 'प्रातः'],
-            'evening': ['evening', 'शाम', 'संध्या']
-        }
+        isl_vocabulary = ISL_VOCABULARY
         
         # Generate text training data
         text_data = []
         for sign, variations in isl_vocabulary.items():
             for variation in variations:
-                text_data.append(f"{variation}\t{sign}")
-        
-        # Save text training data
-        train_text_file = self.data_dir / "train" / "text_data" / "synthetic_data.txt"
-        with open(train_text_file, 'w', encoding='utf-8') as f:
-            for line in text_data[:int(len(text_data) * 0.8)]:  # 80% for training
-                f.write(line + '\n')
-        
-        # Save text test data
-        test_text_file = self.data_dir / "test" / "text_data" / "synthetic_data.txt"
-        with open(test_text_file, 'w', encoding='utf-8') as f:
-            for line in text_data[int(len(text_data) * 0.8):]:  # 20% for testing
-                f.write(line + '\n')
-        
-        # Create vocabulary mapping
-        vocab = {'<PAD>': 0, '<UNK>': 1}
-        idx = 2
-        for sign, variations in isl_vocabulary.items():
-            for variation in variations:
-                for word in variation.split():
-                    if word.lower() not in vocab:
-                        vocab[word.lower()] = idx
-                        idx += 1
+                text_data.append((variation, sign))
         
-        vocab_file = self.data_dir / "vocabulary.json"
-        with open(vocab_file, 'w', encoding='utf-8') as f:
-            json.dump(vocab, f, ensure_ascii=False, indent=2)
+        # Append only unseen samples; hash-based split keeps ~80% for training
+        added = self.append_samples(text_data, "synthetic_data")
+        
+        # Extend vocabulary mapping without renumbering existing words
+        new_words = self.update_vocabulary(text for text, _ in text_data)
         
         # Create sign mappings for avatar generation
-        sign_mappings = {}
-        for sign in isl_vocabulary.keys():
-            sign_mappings[sign] = self.generate_default_animation(sign)
+        new_signs = self.update_sign_mappings(isl_vocabulary.keys())
         
-        mappings_file = self.data_dir / "sign_mappings.json"
-        with open(mappings_file, 'w', encoding='utf-8') as f:
-            json.dump(sign_mappings, f, indent=2)
+        self.save_manifest()
         
-        logger.info(f"Created synthetic dataset with {len(text_data)} text samples")
-        logger.info(f"Vocabulary size: {len(vocab)}")
-        logger.info(f"ISL signs: {len(isl_vocabulary)}")
+        logger.info(
+            f"Synthetic dataset: {len(text_data)} samples, "
+            f"{added['train']} new train / {added['test']} new test"
+        )
+        logger.info(f"Vocabulary size: {self.manifest['vocabulary_size']} ({new_words} new)")
+        logger.info(f"ISL signs: {self.manifest['signs']} ({new_signs} new)")
         
         return {
             'text_samples': len(text_data),
-            'vocabulary_size': len(vocab),
+            'new_samples': added['train'] + added['test'],
+            'vocabulary_size': self.manifest['vocabulary_size'],
             'isl_signs': len(isl_vocabulary)
         }
     
@@ -240,36 +447,85 @@ class ISLDatasetBuilder:
         logger.info("Applying data augmentation...")
         
         # Text augmentation - add variations and synonyms
-        augmented_data = []
+        manifest = self.load_manifest()
+        added = 0
+        generated = 0
         
-        # Read existing training data
-        train_text_file = self.data_dir / "train" / "text_data" / "synthetic_data.txt"
+        # Only lines appended since the last run need augmenting
+        source_path = "train/text_data/synthetic_data.txt"
+        train_text_file = self.data_dir / source_path
         if train_text_file.exists():
-            with open(train_text_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            offset = manifest['augmented_offsets'].get(source_path, 0)
+            with open(train_text_file, 'rb') as f:
+                f.seek(offset)
+                payload = f.read()
+            manifest['augmented_offsets'][source_path] = offset + len(payload)
             
-            for line in lines:
+            source_samples = []
+            for line in payload.decode('utf-8').splitlines():
                 if '\t' in line:
                     text, sign = line.strip().split('\t')
-                    
-                    # Add variations with different cases
-                    augmented_data.append(f"{text.upper()}\t{sign}")
-                    augmented_data.append(f"{text.lower()}\t{sign}")
-                    augmented_data.append(f"{text.title()}\t{sign}")
-                    
-                    # Add with punctuation
-                    augmented_data.append(f"{text}.\t{sign}")
-                    augmented_data.append(f"{text}!\t{sign}")
-                    augmented_data.append(f"{text}?\t{sign}")
-        
-        # Save augmented data
-        aug_file = self.data_dir / "train" / "text_data" / "augmented_data.txt"
-        with open(aug_file, 'w', encoding='utf-8') as f:
-            for line in augmented_data:
-                f.write(line + '\n')
-        
-        logger.info(f"Generated {len(augmented_data)} augmented samples")
-        return len(augmented_data)
+                    source_samples.append((text, sign))
+            
+            # Workers write shards; they are merged one at a time. Case/punctuation
+            # copies that normalize to an existing sample are dropped by
+            # append_samples; synonym swaps produce genuinely new text
+            shard_root = self.data_dir / "train" / "text_augmentation"
+            for shard_path in self.augmentation_engine.augment_text(source_samples, ISL_VOCABULARY, shard_root):
+                shard_samples = list(read_text_shard(shard_path))
+                generated += len(shard_samples)
+                added += self.append_samples(shard_samples, "augmented_data", split='train')['train']
+                shard_path.unlink()
+        
+        self.save_manifest()
+        
+        logger.info(f"Generated {added} augmented samples ({generated - added} duplicates after normalization skipped)")
+        return added
+    
+    def augment_media_data(self):
+        """Augment training audio clips and landmark sequences into sharded directories"""
+        logger.info("Applying audio and landmark augmentation...")
+        
+        # Only top-level files are sources; aug-shard-* subdirectories hold outputs
+        audio_dir = self.data_dir / "train" / "audio_data"
+        audio_written = self.augmentation_engine.augment_audio(sorted(audio_dir.glob("*.wav")), audio_dir)
+        
+        landmark_dir = self.data_dir / "train" / "video_data"
+        landmark_written = self.augmentation_engine.augment_landmarks(sorted(landmark_dir.glob("*.npy")), landmark_dir)
+        
+        return {'audio': audio_written, 'landmarks': landmark_written}
+    
+    def build_phrase_index(self):
+        """Build the dictionary fast-path index from the training text data"""
+        logger.info("Building phrase index...")
+        
+        index = PhraseIndex()
+        for text_file in sorted((self.data_dir / "train" / "text_data").glob("*.txt")):
+            index.add_text_file(text_file)
+        
+        index_file = self.data_dir / "phrase_index.json"
+        index.save(index_file)
+        
+        logger.info(f"Indexed {len(index)} phrases ({len(index.ambiguous)} ambiguous phrases left to the model)")
+        return len(index)
+    
+    def build_spelling_index(self):
+        """Build the OOV spelling index over the vocabulary and the indexed phrases"""
+        logger.info("Building spelling index...")
+        
+        phrases = []
+        phrase_index_file = self.data_dir / "phrase_index.json"
+        if phrase_index_file.exists():
+            with open(phrase_index_file, 'r', encoding='utf-8') as f:
+                phrases = list(json.load(f)['phrases'])
+        
+        index = build_spelling_index(self.load_vocabulary(), phrases, self.data_dir / "spelling_index.json")
+        return len(index)
+    
+    def build_sign_index(self):
+        """Add new video_data landmark sequences to the lookup-by-example sign index"""
+        logger.info("Updating sign landmark index...")
+        return build_sign_index(self.data_dir, self.data_dir / "sign_index")
     
     def validate_dataset(self):
         """Validate the prepared dataset"""
@@ -283,30 +539,16 @@ class ISLDatasetBuilder:
             'issues': []
         }
         
-        # Check text data
-        train_text_file = self.data_dir / "train" / "text_data" / "synthetic_data.txt"
-        if train_text_file.exists():
-            with open(train_text_file, 'r', encoding='utf-8') as f:
-                validation_results['text_train_samples'] = len(f.readlines())
+        # Counts come from the manifest instead of re-reading every file
+        manifest = self.load_manifest()
+        for path, entry in manifest['files'].items():
+            if path.startswith('train/'):
+                validation_results['text_train_samples'] += entry['samples']
+            else:
+                validation_results['text_test_samples'] += entry['samples']
         
-        test_text_file = self.data_dir / "test" / "text_data" / "synthetic_data.txt"
-        if test_text_file.exists():
-            with open(test_text_file, 'r', encoding='utf-8') as f:
-                validation_results['text_test_samples'] = len(f.readlines())
-        
-        # Check vocabulary
-        vocab_file = self.data_dir / "vocabulary.json"
-        if vocab_file.exists():
-            with open(vocab_file, 'r', encoding='utf-8') as f:
-                vocab = json.load(f)
-                validation_results['vocabulary_size'] = len(vocab)
-        
-        # Check sign mappings
-        mappings_file = self.data_dir / "sign_mappings.json"
-        if mappings_file.exists():
-            with open(mappings_file, 'r', encoding='utf-8') as f:
-                mappings = json.load(f)
-                validation_results['unique_signs'] = len(mappings)
+        validation_results['vocabulary_size'] = manifest['vocabulary_size']
+        validation_results['unique_signs'] = manifest['signs']
         
         # Validate data quality
         if validation_results['text_train_samples'] == 0:
@@ -339,6 +581,16 @@ def main():
     
     # Apply data augmentation
     augmented_count = builder.augment_dataset()
+    builder.augment_media_data()
+    
+    # Build dictionary fast-path index
+    indexed_phrases = builder.build_phrase_index()
+    
+    # Index known words for OOV spelling correction
+    spelling_words = builder.build_spelling_index()
+    
+    # Index landmark sequences for lookup-by-example
+    indexed_sequences = builder.build_sign_index()
     
     # Validate dataset
     validation = builder.validate_dataset()
@@ -347,6 +599,9 @@ def main():
     logger.info("Dataset preparation completed!")
     logger.info(f"Synthetic samples: {synthetic_stats['text_samples']}")
     logger.info(f"Augmented samples: {augmented_count}")
+    logger.info(f"Indexed phrases: {indexed_phrases}")
+    logger.info(f"Spelling index words: {spelling_words}")
+    logger.info(f"Newly indexed landmark sequences: {indexed_sequences}")
     logger.info(f"Total vocabulary: {validation['vocabulary_size']}")
     logger.info(f"Unique ISL signs: {validation['unique_signs']}")
     
@@ -0,0 +1,307 @@
+"""
+Knowledge distillation of compact ISL student models
+Caches a trained teacher's soft labels to disk once, trains a small student on
+them on CPU, and publishes the student as a regular model version directory
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+import logging
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.callbacks import EarlyStopping
+from tensorflow.keras.optimizers import Adam
+
+from speech_to_isl import (
+    ISLTrainingPipeline, ISLTranslationModel, ThroughputCallback, load_sign_table, save_sign_table,
+    trained_vocab_limit, measure_latency
+)
+from corpus_reader import remap_label_ids
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPERATURE = 2.0
+DEFAULT_ALPHA = 0.7
+DEFAULT_CACHE_DIR = "ml-models/checkpoints/distillation"
+
+# Artifacts copied from the teacher so the student version serves the same API
+PASSTHROUGH_ARTIFACTS = [
+    'vocabulary.json', 'text_to_isl_sequence_model.h5', 'text_sequence_tags.json',
+    'landmark_model.h5', 'landmark_sign_table.json'
+]
+
+def file_digest(path):
+    """blake2b digest of a file's bytes"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def soften(probabilities, temperature):
+    """Re-temper softmax outputs: softmax(log(p) / T)"""
+    logits = np.log(np.clip(probabilities, 1e-12, 1.0)) / temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    soft = np.exp(logits)
+    return (soft / soft.sum(axis=1, keepdims=True)).astype(np.float32)
+
+def distillation_targets(soft_labels, label_ids, alpha):
+    """Blend teacher soft labels with one-hot ground truth"""
+    hard = np.eye(soft_labels.shape[1], dtype=np.float32)[label_ids]
+    return alpha * soft_labels + (1.0 - alpha) * hard
+
+def cache_soft_labels(teacher_path, teacher_model, inputs, cache_dir, temperature, batch_size=256):
+    """Teacher soft labels for inputs, computed once and cached by content
+
+    The cache key covers the teacher weights file, the inputs and the
+    temperature, so a retrained teacher or new data never reuses stale labels.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(file_digest(teacher_path).encode('ascii'))
+    digest.update(np.ascontiguousarray(inputs).tobytes())
+    digest.update(repr(float(temperature)).encode('ascii'))
+    key = digest.hexdigest()
+
+    cache_path = Path(cache_dir) / f"{Path(teacher_path).stem}-{key}.npy"
+    if cache_path.exists():
+        logger.info(f"Using cached teacher soft labels from {cache_path}")
+        return np.load(cache_path)
+
+    probabilities = teacher_model.predict(inputs, batch_size=batch_size, verbose=0)
+    soft_labels = soften(probabilities, temperature)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix('.tmp.npy')
+    np.save(tmp_path, soft_labels)
+    os.replace(tmp_path, cache_path)
+    logger.info(f"Cached {len(soft_labels)} teacher soft labels to {cache_path}")
+    return soft_labels
+
+def encode_known(labels, sign_table):
+    """Mask of labels present in a sign table, and their indices"""
+    class_index = {sign: idx for idx, sign in enumerate(sign_table)}
+    known = np.array([label in class_index for label in labels], dtype=bool)
+    label_ids = np.array([class_index[label] for label in np.asarray(labels)[known]], dtype=np.int32)
+    return known, label_ids
+
+def clamp_token_ids(token_ids, vocab_limit, unk_idx):
+    """Map token IDs the teacher's embedding has never seen to <UNK>"""
+    token_ids = np.asarray(token_ids, dtype=np.int32)
+    return np.where(token_ids < vocab_limit, token_ids, unk_idx).astype(np.int32)
+
+class DistillationPipeline:
+    """Distill a published teacher version into a compact student version"""
+
+    def __init__(self, teacher_dir, student_dir, cache_dir=DEFAULT_CACHE_DIR,
+                 temperature=DEFAULT_TEMPERATURE, alpha=DEFAULT_ALPHA, training_config=None):
+        self.teacher_dir = Path(teacher_dir)
+        self.student_dir = Path(student_dir)
+        self.student_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir = Path(cache_dir)
+        self.temperature = temperature
+        self.alpha = alpha
+        self.training_config = training_config
+        self.pipeline = ISLTrainingPipeline(models_dir=str(self.student_dir), training_config=training_config)
+        self.unk_idx = self.pipeline.data_processor.load_vocabulary().get('<UNK>', 0)
+        with open(self.teacher_dir / 'manifest.json', 'r') as f:
+            self.teacher_manifest = json.load(f)
+
+    def train_student(self, student, X, targets, epochs, learning_rate=0.003):
+        """Fit a student on blended soft targets"""
+        batch_size = self.training_config.batch_size if self.training_config else 64
+        student.model.compile(
+            optimizer=Adam(learning_rate=learning_rate),
+            loss=tf.keras.losses.CategoricalCrossentropy(),
+            metrics=['accuracy']
+        )
+
+        from sklearn.model_selection import train_test_split
+        X_train, X_val, y_train, y_val = train_test_split(X, targets, test_size=0.2, random_state=42)
+
+        early_stopping = EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)
+        return student.model.fit(
+            X_train, y_train,
+            validation_data=(X_val, y_val),
+            epochs=epochs,
+            batch_size=batch_size,
+            callbacks=[early_stopping, ThroughputCallback(len(X_train))],
+            verbose=1
+        )
+
+    def distill_text(self, data_dir, epochs=30, embedding_dim=32):
+        """Distill the text classifier into an embedding-bag student"""
+        teacher_path = self.teacher_dir / 'text_to_isl_model.h5'
+        teacher = tf.keras.models.load_model(teacher_path)
+        signs = load_sign_table(self.teacher_dir / 'text_sign_table.json')
+        vocab_limit = trained_vocab_limit(self.teacher_manifest, teacher)
+
+        data = self.pipeline.prepare_training_data(data_dir)
+        known, label_ids = remap_label_ids(data['text_label_ids'], data['text_label_names'], signs)
+        X = clamp_token_ids(data['text_data'][np.flatnonzero(known)], vocab_limit, self.unk_idx)
+        if not len(X):
+            raise ValueError(f"No text samples in {data_dir} match the teacher's signs")
+
+        soft_labels = cache_soft_labels(teacher_path, teacher, X, self.cache_dir, self.temperature)
+
+        student = ISLTranslationModel(vocab_size=vocab_limit, embedding_dim=embedding_dim)
+        student.build_embedding_bag_text_model(
+            max_sequence_length=teacher.input_shape[1], num_isl_signs=len(signs)
+        )
+        history = self.train_student(
+            student, X, distillation_targets(soft_labels, label_ids, self.alpha), epochs
+        )
+
+        student.save_model(str(self.student_dir / 'text_to_isl_model.h5'))
+        save_sign_table(signs, self.student_dir / 'text_sign_table.json')
+        return history
+
+    def distill_speech(self, data_dir, epochs=30, hidden_units=64):
+        """Distill the speech classifier into a single-hidden-layer student"""
+        teacher_path = self.teacher_dir / 'speech_to_isl_model.h5'
+        teacher = tf.keras.models.load_model(teacher_path)
+        signs = load_sign_table(self.teacher_dir / 'speech_sign_table.json')
+
+        data = self.pipeline.prepare_training_data(data_dir)
+        known, label_ids = encode_known(data['speech_labels'], signs)
+        X = np.asarray(data['speech_data'], dtype=np.float32)[known]
+        if not len(X):
+            raise ValueError(f"No speech samples in {data_dir} match the teacher's signs")
+
+        soft_labels = cache_soft_labels(teacher_path, teacher, X, self.cache_dir, self.temperature)
+
+        student = ISLTranslationModel()
+        student.build_compact_speech_to_isl_model(
+            audio_features_dim=teacher.input_shape[1], num_isl_signs=len(signs), hidden_units=hidden_units
+        )
+        history = self.train_student(
+            student, X, distillation_targets(soft_labels, label_ids, self.alpha), epochs
+        )
+
+        student.save_model(str(self.student_dir / 'speech_to_isl_model.h5'))
+        save_sign_table(signs, self.student_dir / 'speech_sign_table.json')
+        return history
+
+    def copy_passthrough_artifacts(self):
+        """Copy teacher artifacts the student does not replace"""
+        for name in PASSTHROUGH_ARTIFACTS:
+            source = self.teacher_dir / name
+            if source.exists():
+                shutil.copy2(source, self.student_dir / name)
+
+    def compare(self, test_data_dir, report_path="ml-models/logs/distillation.md"):
+        """Report agreement, accuracy, size and CPU latency of student vs teacher"""
+        test_data = self.pipeline.prepare_training_data(test_data_dir)
+        rows = []
+
+        for prefix, input_key in (('text', 'text_data'), ('speech', 'speech_data')):
+            teacher_path = self.teacher_dir / f"{prefix}_to_isl_model.h5"
+            student_path = self.student_dir / f"{prefix}_to_isl_model.h5"
+            if not teacher_path.exists() or not student_path.exists():
+                continue
+
+            teacher = tf.keras.models.load_model(teacher_path)
+            student = tf.keras.models.load_model(student_path)
+            signs = load_sign_table(self.student_dir / f"{prefix}_sign_table.json")
+            if prefix == 'text':
+                known, label_ids = remap_label_ids(test_data['text_label_ids'], test_data['text_label_names'], signs)
+            else:
+                known, label_ids = encode_known(test_data['speech_labels'], signs)
+            if not known.any():
+                logger.warning(f"No {prefix} test samples match the teacher's signs")
+                continue
+
+            X = np.asarray(test_data[input_key][np.flatnonzero(known)])
+            if prefix == 'text':
+                X = clamp_token_ids(X, trained_vocab_limit(self.teacher_manifest, teacher), self.unk_idx)
+            else:
+                X = X.astype(np.float32)
+
+            teacher_pred = np.argmax(teacher.predict(X, verbose=0), axis=1)
+            student_pred = np.argmax(student.predict(X, verbose=0), axis=1)
+            teacher_ms, teacher_p95 = measure_latency(teacher, X[:1])
+            student_ms, student_p95 = measure_latency(student, X[:1])
+
+            rows.append({
+                'model': prefix,
+                'test_samples': int(len(X)),
+                'agreement': float(np.mean(teacher_pred == student_pred)),
+                'teacher_accuracy': float(np.mean(teacher_pred == label_ids)),
+                'student_accuracy': float(np.mean(student_pred == label_ids)),
+                'teacher_parameters': int(teacher.count_params()),
+                'student_parameters': int(student.count_params()),
+                'teacher_size_bytes': teacher_path.stat().st_size,
+                'student_size_bytes': student_path.stat().st_size,
+                'teacher_latency_ms_batch1': teacher_ms,
+                'teacher_latency_ms_batch1_p95': teacher_p95,
+                'student_latency_ms_batch1': student_ms,
+                'student_latency_ms_batch1_p95': student_p95
+            })
+
+        lines = [
+            "| Model | Agreement | Teacher acc | Student acc | Params (T / S) | Latency p50 ms (T / S) | p95 (T / S) | Speedup |",
+            "|---|---|---|---|---|---|---|---|"
+        ]
+        for row in rows:
+            lines.append(
+                f"| {row['model']} | {row['agreement']:.4f} | {row['teacher_accuracy']:.4f} | "
+                f"{row['student_accuracy']:.4f} | {row['teacher_parameters']:,} / {row['student_parameters']:,} | "
+                f"{row['teacher_latency_ms_batch1']:.2f} / {row['student_latency_ms_batch1']:.2f} | "
+                f"{row['teacher_latency_ms_batch1_p95']:.2f} / {row['student_latency_ms_batch1_p95']:.2f} | "
+                f"{row['teacher_latency_ms_batch1'] / row['student_latency_ms_batch1']:.1f}x |"
+            )
+        table = "\n".join(lines)
+
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w') as f:
+            f.write(table + "\n")
+        with open(Path(report_path).with_suffix('.json'), 'w') as f:
+            json.dump(rows, f, indent=2)
+
+        logger.info(f"Distillation report:\n{table}")
+        return rows
+
+    def run(self, train_data_dir, test_data_dir, epochs=30):
+        """Distill every teacher model present, compare, and publish the student version"""
+        # Distillation runs offline on CPU; the student is sized for CPU serving
+        try:
+            tf.config.set_visible_devices([], 'GPU')
+        except RuntimeError:
+            logger.warning("Devices already initialized, distilling on the default device")
+
+        trained = {}
+        for prefix, distill in (('text', self.distill_text), ('speech', self.distill_speech)):
+            if not (self.teacher_dir / f"{prefix}_to_isl_model.h5").exists():
+                trained[prefix] = False
+                continue
+            try:
+                distill(train_data_dir, epochs=epochs)
+                trained[prefix] = True
+            except Exception as e:
+                logger.warning(f"{prefix.capitalize()} distillation skipped: {e}")
+                trained[prefix] = False
+
+        self.copy_passthrough_artifacts()
+        report = self.compare(test_data_dir)
+
+        # manifest.json last: the server only picks up complete versions
+        manifest = {
+            'version': self.student_dir.name,
+            'created_at': time.time(),
+            'distilled_from': str(self.teacher_dir),
+            'temperature': self.temperature,
+            'alpha': self.alpha,
+            'vocab_size': self.teacher_manifest.get('vocab_size'),
+            'text_model': trained['text'],
+            'text_sequence_model': (self.student_dir / 'text_to_isl_sequence_model.h5').exists(),
+            'speech_model': trained['speech'],
+            'distillation_report': report
+        }
+        with open(self.student_dir / 'manifest.json', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(f"Published distilled model version {self.student_dir.name}")
+        return report
@@ -8,15 +8,25 @@ import json
 import numpy as np
 import tensorflow as tf
 import pickle
-import librosa
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 import logging
 from pathlib import Path
 import base64
-import io
-import wave
-from speech_to_isl import ISLDataProcessor, ISLAvatarGenerator
+import threading
+import time
+from speech_to_isl import (
+    ISLDataProcessor, ISLAvatarGenerator, load_sign_table, decode_sign_sequence, trained_vocab_limit,
+    LENGTH_BUCKETS, group_by_bucket
+)
+from phrase_index import load_phrase_index
+from spelling_index import load_spelling_index
+from sign_recognition import StreamingSignRecognizer
+from sign_index import load_sign_index
+from text_normalization import tokenize
+from translation_cache import TranslationCache, create_cache_backend, cache_key
+from lesson_bundles import DEFAULT_BUNDLE_DIR, load_bundle_manifest
+from audio_decoding import extract_streaming_mfcc
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +34,287 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)
+# Uploads are read fully before decoding, so cap the request size
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('ISL_MAX_UPLOAD_MB', '16')) * 1024 * 1024
+
+MODELS_DIR = Path("ml-models/models")
+VERSIONS_DIR = MODELS_DIR / "versions"
+LEGACY_VERSION = "legacy"
+DEFAULT_TOP_K = 3
+RECOGNITION_WINDOW = 32
+RECOGNITION_WAIT_SECONDS = 0.1
+
+def list_model_versions():
+    """List published artifact versions, oldest first"""
+    if not VERSIONS_DIR.exists():
+        return []
+    # Training writes manifest.json last, so half-written versions are never picked up
+    return sorted(
+        p.name for p in VERSIONS_DIR.iterdir()
+        if p.is_dir() and (p / "manifest.json").exists()
+    )
+
+def resolve_model_dir(version):
+    """Map a version name to its artifact directory"""
+    if version == LEGACY_VERSION:
+        return MODELS_DIR
+    return VERSIONS_DIR / version
+
+def parse_positive_int(value):
+    """Integer request parameter as a positive int, or None if it is invalid"""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 1 else None
+
+def parse_top_k(value):
+    """topK request parameter as a positive int, or None if it is invalid"""
+    return parse_positive_int(value)
+
+def decode_top_k(probabilities, sign_table, k=DEFAULT_TOP_K):
+    """Return the k most likely signs and probabilities per row, best first"""
+    k = max(1, min(int(k), probabilities.shape[1]))
+    
+    # argpartition is O(n) per row; only the k survivors get sorted
+    top = np.argpartition(probabilities, -k, axis=1)[:, -k:]
+    top_probs = np.take_along_axis(probabilities, top, axis=1)
+    order = np.argsort(-top_probs, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_probs = np.take_along_axis(top_probs, order, axis=1)
+    
+    return sign_table[top], top_probs
+
+def format_translation(top_signs, top_probs):
+    """Build the signs/confidence/top_k fields of a translation response"""
+    return {
+        'signs': top_signs[:, 0].tolist(),
+        'confidence': top_probs[:, 0].tolist(),
+        'top_k': [
+            [{'sign': sign, 'confidence': float(prob)} for sign, prob in zip(row_signs, row_probs)]
+            for row_signs, row_probs in zip(top_signs, top_probs)
+        ]
+    }
+
+def load_sign_table_artifact(model_dir, prefix):
+    """Load the index-to-sign table, falling back to a pickled LabelEncoder"""
+    table_path = model_dir / f"{prefix}_sign_table.json"
+    if table_path.exists():
+        return load_sign_table(table_path)
+    
+    # Artifacts trained before sign tables existed only have the pickled encoder
+    encoder_path = model_dir / f"{prefix}_label_encoder.pkl"
+    if encoder_path.exists():
+        with open(encoder_path, 'rb') as f:
+            return np.asarray(pickle.load(f).classes_, dtype=object)
+    
+    return None
+
+def compile_bucket_graphs(model, buckets=LENGTH_BUCKETS):
+    """One concrete inference graph per length bucket for variable-length models
+
+    Fixed-length (legacy) models get no graphs and keep using model.predict.
+    """
+    if model is None or model.input_shape[1] is not None:
+        return {}
+    graphs = {}
+    for bucket in buckets:
+        graph = tf.function(
+            lambda token_ids: model(token_ids, training=False),
+            input_signature=[tf.TensorSpec(shape=[None, bucket], dtype=tf.int32)]
+        )
+        graphs[bucket] = graph.get_concrete_function()
+    return graphs
+
+def predict_bucketed(model, graphs, token_ids):
+    """Predict padded token IDs, running each length bucket through its own graph
+
+    Rows are grouped by bucket, truncated to the bucket width and scattered
+    back into input order. Per-token outputs are zero-padded to the input width.
+    """
+    if not graphs:
+        return model.predict(token_ids)
+    
+    token_ids = np.asarray(token_ids, dtype=np.int32)
+    predictions = None
+    for bucket, rows in group_by_bucket(token_ids, tuple(graphs)).items():
+        output = graphs[bucket](tf.constant(token_ids[rows, :bucket])).numpy()
+        if predictions is None:
+            shape = (len(token_ids),) + output.shape[1:]
+            if output.ndim == 3:
+                shape = (len(token_ids), token_ids.shape[1], output.shape[2])
+            predictions = np.zeros(shape, dtype=output.dtype)
+        predictions[rows, :output.shape[1]] = output
+    return predictions
+
+class CascadeStats:
+    """Thread-safe counts of how far inputs travel through the model cascade
+
+    Stage 1 is the phrase index (text only), stage 2 the active model and
+    stage 3 the heavier escalation model.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {
+            pipeline: {'inputs': 0, 'dictionary': 0, 'model': 0, 'escalated': 0}
+            for pipeline in ('text', 'speech')
+        }
+    
+    def record(self, pipeline, inputs, dictionary=0, model=0, escalated=0):
+        with self.lock:
+            counts = self.counts[pipeline]
+            counts['inputs'] += inputs
+            counts['dictionary'] += dictionary
+            counts['model'] += model
+            counts['escalated'] += escalated
+    
+    def info(self):
+        """Counts plus per-stage escalation rates"""
+        with self.lock:
+            counts = {pipeline: dict(c) for pipeline, c in self.counts.items()}
+        for c in counts.values():
+            c['dictionary_escalation_rate'] = round(1.0 - c['dictionary'] / c['inputs'], 4) if c['inputs'] else None
+            c['model_escalation_rate'] = round(c['escalated'] / c['model'], 4) if c['model'] else None
+        return counts
+
+class ModelBundle:
+    """Models and label encoders loaded from one artifact version"""
+    
+    def __init__(self, version, model_dir, n_mfcc=13):
+        self.version = version
+        self.model_dir = Path(model_dir)
+        self.n_mfcc = n_mfcc
+        self.text_model = None
+        self.speech_model = None
+        self.text_signs = None
+        self.speech_signs = None
+        self.text_sequence_model = None
+        self.text_sequence_tags = None
+        self.text_vocab_limit = None
+        self.text_sequence_vocab_limit = None
+        self.landmark_model = None
+        self.landmark_signs = None
+        self.landmark_graph = None
+        self.text_graphs = {}
+        self.text_sequence_graphs = {}
+        self.manifest = {}
+        self.escalation = None
+        self.load_seconds = 0.0
+        self.warmup_seconds = 0.0
+        self.loaded_at = None
+    
+    def load(self):
+        """Load models and encoders from the artifact directory"""
+        start = time.perf_counter()
+        
+        manifest_path = self.model_dir / "manifest.json"
+        if manifest_path.exists():
+            with open(manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+        
+        text_model_path = self.model_dir / "text_to_isl_model.h5"
+        if text_model_path.exists():
+            self.text_model = tf.keras.models.load_model(text_model_path)
+            self.text_vocab_limit = trained_vocab_limit(self.manifest, self.text_model)
+            logger.info(f"Text-to-ISL model loaded successfully ({self.version})")
+        
+        speech_model_path = self.model_dir / "speech_to_isl_model.h5"
+        if speech_model_path.exists():
+            self.speech_model = tf.keras.models.load_model(speech_model_path)
+            logger.info(f"Speech-to-ISL model loaded successfully ({self.version})")
+        
+        sequence_model_path = self.model_dir / "text_to_isl_sequence_model.h5"
+        sequence_tags_path = self.model_dir / "text_sequence_tags.json"
+        if sequence_model_path.exists() and sequence_tags_path.exists():
+            self.text_sequence_model = tf.keras.models.load_model(sequence_model_path)
+            self.text_sequence_tags = load_sign_table(sequence_tags_path)
+            self.text_sequence_vocab_limit = trained_vocab_limit(self.manifest, self.text_sequence_model)
+            logger.info(f"Text-to-ISL sequence model loaded successfully ({self.version})")
+        
+        self.text_signs = load_sign_table_artifact(self.model_dir, "text")
+        if self.text_signs is not None:
+            logger.info(f"Text sign table loaded ({len(self.text_signs)} signs)")
+        
+        self.speech_signs = load_sign_table_artifact(self.model_dir, "speech")
+        if self.speech_signs is not None:
+            logger.info(f"Speech sign table loaded ({len(self.speech_signs)} signs)")
+        
+        landmark_model_path = self.model_dir / "landmark_model.h5"
+        landmark_signs_path = self.model_dir / "landmark_sign_table.json"
+        if landmark_model_path.exists() and landmark_signs_path.exists():
+            self.landmark_model = tf.keras.models.load_model(landmark_model_path)
+            self.landmark_signs = load_sign_table(landmark_signs_path)
+            # One fixed-shape graph: every tick sends a (sessions, window, 126) batch
+            model = self.landmark_model
+            self.landmark_graph = tf.function(
+                lambda windows: model(windows, training=False),
+                input_signature=[tf.TensorSpec(shape=[None] + list(model.input_shape[1:]), dtype=tf.float32)]
+            ).get_concrete_function()
+            logger.info(f"Landmark-to-ISL model loaded successfully ({self.version})")
+        
+        self.text_graphs = compile_bucket_graphs(self.text_model)
+        self.text_sequence_graphs = compile_bucket_graphs(self.text_sequence_model)
+        
+        self.load_seconds = time.perf_counter() - start
+        self.loaded_at = time.time()
+        return self
+    
+    def warm_up(self):
+        """Run one dummy prediction per model so graphs are built before serving"""
+        start = time.perf_counter()
+        
+        for model, graphs in ((self.text_model, self.text_graphs),
+                              (self.text_sequence_model, self.text_sequence_graphs)):
+            if model is None:
+                continue
+            if graphs:
+                for bucket, graph in graphs.items():
+                    graph(tf.zeros((1, bucket), dtype=tf.int32))
+            else:
+                sequence_length = model.input_shape[1]
+                model.predict(np.zeros((1, sequence_length), dtype=np.int32), verbose=0)
+        
+        if self.speech_model is not None:
+            self.speech_model.predict(np.zeros((1, self.n_mfcc), dtype=np.float32), verbose=0)
+        
+        if self.landmark_graph is not None:
+            self.landmark_graph(tf.zeros([1] + list(self.landmark_model.input_shape[1:]), dtype=tf.float32))
+        
+        self.warmup_seconds = time.perf_counter() - start
+        return self
+    
+    def info(self):
+        """Describe this bundle for /models/info"""
+        return {
+            'version': self.version,
+            'path': str(self.model_dir),
+            'loaded_at': self.loaded_at,
+            'load_seconds': round(self.load_seconds, 4),
+            'warmup_seconds': round(self.warmup_seconds, 4),
+            'length_buckets': sorted(self.text_graphs) or None,
+            'escalation_version': self.escalation.version if self.escalation else None
+        }
+
+class ModelVersionWatcher(threading.Thread):
+    """Poll the versions directory and hot-load newer artifacts"""
+    
+    def __init__(self, service, interval=30.0):
+        super().__init__(daemon=True)
+        self.service = service
+        self.interval = interval
+        self.stop_event = threading.Event()
+    
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            versions = list_model_versions()
+            if versions and versions[-1] != self.service.active_bundle.version:
+                self.service.reload_models(versions[-1])
+    
+    def stop(self):
+        self.stop_event.set()
 
 class ISLInferenceService:
     """Service for ISL translation inference"""
@@ -31,69 +322,235 @@ class ISLInferenceService:
     def __init__(self):
         self.data_processor = ISLDataProcessor()
         self.avatar_generator = ISLAvatarGenerator()
-        self.text_model = None
-        self.speech_model = None
-        self.text_label_encoder = None
-        self.speech_label_encoder = None
+        self.active_bundle = ModelBundle(LEGACY_VERSION, MODELS_DIR)
+        self.reload_lock = threading.Lock()
+        self.reload_status = {'state': 'idle', 'version': None, 'error': None}
+        self.phrase_index = None
+        self.spelling_index = None
+        self.sign_index = None
+        threshold = os.environ.get('ISL_CASCADE_THRESHOLD')
+        self.cascade_threshold = float(threshold) if threshold else None
+        self.cascade_stats = CascadeStats()
+        self.translation_cache = TranslationCache(
+            create_cache_backend(os.environ.get('ISL_CACHE_URL')),
+            ttl=int(os.environ.get('ISL_CACHE_TTL', 24 * 3600))
+        )
         self.load_models()
     
-    def load_models(self):
-        """Load trained models and encoders"""
+    @property
+    def text_model(self):
+        return self.active_bundle.text_model
+    
+    @property
+    def speech_model(self):
+        return self.active_bundle.speech_model
+    
+    @property
+    def text_signs(self):
+        return self.active_bundle.text_signs
+    
+    @property
+    def speech_signs(self):
+        return self.active_bundle.speech_signs
+    
+    def load_models(self, version=None):
+        """Load, warm up and activate a model version (newest by default)"""
+        if version is None:
+            versions = list_model_versions()
+            version = versions[-1] if versions else LEGACY_VERSION
+        
+        # The phrase index is rebuilt by data preparation, so refresh it with the models
         try:
-            # Load text-to-ISL model
-            text_model_path = "ml-models/models/text_to_isl_model.h5"
-            if os.path.exists(text_model_path):
-                self.text_model = tf.keras.models.load_model(text_model_path)
-                logger.info("Text-to-ISL model loaded successfully")
-            
-            # Load speech-to-ISL model
-            speech_model_path = "ml-models/models/speech_to_isl_model.h5"
-            if os.path.exists(speech_model_path):
-                self.speech_model = tf.keras.models.load_model(speech_model_path)
-                logger.info("Speech-to-ISL model loaded successfully")
-            
-            # Load label encoders
-            text_encoder_path = "ml-models/models/text_label_encoder.pkl"
-            if os.path.exists(text_encoder_path):
-                with open(text_encoder_path, 'rb') as f:
-                    self.text_label_encoder = pickle.load(f)
-                logger.info("Text label encoder loaded successfully")
+            self.phrase_index = load_phrase_index()
+        except Exception as e:
+            logger.error(f"Error loading phrase index: {e}")
+        
+        try:
+            self.spelling_index = load_spelling_index()
+        except Exception as e:
+            logger.error(f"Error loading spelling index: {e}")
+        
+        try:
+            self.sign_index = load_sign_index()
+        except Exception as e:
+            logger.error(f"Error loading sign index: {e}")
+        
+        try:
+            bundle = ModelBundle(version, resolve_model_dir(version), self.data_processor.n_mfcc)
+            bundle.load().warm_up()
             
-            speech_encoder_path = "ml-models/models/speech_label_encoder.pkl"
-            if os.path.exists(speech_encoder_path):
-                with open(speech_encoder_path, 'rb') as f:
-                    self.speech_label_encoder = pickle.load(f)
-                logger.info("Speech label encoder loaded successfully")
-                
+            # Cascade: a distilled student answers first, its teacher takes low-confidence inputs
+            teacher_dir = bundle.manifest.get('distilled_from')
+            if self.cascade_threshold is not None and teacher_dir and Path(teacher_dir).is_dir():
+                bundle.escalation = ModelBundle(Path(teacher_dir).name, teacher_dir, self.data_processor.n_mfcc)
+                bundle.escalation.load().warm_up()
+                logger.info(f"Cascade escalates to {bundle.escalation.version} below confidence {self.cascade_threshold}")
         except Exception as e:
             logger.error(f"Error loading models: {e}")
+            return False
+        
+        # Single reference assignment: in-flight requests keep the bundle they started with
+        self.active_bundle = bundle
+        logger.info(
+            f"Activated model version {version} "
+            f"(load {bundle.load_seconds:.2f}s, warm-up {bundle.warmup_seconds:.2f}s)"
+        )
+        return True
+    
+    def reload_models(self, version=None):
+        """Reload models, skipping if another reload is already running"""
+        if not self.reload_lock.acquire(blocking=False):
+            return False
+        return self.run_reload(version)
+    
+    def run_reload(self, version):
+        """Reload with ``reload_lock`` already held by the caller; releases it"""
+        try:
+            self.reload_status = {'state': 'loading', 'version': version, 'error': None}
+            if version is not None and not resolve_model_dir(version).is_dir():
+                raise ValueError(f"Unknown model version: {version}")
+            if not self.load_models(version):
+                raise RuntimeError("Model loading failed, keeping previous version")
+            self.reload_status = {'state': 'idle', 'version': self.active_bundle.version, 'error': None}
+            return True
+        except Exception as e:
+            logger.error(f"Model reload failed: {e}")
+            self.reload_status = {'state': 'failed', 'version': version, 'error': str(e)}
+            return False
+        finally:
+            self.reload_lock.release()
+    
+    def reload_models_async(self, version=None):
+        """Start a background reload; returns False if one is already running"""
+        # Take the lock here so concurrent requests cannot both start a reload
+        if not self.reload_lock.acquire(blocking=False):
+            return False
+        threading.Thread(target=self.run_reload, args=(version,), daemon=True).start()
+        return True
+    
+    def cached_translation(self, pipeline, payload, top_k, compute):
+        """Translation result for a request, shared with other workers through the cache
+
+        Keys include the active model version and cascade threshold, so a hot
+        reload never serves results of the previous models.
+        """
+        key = cache_key(self.active_bundle.version, self.cascade_threshold, pipeline, payload, top_k)
+        return self.translation_cache.get_or_compute(key, compute)
+    
+    def correct_spelling(self, tokens):
+        """Map out-of-vocabulary tokens to their closest known word"""
+        spelling_index = self.spelling_index
+        if spelling_index is None:
+            return tokens, []
+        return spelling_index.correct(tokens)
     
-    def translate_text_to_isl(self, text):
-        """Translate text to ISL signs"""
-        if self.text_model is None or self.text_label_encoder is None:
-            raise ValueError("Text model not loaded")
+    def translate_text_to_isl(self, text, top_k=DEFAULT_TOP_K):
+        """Translate text to ISL signs
+
+        Known vocabulary phrases are resolved through the phrase index; only
+        unmatched spans are batched through the text model.
+        """
+        bundle = self.active_bundle
+        phrase_index = self.phrase_index
+        
+        tokens, corrections = self.correct_spelling(tokenize(text))
+        if phrase_index is not None:
+            spans = phrase_index.segment(tokens)
+        else:
+            spans = [{'sign': None, 'start': 0, 'end': len(tokens)}]
+        
+        # Predict all unmatched spans in one batch
+        model_spans = [span for span in spans if span['sign'] is None]
+        model_results = None
+        escalated = []
+        if model_spans:
+            if bundle.text_model is None or bundle.text_signs is None:
+                raise ValueError("Text model not loaded")
+            
+            processed_text = np.stack([
+                self.data_processor.preprocess_text(
+                    ' '.join(tokens[span['start']:span['end']]), vocab_limit=bundle.text_vocab_limit
+                )
+                for span in model_spans
+            ])
+            predictions = predict_bucketed(bundle.text_model, bundle.text_graphs, processed_text)
+            model_candidates = format_translation(*decode_top_k(predictions, bundle.text_signs, top_k))['top_k']
+            
+            escalated = self.escalate(
+                bundle, model_candidates, 'text',
+                lambda heavy, rows: predict_bucketed(heavy.text_model, heavy.text_graphs, np.stack([
+                    self.data_processor.preprocess_text(
+                        ' '.join(tokens[model_spans[i]['start']:model_spans[i]['end']]),
+                        vocab_limit=heavy.text_vocab_limit
+                    )
+                    for i in rows
+                ])),
+                top_k
+            )
+            model_results = iter(zip(model_candidates, escalated))
+        
+        self.cascade_stats.record(
+            'text', len(spans), dictionary=len(spans) - len(model_spans), model=len(model_spans),
+            escalated=sum(escalated)
+        )
+        
+        # Reassemble signs in input order, tagging the path each came from
+        result = {
+            'signs': [], 'confidence': [], 'top_k': [], 'sources': [], 'original_text': text,
+            'corrections': corrections
+        }
+        for span in spans:
+            if span['sign'] is not None:
+                candidates = [{'sign': span['sign'], 'confidence': 1.0}]
+                source = 'dictionary'
+            else:
+                candidates, was_escalated = next(model_results)
+                source = 'escalated' if was_escalated else 'model'
+            
+            result['signs'].append(candidates[0]['sign'])
+            result['confidence'].append(candidates[0]['confidence'])
+            result['top_k'].append(candidates)
+            result['sources'].append(source)
+        
+        return result
+    
+    def translate_text_to_isl_sequence(self, text):
+        """Translate a sentence to its ordered ISL sign sequence in one forward pass"""
+        bundle = self.active_bundle
+        if bundle.text_sequence_model is None or bundle.text_sequence_tags is None:
+            raise ValueError("Text sequence model not loaded")
         
         # Preprocess text
-        processed_text = self.data_processor.preprocess_text(text)
+        tokens, corrections = self.correct_spelling(tokenize(text))
+        processed_text = self.data_processor.preprocess_text(
+            ' '.join(tokens), vocab_limit=bundle.text_sequence_vocab_limit
+        )
+        num_tokens = min(len(tokens), len(processed_text))
         processed_text = np.expand_dims(processed_text, axis=0)
         
-        # Predict ISL signs
-        predictions = self.text_model.predict(processed_text)
-        predicted_classes = np.argmax(predictions, axis=1)
-        confidence_scores = np.max(predictions, axis=1)
-        
-        # Decode predictions
-        isl_signs = self.text_label_encoder.inverse_transform(predicted_classes)
+        # Predict one tag per token
+        predictions = predict_bucketed(
+            bundle.text_sequence_model, bundle.text_sequence_graphs, processed_text
+        )[0]
+        segments = decode_sign_sequence(
+            np.argmax(predictions, axis=-1),
+            np.max(predictions, axis=-1),
+            bundle.text_sequence_tags,
+            num_tokens
+        )
         
         return {
-            'signs': isl_signs.tolist(),
-            'confidence': confidence_scores.tolist(),
-            'original_text': text
+            'signs': [segment['sign'] for segment in segments],
+            'confidence': [segment['confidence'] for segment in segments],
+            'segments': segments,
+            'original_text': text,
+            'corrections': corrections
         }
     
-    def translate_speech_to_isl(self, audio_data):
+    def translate_speech_to_isl(self, audio_data, top_k=DEFAULT_TOP_K):
         """Translate speech to ISL signs"""
-        if self.speech_model is None or self.speech_label_encoder is None:
+        bundle = self.active_bundle
+        if bundle.speech_model is None or bundle.speech_signs is None:
             raise ValueError("Speech model not loaded")
         
         # Extract audio features
@@ -104,43 +561,77 @@ class ISLInferenceService:
         features = np.expand_dims(features, axis=0)
         
         # Predict ISL signs
-        predictions = self.speech_model.predict(features)
-        predicted_classes = np.argmax(predictions, axis=1)
-        confidence_scores = np.max(predictions, axis=1)
+        predictions = bundle.speech_model.predict(features)
         
-        # Decode predictions
-        isl_signs = self.speech_label_encoder.inverse_transform(predicted_classes)
+        # Decode predictions, escalating low-confidence results in cascade mode
+        translation = format_translation(*decode_top_k(predictions, bundle.speech_signs, top_k))
+        escalated = self.escalate(
+            bundle, translation['top_k'], 'speech',
+            lambda heavy, rows: heavy.speech_model.predict(features[rows]),
+            top_k
+        )
+        self.cascade_stats.record('speech', 1, model=1, escalated=sum(escalated))
         
-        return {
-            'signs': isl_signs.tolist(),
-            'confidence': confidence_scores.tolist()
-        }
+        translation['signs'] = [candidates[0]['sign'] for candidates in translation['top_k']]
+        translation['confidence'] = [candidates[0]['confidence'] for candidates in translation['top_k']]
+        translation['sources'] = ['escalated' if e else 'model' for e in escalated]
+        return translation
+    
+    def escalate(self, bundle, candidates, pipeline, predict_heavy, top_k):
+        """Re-run rows whose top-1 confidence is below the cascade threshold on the heavy model
+
+        ``candidates`` (per-row top-k lists) are replaced in place; returns a
+        per-row flag of which rows were escalated.
+        """
+        escalated = [False] * len(candidates)
+        heavy = bundle.escalation
+        if self.cascade_threshold is None or heavy is None:
+            return escalated
+        
+        signs = heavy.text_signs if pipeline == 'text' else heavy.speech_signs
+        model = heavy.text_model if pipeline == 'text' else heavy.speech_model
+        if model is None or signs is None:
+            return escalated
+        
+        rows = [i for i, row in enumerate(candidates) if row[0]['confidence'] < self.cascade_threshold]
+        if not rows:
+            return escalated
+        
+        heavy_candidates = format_translation(*decode_top_k(predict_heavy(heavy, rows), signs, top_k))['top_k']
+        for i, row in zip(rows, heavy_candidates):
+            candidates[i] = row
+            escalated[i] = True
+        return escalated
+    
+    def recognize_landmark_windows(self, windows, top_k=DEFAULT_TOP_K):
+        """Classify a batch of (window, 126) landmark windows into top-k sign candidates"""
+        bundle = self.active_bundle
+        if bundle.landmark_graph is None or bundle.landmark_signs is None:
+            raise ValueError("Landmark model not loaded")
+        
+        # Match the model's window length if a reload changed it
+        model_window = bundle.landmark_model.input_shape[1]
+        if windows.shape[1] > model_window:
+            windows = windows[:, -model_window:]
+        elif windows.shape[1] < model_window:
+            windows = np.pad(windows, ((0, 0), (model_window - windows.shape[1], 0), (0, 0)))
+        
+        predictions = bundle.landmark_graph(tf.constant(windows)).numpy()
+        return format_translation(*decode_top_k(predictions, bundle.landmark_signs, top_k))['top_k']
     
     def extract_audio_features_from_data(self, audio_data):
-        """Extract features from audio data"""
+        """Extract features from uploaded audio (raw bytes or base64)
+
+        WAV, FLAC, Ogg/Opus and WebM/Opus are decoded block by block, resampled
+        to the training sample rate and fed straight into the MFCC computation.
+        """
         try:
-            # Convert base64 audio to numpy array
-            audio_bytes = base64.b64decode(audio_data)
-            audio_io = io.BytesIO(audio_bytes)
-            
-            # Read audio data
-            with wave.open(audio_io, 'rb') as wav_file:
-                frames = wav_file.readframes(-1)
-                audio_array = np.frombuffer(frames, dtype=np.int16)
-                sample_rate = wav_file.getframerate()
-            
-            # Convert to float and normalize
-            audio_array = audio_array.astype(np.float32) / 32768.0
-            
-            # Extract MFCC features
-            mfccs = librosa.feature.mfcc(
-                y=audio_array, 
-                sr=sample_rate, 
-                n_mfcc=self.data_processor.n_mfcc
+            audio_bytes = audio_data if isinstance(audio_data, bytes) else base64.b64decode(audio_data)
+            return extract_streaming_mfcc(
+                audio_bytes,
+                n_mfcc=self.data_processor.n_mfcc,
+                sample_rate=self.data_processor.sample_rate
             )
-            mfccs_scaled = np.mean(mfccs.T, axis=0)
-            
-            return mfccs_scaled
             
         except Exception as e:
             logger.error(f"Error extracting audio features: {e}")
@@ -153,13 +644,36 @@ class ISLInferenceService:
 # Initialize inference service
 inference_service = ISLInferenceService()
 
+# Optionally poll for newly published model versions
+watch_interval = float(os.environ.get('ISL_MODEL_WATCH_INTERVAL', '0'))
+if watch_interval > 0:
+    ModelVersionWatcher(inference_service, interval=watch_interval).start()
+
+# Streaming recognition: one batched model call per tick across all sessions
+recognizer = StreamingSignRecognizer(
+    inference_service.recognize_landmark_windows,
+    window=RECOGNITION_WINDOW,
+    tick_interval=float(os.environ.get('ISL_RECOGNITION_TICK_MS', '20')) / 1000.0
+)
+recognizer.start()
+
+try:
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+    sock = Sock(app)
+except ImportError:
+    sock = None
+    logger.warning("flask-sock not installed, /recognize/stream websocket endpoint disabled")
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
         'text_model_loaded': inference_service.text_model is not None,
-        'speech_model_loaded': inference_service.speech_model is not None
+        'text_sequence_model_loaded': inference_service.active_bundle.text_sequence_model is not None,
+        'speech_model_loaded': inference_service.speech_model is not None,
+        'landmark_model_loaded': inference_service.active_bundle.landmark_model is not None
     })
 
 @app.route('/translate/text', methods=['POST'])
@@ -172,19 +686,31 @@ def translate_text():
         if not text:
             return jsonify({'error': 'Text is required'}), 400
         
-        # Translate text to ISL
-        translation_result = inference_service.translate_text_to_isl(text)
+        mode = data.get('mode')
+        top_k = parse_top_k(data.get('topK', DEFAULT_TOP_K))
+        if top_k is None:
+            return jsonify({'error': 'topK must be a positive integer'}), 400
         
-        # Generate avatar animation
-        animation_data = inference_service.generate_avatar_animation(
-            translation_result['signs']
-        )
+        def compute():
+            # Translate text to ISL
+            if mode == 'sequence':
+                translation_result = inference_service.translate_text_to_isl_sequence(text)
+            else:
+                translation_result = inference_service.translate_text_to_isl(text, top_k=top_k)
+            # Texts sharing a cache key differ in their raw form; it is added per request
+            translation_result.pop('original_text', None)
+            
+            # Generate avatar animation
+            animation_data = inference_service.generate_avatar_animation(
+                translation_result['signs']
+            )
+            return {'translation': translation_result, 'animation': animation_data}
         
-        return jsonify({
-            'success': True,
-            'translation': translation_result,
-            'animation': animation_data
-        })
+        result = inference_service.cached_translation(
+            f"text:{mode or 'classify'}", ' '.join(tokenize(text)), top_k, compute
+        )
+        translation = dict(result['translation'], original_text=text)
+        return jsonify(dict(result, translation=translation, success=True))
         
     except Exception as e:
         logger.error(f"Text translation error: {e}")
@@ -194,25 +720,32 @@ def translate_text():
 def translate_speech():
     """Translate speech to ISL"""
     try:
-        data = request.get_json()
-        audio_data = data.get('audio', '')
+        # Compressed audio can be posted as the raw body instead of base64 JSON
+        if request.mimetype.startswith('audio/') or request.mimetype == 'application/octet-stream':
+            audio_data = request.get_data()
+            top_k = parse_top_k(request.args.get('topK', DEFAULT_TOP_K))
+        else:
+            data = request.get_json()
+            audio_data = data.get('audio', '')
+            top_k = parse_top_k(data.get('topK', DEFAULT_TOP_K))
         
         if not audio_data:
             return jsonify({'error': 'Audio data is required'}), 400
+        if top_k is None:
+            return jsonify({'error': 'topK must be a positive integer'}), 400
         
-        # Translate speech to ISL
-        translation_result = inference_service.translate_speech_to_isl(audio_data)
-        
-        # Generate avatar animation
-        animation_data = inference_service.generate_avatar_animation(
-            translation_result['signs']
-        )
+        def compute():
+            # Translate speech to ISL
+            translation_result = inference_service.translate_speech_to_isl(audio_data, top_k=top_k)
+            
+            # Generate avatar animation
+            animation_data = inference_service.generate_avatar_animation(
+                translation_result['signs']
+            )
+            return {'translation': translation_result, 'animation': animation_data}
         
-        return jsonify({
-            'success': True,
-            'translation': translation_result,
-            'animation': animation_data
-        })
+        result = inference_service.cached_translation('speech', cache_key(audio_data), top_k, compute)
+        return jsonify(dict(result, success=True))
         
     except Exception as e:
         logger.error(f"Speech translation error: {e}")
@@ -240,20 +773,190 @@ def preview_avatar():
         logger.error(f"Avatar preview error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/lessons/bundles', methods=['GET'])
+def lesson_bundles():
+    """List the precompiled lesson bundles"""
+    return jsonify(load_bundle_manifest(DEFAULT_BUNDLE_DIR))
+
+@app.route('/lessons/<lesson_id>/bundle', methods=['GET'])
+def lesson_bundle(lesson_id):
+    """Serve a lesson bundle; supports range requests and ETag revalidation"""
+    entry = load_bundle_manifest(DEFAULT_BUNDLE_DIR).get(lesson_id)
+    if entry is None:
+        return jsonify({'error': f'No bundle for lesson: {lesson_id}'}), 404
+    return send_file(
+        Path(DEFAULT_BUNDLE_DIR).resolve() / entry['file'],
+        mimetype='application/octet-stream',
+        etag=entry['hash'],
+        conditional=True,
+        max_age=300
+    )
+
 @app.route('/models/info', methods=['GET'])
 def model_info():
     """Get information about loaded models"""
+    bundle = inference_service.active_bundle
     return jsonify({
+        'active_version': bundle.info(),
+        'available_versions': list_model_versions(),
+        'reload': inference_service.reload_status,
         'text_model': {
-            'loaded': inference_service.text_model is not None,
-            'classes': len(inference_service.text_label_encoder.classes_) if inference_service.text_label_encoder else 0
+            'loaded': bundle.text_model is not None,
+            'classes': len(bundle.text_signs) if bundle.text_signs is not None else 0
+        },
+        'text_sequence_model': {
+            'loaded': bundle.text_sequence_model is not None,
+            'tags': len(bundle.text_sequence_tags) if bundle.text_sequence_tags is not None else 0
         },
         'speech_model': {
-            'loaded': inference_service.speech_model is not None,
-            'classes': len(inference_service.speech_label_encoder.classes_) if inference_service.speech_label_encoder else 0
+            'loaded': bundle.speech_model is not None,
+            'classes': len(bundle.speech_signs) if bundle.speech_signs is not None else 0
+        },
+        'landmark_model': {
+            'loaded': bundle.landmark_model is not None,
+            'classes': len(bundle.landmark_signs) if bundle.landmark_signs is not None else 0
+        },
+        'recognition': recognizer.info(),
+        'cascade': {
+            'threshold': inference_service.cascade_threshold,
+            'escalation_version': bundle.escalation.version if bundle.escalation else None,
+            'stages': inference_service.cascade_stats.info()
+        },
+        'translation_cache': inference_service.translation_cache.info(),
+        'sign_index': {
+            'loaded': inference_service.sign_index is not None,
+            'sequences': len(inference_service.sign_index) if inference_service.sign_index else 0
+        },
+        'spelling_index': (
+            dict(inference_service.spelling_index.info(), loaded=True)
+            if inference_service.spelling_index else {'loaded': False}
+        ),
+        'phrase_index': {
+            'loaded': inference_service.phrase_index is not None,
+            'phrases': len(inference_service.phrase_index) if inference_service.phrase_index else 0
         },
         'available_signs': list(inference_service.avatar_generator.sign_to_animation.keys())
     })
 
+@app.route('/models/reload', methods=['POST'])
+def reload_models():
+    """Load and warm up a model version in the background, then swap it in"""
+    data = request.get_json(silent=True) or {}
+    version = data.get('version')
+    
+    if version is not None and version not in list_model_versions() and version != LEGACY_VERSION:
+        return jsonify({'error': f'Unknown model version: {version}'}), 404
+    
+    if not inference_service.reload_models_async(version):
+        return jsonify({'error': 'A model reload is already in progress'}), 409
+    
+    return jsonify({
+        'success': True,
+        'active_version': inference_service.active_bundle.version,
+        'requested_version': version or 'latest'
+    }), 202
+
+@app.route('/recognize/frames', methods=['POST'])
+def recognize_frames():
+    """Push landmark frames for a recognition session and return its latest result
+
+    Without a sessionId a new session is opened. The call waits briefly for the
+    classification that includes the pushed frames.
+    """
+    try:
+        data = request.get_json()
+        frames = data.get('frames', data.get('frame'))
+        if frames is None:
+            return jsonify({'error': 'Landmark frames are required'}), 400
+        
+        session_id = data.get('sessionId') or recognizer.open_session()
+        seq = recognizer.push(session_id, frames)
+        wait = min(float(data.get('wait', RECOGNITION_WAIT_SECONDS)), 1.0)
+        seq, result = recognizer.wait_for_result(session_id, seq, wait)
+        
+        return jsonify({'success': True, 'sessionId': session_id, 'result': result})
+        
+    except KeyError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        logger.error(f"Recognition error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/signs/lookup', methods=['POST'])
+def lookup_sign():
+    """Find the library signs closest to an example landmark sequence"""
+    try:
+        data = request.get_json()
+        frames = data.get('frames')
+        
+        if not frames:
+            return jsonify({'error': 'Landmark frames are required'}), 400
+        
+        sign_index = inference_service.sign_index
+        if sign_index is None:
+            return jsonify({'error': 'Sign index not built'}), 503
+        
+        top_k = parse_top_k(data.get('topK', 5))
+        if top_k is None:
+            return jsonify({'error': 'topK must be a positive integer'}), 400
+        nprobe = parse_positive_int(data.get('nprobe', 4))
+        if nprobe is None:
+            return jsonify({'error': 'nprobe must be a positive integer'}), 400
+        
+        try:
+            frames = np.asarray(frames, dtype=np.float32)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Landmark frames must be numeric'}), 400
+        if frames.ndim != 2 or frames.shape[1] != 126:
+            return jsonify({'error': f'Expected (frames, 126) landmarks, got shape {frames.shape}'}), 400
+        
+        result = sign_index.query(frames, k=top_k, nprobe=nprobe)
+        return jsonify({'success': True, **result})
+        
+    except Exception as e:
+        logger.error(f"Sign lookup error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/recognize/sessions/<session_id>', methods=['DELETE'])
+def close_recognition_session(session_id):
+    """End a recognition session"""
+    recognizer.close_session(session_id)
+    return jsonify({'success': True})
+
+if sock is not None:
+    @sock.route('/recognize/stream')
+    def recognize_stream(ws):
+        """Persistent recognition session over a websocket
+
+        Each message is JSON with ``frame`` (126 values) or ``frames`` (a list
+        of them); a result message is sent whenever a new window is classified.
+        """
+        session_id = recognizer.open_session()
+        ws.send(json.dumps({'sessionId': session_id}))
+        seq = 0
+        try:
+            while True:
+                message = ws.receive(timeout=recognizer.tick_interval)
+                if message is not None:
+                    data = json.loads(message)
+                    try:
+                        recognizer.push(session_id, data.get('frames', data.get('frame')))
+                    except ValueError as e:
+                        ws.send(json.dumps({'error': str(e)}))
+                        continue
+                
+                seq, result = recognizer.wait_for_result(session_id, seq, 0)
+                if result is not None:
+                    ws.send(json.dumps({'sessionId': session_id, 'result': result}))
+        except (ConnectionClosed, KeyError):
+            # Client went away, or the session expired while idle
+            pass
+        finally:
+            recognizer.close_session(session_id)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5001, debug=False)
\ No newline at end of file
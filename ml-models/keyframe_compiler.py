@@ -0,0 +1,259 @@
+"""
+Offline keyframe compiler for sign animations
+Simplifies each sign's hand tracks within a positional error bound
+(Ramer-Douglas-Peucker over time) and quantizes coordinates to 16 bits, for
+sign_mappings.json and exported avatar animations
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import base64
+import json
+from pathlib import Path
+import logging
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ANIMATION_HANDS = ('right_hand', 'left_hand')
+DEFAULT_TOLERANCE = 0.005
+QUANTIZATION_LEVELS = 65535
+MAX_SIMPLIFY_PASSES = 8
+COMPILED_MAPPINGS_NAME = "sign_mappings.compiled.json"
+
+# ==== Tracks ==== #
+
+def keyframe_tracks(keyframes):
+    """(times, points) arrays for keyframes; points are (n, hands, 3)"""
+    times = np.array([keyframe['time'] for keyframe in keyframes], dtype=np.float64)
+    points = np.array([
+        [keyframe.get(hand, [0, 0, 0]) for hand in ANIMATION_HANDS] for keyframe in keyframes
+    ], dtype=np.float64)
+    return times, points
+
+def interpolate_tracks(times, points, at):
+    """Linearly interpolate (n, hands, 3) tracks at the given times"""
+    flat = points.reshape(len(points), -1)
+    result = np.stack([np.interp(at, times, flat[:, column]) for column in range(flat.shape[1])], axis=1)
+    return result.reshape(len(at), *points.shape[1:])
+
+def simplify_keyframes(times, points, tolerance):
+    """Indices of keyframes to keep so no hand deviates more than ``tolerance``
+
+    Time-parametric Ramer-Douglas-Peucker: a dropped keyframe's error is the
+    distance from its position to the linear interpolation between the kept
+    neighbours at the same time, taken over both hands' xyz tracks.
+    """
+    n = len(times)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        span = times[end] - times[start]
+        fraction = (times[start + 1:end] - times[start]) / span if span > 0 else np.zeros(end - start - 1)
+        expected = points[start] + fraction[:, None, None] * (points[end] - points[start])
+        errors = np.linalg.norm(points[start + 1:end] - expected, axis=-1).max(axis=1)
+        worst = int(np.argmax(errors))
+        if errors[worst] > tolerance:
+            split = start + 1 + worst
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+# ==== Quantization ==== #
+
+def quantize(points):
+    """16-bit quantization over the points' bounding box: (codes, origin, scale)"""
+    flat = points.reshape(-1, 3)
+    origin = flat.min(axis=0)
+    scale = (flat.max(axis=0) - origin) / QUANTIZATION_LEVELS
+    codes = np.zeros(flat.shape, dtype=np.uint16)
+    nonzero = scale > 0
+    codes[:, nonzero] = np.round((flat[:, nonzero] - origin[nonzero]) / scale[nonzero])
+    return codes.reshape(points.shape), origin, scale
+
+def dequantize(codes, origin, scale):
+    return origin + codes.astype(np.float64) * scale
+
+def encode_codes(codes):
+    return base64.b64encode(codes.astype('<u2').tobytes()).decode('ascii')
+
+def decode_codes(data):
+    return np.frombuffer(base64.b64decode(data), dtype='<u2').reshape(-1, 3)
+
+# ==== Compilation ==== #
+
+def encode_entry(times, points, kept, duration, exact_times=False):
+    """Compiled entry for the kept keyframes; times in whole ms unless ``exact_times``"""
+    codes, origin, scale = quantize(points[kept])
+    entry = {
+        'duration': duration,
+        'times': [float(t * 1000.0) if exact_times else int(round(t * 1000.0)) for t in times[kept]],
+        'origin': [float(f"{v:.7g}") for v in origin],
+        'scale': [float(f"{v:.7g}") for v in scale]
+    }
+    for hand_index, hand in enumerate(ANIMATION_HANDS):
+        entry[hand] = encode_codes(codes[:, hand_index])
+    return entry
+
+def measure_error(entry, times, points):
+    """Largest distance between the original keyframes and the decoded entry at their times"""
+    if not len(points):
+        return 0.0
+    decoded_times, decoded_points = decode_tracks(entry)
+    reconstructed = interpolate_tracks(decoded_times, decoded_points, times)
+    return float(np.linalg.norm(reconstructed - points, axis=-1).max())
+
+def compile_keyframes(keyframes, duration, tolerance=DEFAULT_TOLERANCE, time_offset=0.0):
+    """Compile keyframes into a compact sign entry; returns (entry, max_error)
+
+    The quantization error is budgeted out of ``tolerance`` before
+    simplification. Rounding times to milliseconds can still push the measured
+    error (against the original keyframes) over the bound; times are then
+    stored unrounded, and only if that is not enough is the simplification
+    re-run with a tighter budget until it fits.
+    """
+    times, points = keyframe_tracks(sorted(keyframes, key=lambda keyframe: keyframe['time']))
+    times = times - time_offset
+    _, origin, scale = quantize(points)
+    budget = max(tolerance - float(np.linalg.norm(scale / 2.0)), 0.0)
+
+    exact_times = False
+    for _ in range(MAX_SIMPLIFY_PASSES):
+        kept = simplify_keyframes(times, points, budget)
+        entry = encode_entry(times, points, kept, duration, exact_times)
+        max_error = measure_error(entry, times, points)
+        if max_error > tolerance and not exact_times:
+            # On dense tracks the rounding alone breaks the bound; exact times
+            # at the same budget keep far fewer keyframes than a tighter budget
+            exact_times = True
+            entry = encode_entry(times, points, kept, duration, exact_times)
+            max_error = measure_error(entry, times, points)
+        if max_error <= tolerance or budget == 0.0:
+            break
+        # Tighten by at least the overshoot, and by a quarter to converge quickly
+        budget = max(min(budget - (max_error - tolerance), budget * 0.75), 0.0)
+    return entry, max_error
+
+def decode_tracks(entry):
+    """(times in seconds, (n, hands, 3) points) of a compiled entry"""
+    times = np.array(entry['times'], dtype=np.float64) / 1000.0
+    origin = np.array(entry['origin'])
+    scale = np.array(entry['scale'])
+    points = np.stack([dequantize(decode_codes(entry[hand]), origin, scale) for hand in ANIMATION_HANDS], axis=1)
+    return times, points
+
+def decode_sign(entry, time_offset=0.0):
+    """Expand a compiled entry back into the sign_mappings keyframe format"""
+    times, points = decode_tracks(entry)
+    keyframes = [
+        dict({'time': round(float(t) + time_offset, 6)},
+             **{hand: [round(float(v), 5) for v in point[hand_index]] for hand_index, hand in enumerate(ANIMATION_HANDS)})
+        for t, point in zip(times, points)
+    ]
+    return {'keyframes': keyframes, 'duration': entry['duration']}
+
+def compact_size(value):
+    return len(json.dumps(value, separators=(',', ':')))
+
+def compile_sign_mappings(mappings, tolerance=DEFAULT_TOLERANCE):
+    """Compile every sign of a mapping dict; returns (compiled, report)"""
+    compiled = {}
+    signs = {}
+    for sign, animation in mappings.items():
+        if not animation.get('keyframes'):
+            continue
+        entry, max_error = compile_keyframes(animation['keyframes'], animation['duration'], tolerance)
+        compiled[sign] = entry
+        signs[sign] = {
+            'keyframes': len(animation['keyframes']),
+            'kept_keyframes': len(entry['times']),
+            'bytes': compact_size(animation),
+            'compiled_bytes': compact_size(entry),
+            'max_error': round(max_error, 6)
+        }
+    return compiled, summarize(signs, tolerance)
+
+def compile_animation(animation_data, tolerance=DEFAULT_TOLERANCE):
+    """Compile the signs of a generate_avatar_animation result; returns (compiled, report)"""
+    compiled = dict(animation_data, encoding='keyframes-u16', signs=[])
+    signs = {}
+    for position, sign_data in enumerate(animation_data['signs']):
+        duration = sign_data['end_time'] - sign_data['start_time']
+        entry, max_error = compile_keyframes(sign_data['keyframes'], duration, tolerance,
+                                             time_offset=sign_data['start_time'])
+        compiled['signs'].append(dict(entry, sign=sign_data['sign'],
+                                      start_time=sign_data['start_time'], end_time=sign_data['end_time']))
+        signs[f"{position}:{sign_data['sign']}"] = {
+            'keyframes': len(sign_data['keyframes']),
+            'kept_keyframes': len(entry['times']),
+            'bytes': compact_size(sign_data),
+            'compiled_bytes': compact_size(entry),
+            'max_error': round(max_error, 6)
+        }
+    return compiled, summarize(signs, tolerance)
+
+def summarize(signs, tolerance):
+    total = sum(stats['bytes'] for stats in signs.values())
+    compiled = sum(stats['compiled_bytes'] for stats in signs.values())
+    return {
+        'tolerance': tolerance,
+        'signs': signs,
+        'bytes': total,
+        'compiled_bytes': compiled,
+        'size_reduction': round(1.0 - compiled / total, 4) if total else 0.0,
+        'max_error': max((stats['max_error'] for stats in signs.values()), default=0.0)
+    }
+
+def load_compiled_mappings(path):
+    """Load a compiled mapping file as regular keyframe mappings"""
+    with open(path, 'r', encoding='utf-8') as f:
+        compiled = json.load(f)
+    return {sign: decode_sign(entry) for sign, entry in compiled['signs'].items()}
+
+def main():
+    """Compile sign_mappings.json (or an exported animation) from the command line"""
+    parser = argparse.ArgumentParser(description="Keyframe reduction and 16-bit quantization for sign animations")
+    parser.add_argument('--mappings', default="ml-models/data/sign_mappings.json", help="Sign mapping file")
+    parser.add_argument('--animation', help="Compile an exported animation JSON instead of the mappings")
+    parser.add_argument('--output', help=f"Output file (default: {COMPILED_MAPPINGS_NAME} next to the input)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Maximum positional error per hand, in animation units")
+    parser.add_argument('--report', default="ml-models/logs/keyframe_compilation.json", help="Report file")
+    args = parser.parse_args()
+
+    source = Path(args.animation or args.mappings)
+    with open(source, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if args.animation:
+        compiled, report = compile_animation(data, args.tolerance)
+        output = Path(args.output or source.with_suffix('.compiled.json'))
+    else:
+        signs, report = compile_sign_mappings(data, args.tolerance)
+        compiled = {'encoding': 'keyframes-u16', 'tolerance': args.tolerance, 'signs': signs}
+        output = Path(args.output or source.with_name(COMPILED_MAPPINGS_NAME))
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(compiled, f, separators=(',', ':'))
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for sign, stats in report['signs'].items():
+        logger.info(f"{sign}: {stats['keyframes']} -> {stats['kept_keyframes']} keyframes, "
+                    f"{stats['bytes']} -> {stats['compiled_bytes']} bytes, max error {stats['max_error']}")
+    logger.info(f"Compiled {len(report['signs'])} signs to {output}: {report['bytes']} -> {report['compiled_bytes']} bytes "
+                f"({report['size_reduction']:.1%} smaller), max error {report['max_error']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Precompiled lesson animation bundles
+Translates every phrase of a lesson catalogue once and packs each lesson into a
+single indexed file of compressed animation blobs that a static host (or the
+inference server) can serve with range requests
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import hashlib
+import json
+import struct
+import zlib
+from pathlib import Path
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUNDLE_DIR = "ml-models/data/lesson_bundles"
+BUNDLE_MAGIC = b'ISLB'
+BUNDLE_FORMAT_VERSION = 1
+# magic, format version, index length: the index follows, then the blobs
+BUNDLE_HEADER = struct.Struct('<4sHI')
+
+def content_hash(data, digest_size=16):
+    return hashlib.blake2b(data, digest_size=digest_size).hexdigest()
+
+def load_catalogue(path):
+    """Lessons as [{'id', 'title', 'phrases'}] from a catalogue JSON
+
+    Accepts a list of lessons, ``{"lessons": [...]}`` or ``{lesson_id: [phrases]}``.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        catalogue = json.load(f)
+    if isinstance(catalogue, dict) and 'lessons' in catalogue:
+        catalogue = catalogue['lessons']
+    if isinstance(catalogue, dict):
+        catalogue = [{'id': lesson_id, 'phrases': phrases} for lesson_id, phrases in catalogue.items()]
+    return [
+        {'id': str(lesson['id']), 'title': lesson.get('title', str(lesson['id'])), 'phrases': list(lesson['phrases'])}
+        for lesson in catalogue
+    ]
+
+# ==== Translation ==== #
+
+def local_translator(top_k=1):
+    """Translate with an in-process inference service (loads the active models)"""
+    from inference_server import inference_service
+
+    def translate(phrase):
+        translation = inference_service.translate_text_to_isl(phrase, top_k=top_k)
+        return {
+            'translation': translation,
+            'animation': inference_service.generate_avatar_animation(translation['signs'])
+        }
+    return translate
+
+def server_translator(server_url, top_k=1):
+    """Translate through a running inference server's /translate/text"""
+    import requests
+
+    def translate(phrase):
+        response = requests.post(f"{server_url.rstrip('/')}/translate/text",
+                                 json={'text': phrase, 'topK': top_k}, timeout=30)
+        response.raise_for_status()
+        result = response.json()
+        return {'translation': result['translation'], 'animation': result['animation']}
+    return translate
+
+def translate_catalogue(lessons, translate):
+    """Translate each distinct phrase of the catalogue exactly once"""
+    results = {}
+    for lesson in lessons:
+        for phrase in lesson['phrases']:
+            if phrase not in results:
+                results[phrase] = translate(phrase)
+    logger.info(f"Translated {len(results)} distinct phrases for {len(lessons)} lessons")
+    return results
+
+# ==== Bundles ==== #
+
+def pack_bundle(lesson, results):
+    """Bundle bytes and index for one lesson
+
+    Each phrase's result is compact JSON compressed on its own, so a client can
+    fetch and inflate a single blob with a range request. Identical blobs are
+    stored once. Index offsets are relative to the end of the index.
+    """
+    entries = []
+    blobs = []
+    offsets = {}
+    position = 0
+    for phrase in lesson['phrases']:
+        payload = json.dumps(results[phrase], separators=(',', ':'), ensure_ascii=False)
+        blob = zlib.compress(payload.encode('utf-8'), 9)
+        digest = content_hash(blob)
+        if digest not in offsets:
+            offsets[digest] = position
+            blobs.append(blob)
+            position += len(blob)
+        entries.append({'phrase': phrase, 'offset': offsets[digest], 'length': len(blob), 'hash': digest})
+
+    index = {
+        'lesson': lesson['id'],
+        'title': lesson['title'],
+        'encoding': 'zlib+json',
+        'entries': entries
+    }
+    index_bytes = json.dumps(index, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    header = BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, len(index_bytes))
+    return header + index_bytes + b''.join(blobs), index
+
+def read_bundle_index(path):
+    """(index, offset of the blob section) of a bundle file"""
+    with open(path, 'rb') as f:
+        magic, version, index_length = BUNDLE_HEADER.unpack(f.read(BUNDLE_HEADER.size))
+        if magic != BUNDLE_MAGIC or version != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Not a version {BUNDLE_FORMAT_VERSION} lesson bundle: {path}")
+        index = json.loads(f.read(index_length).decode('utf-8'))
+    return index, BUNDLE_HEADER.size + index_length
+
+def read_bundle_entry(path, phrase):
+    """Decode one phrase's result from a bundle, reading only its blob"""
+    index, data_start = read_bundle_index(path)
+    entry = next((entry for entry in index['entries'] if entry['phrase'] == phrase), None)
+    if entry is None:
+        raise KeyError(f"Phrase not in bundle: {phrase}")
+    with open(path, 'rb') as f:
+        f.seek(data_start + entry['offset'])
+        return json.loads(zlib.decompress(f.read(entry['length'])).decode('utf-8'))
+
+def load_bundle_manifest(bundle_dir=DEFAULT_BUNDLE_DIR):
+    manifest_path = Path(bundle_dir) / "manifest.json"
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def build_lesson_bundles(catalogue_path, bundle_dir=DEFAULT_BUNDLE_DIR, translate=None):
+    """Write one content-addressed bundle per lesson and the manifest that names them
+
+    Bundle files are named ``<lesson>.<hash>.islb`` and never rewritten, so they
+    can be cached indefinitely; the manifest is replaced last, atomically.
+    Superseded bundles of rebuilt lessons are removed afterwards.
+    """
+    bundle_dir = Path(bundle_dir)
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    lessons = load_catalogue(catalogue_path)
+    results = translate_catalogue(lessons, translate or local_translator())
+
+    previous = load_bundle_manifest(bundle_dir)
+    manifest = {}
+    for lesson in lessons:
+        data, index = pack_bundle(lesson, results)
+        digest = content_hash(data)
+        filename = f"{lesson['id']}.{digest[:12]}.islb"
+        path = bundle_dir / filename
+        if not path.exists():
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        manifest[lesson['id']] = {
+            'file': filename,
+            'hash': digest,
+            'bytes': len(data),
+            'phrases': len(index['entries'])
+        }
+        logger.info(f"Lesson {lesson['id']}: {len(index['entries'])} phrases, {len(data)} bytes -> {filename}")
+
+    tmp_manifest = bundle_dir / "manifest.json.tmp"
+    with open(tmp_manifest, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_manifest, bundle_dir / "manifest.json")
+
+    current = {entry['file'] for entry in manifest.values()}
+    for entry in previous.values():
+        if entry['file'] not in current:
+            (bundle_dir / entry['file']).unlink(missing_ok=True)
+    return manifest
+
+def main():
+    """Build lesson bundles from the command line"""
+    parser = argparse.ArgumentParser(description="Precompile lesson animation bundles")
+    parser.add_argument('catalogue', help="Lesson catalogue JSON")
+    parser.add_argument('--bundle-dir', default=DEFAULT_BUNDLE_DIR, help="Output directory")
+    parser.add_argument('--server', help="Translate through a running inference server instead of loading the models")
+    args = parser.parse_args()
+
+    translate = server_translator(args.server) if args.server else local_translator()
+    manifest = build_lesson_bundles(args.catalogue, args.bundle_dir, translate)
+    logger.info(f"Built {len(manifest)} lesson bundles in {args.bundle_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Load testing harness for the ISL inference server
+Drives a synthetic traffic mix against a local server and reports throughput,
+latency percentiles, error rates and server memory over time
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import base64
+import io
+import itertools
+import json
+import random
+import subprocess
+import threading
+import time
+import wave
+from urllib.parse import urlparse
+from pathlib import Path
+import logging
+
+import numpy as np
+import requests
+
+from data_preparation import ISL_VOCABULARY
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '::1'}
+
+ENDPOINTS = {
+    'text': '/translate/text',
+    'speech': '/translate/speech',
+    'avatar': '/avatar/preview'
+}
+
+DEFAULT_PROFILE = "ml-models/load_profiles/default.json"
+
+def load_profile(profile_path):
+    """Load a traffic profile and check it only targets localhost"""
+    with open(profile_path, 'r', encoding='utf-8') as f:
+        profile = json.load(f)
+
+    host = urlparse(profile.get('base_url', 'http://localhost:5001')).hostname
+    if host not in LOCAL_HOSTS:
+        raise ValueError(f"Load tests must target localhost, got '{host}'")
+
+    unknown = set(profile.get('mix', {})) - set(ENDPOINTS)
+    if unknown:
+        raise ValueError(f"Unknown endpoints in traffic mix: {sorted(unknown)}")
+
+    return profile
+
+def read_rss_mb(pid):
+    """Read resident set size of a process from /proc, in MB"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        return None
+    return None
+
+class SyntheticTrafficGenerator:
+    """Generate request payloads from the synthetic ISL vocabulary"""
+
+    def __init__(self, profile, vocabulary=ISL_VOCABULARY):
+        self.rng = random.Random(profile.get('seed', 42))
+        self.np_rng = np.random.default_rng(profile.get('seed', 42))
+        self.audio_config = profile.get('audio', {})
+        self.avatar_config = profile.get('avatar', {})
+
+        # Phrase pool with Zipf weights so a few phrases dominate, as in real lessons
+        self.phrases = [
+            (variation, sign)
+            for sign, variations in vocabulary.items()
+            for variation in variations
+        ]
+        self.rng.shuffle(self.phrases)
+        exponent = profile.get('zipf_exponent', 1.1)
+        weights = [1.0 / (rank ** exponent) for rank in range(1, len(self.phrases) + 1)]
+        self.phrase_cum_weights = list(itertools.accumulate(weights))
+        self.signs = list(vocabulary.keys())
+
+        # Pre-render the WAV pool so payload generation does not skew client timings
+        self.audio_pool = [
+            self.synthesize_wav_base64() for _ in range(self.audio_config.get('pool_size', 64))
+        ]
+
+    def synthesize_wav_base64(self):
+        """Render a speech-like int16 WAV clip and return it base64 encoded"""
+        sample_rate = self.audio_config.get('sample_rate', 16000)
+        duration = self.np_rng.uniform(
+            self.audio_config.get('min_duration', 1.0),
+            self.audio_config.get('max_duration', 3.0)
+        )
+        t = np.arange(int(sample_rate * duration)) / sample_rate
+
+        # A few formant-like tones under a syllable-rate envelope plus noise
+        formants = self.np_rng.uniform(150, 3000, size=3)
+        signal = sum(np.sin(2 * np.pi * f * t) for f in formants) / len(formants)
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * self.np_rng.uniform(2, 6) * t))
+        signal = signal * envelope + 0.05 * self.np_rng.standard_normal(t.shape)
+        pcm = (np.clip(signal, -1.0, 1.0) * 32767 * 0.8).astype(np.int16)
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm.tobytes())
+        return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    def payload(self, endpoint, rng):
+        """Build a request body for the given endpoint"""
+        if endpoint == 'text':
+            text, _ = rng.choices(self.phrases, cum_weights=self.phrase_cum_weights)[0]
+            return {'text': text}
+        if endpoint == 'speech':
+            return {'audio': rng.choice(self.audio_pool)}
+        count = rng.randint(self.avatar_config.get('min_signs', 1), self.avatar_config.get('max_signs', 4))
+        return {'signs': rng.sample(self.signs, count)}
+
+class RSSSampler(threading.Thread):
+    """Sample server RSS at a fixed interval in the background"""
+
+    def __init__(self, pid, interval=1.0):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stop_event = threading.Event()
+        self.start_time = time.perf_counter()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            rss = read_rss_mb(self.pid)
+            if rss is not None:
+                self.samples.append({'t': round(time.perf_counter() - self.start_time, 3), 'rss_mb': round(rss, 2)})
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+class LoadTestRunner:
+    """Run staged closed-loop load against the inference server"""
+
+    def __init__(self, profile, server_pid=None):
+        self.profile = profile
+        self.base_url = profile.get('base_url', 'http://localhost:5001').rstrip('/')
+        self.timeout = profile.get('timeout', 30)
+        self.think_time = profile.get('think_time', 0.0)
+        self.generator = SyntheticTrafficGenerator(profile)
+        self.server_pid = server_pid
+
+        mix = profile.get('mix', {'text': 1.0})
+        self.mix_endpoints = list(mix.keys())
+        self.mix_weights = list(mix.values())
+
+    def client_loop(self, client_id, deadline, records, lock):
+        """Issue requests back-to-back until the stage deadline"""
+        rng = random.Random(f"{self.profile.get('seed', 42)}-{client_id}")
+        session = requests.Session()
+        local_records = []
+
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(self.mix_endpoints, weights=self.mix_weights)[0]
+            body = self.generator.payload(endpoint, rng)
+
+            start = time.perf_counter()
+            try:
+                response = session.post(self.base_url + ENDPOINTS[endpoint], json=body, timeout=self.timeout)
+                ok = response.status_code == 200
+                status = response.status_code
+            except requests.RequestException as e:
+                ok = False
+                status = type(e).__name__
+            latency = time.perf_counter() - start
+
+            local_records.append((endpoint, latency, ok, status))
+            if self.think_time:
+                time.sleep(self.think_time)
+
+        session.close()
+        with lock:
+            records.extend(local_records)
+
+    def run_stage(self, concurrency, duration):
+        """Run one stage with a fixed number of concurrent clients"""
+        logger.info(f"Stage: {concurrency} clients for {duration}s")
+        records = []
+        lock = threading.Lock()
+        start = time.perf_counter()
+        deadline = start + duration
+
+        clients = [
+            threading.Thread(target=self.client_loop, args=(i, deadline, records, lock), daemon=True)
+            for i in range(concurrency)
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+
+        elapsed = time.perf_counter() - start
+        return self.summarize(records, concurrency, elapsed)
+
+    def summarize(self, records, concurrency, elapsed):
+        """Aggregate raw request records into per-endpoint statistics"""
+        summary = {'concurrency': concurrency, 'elapsed': round(elapsed, 3), 'endpoints': {}}
+
+        groups = {'all': records}
+        for endpoint in self.mix_endpoints:
+            groups[endpoint] = [r for r in records if r[0] == endpoint]
+
+        for name, group in groups.items():
+            if not group:
+                continue
+            latencies = np.array([r[1] for r in group]) * 1000.0
+            errors = [r for r in group if not r[2]]
+            error_kinds = {}
+            for r in errors:
+                error_kinds[str(r[3])] = error_kinds.get(str(r[3]), 0) + 1
+
+            p50, p90, p95, p99 = np.percentile(latencies, [50, 90, 95, 99])
+            summary['endpoints'][name] = {
+                'requests': len(group),
+                'throughput_rps': round(len(group) / elapsed, 2),
+                'error_rate': round(len(errors) / len(group), 4),
+                'errors': error_kinds,
+                'latency_ms': {
+                    'mean': round(float(latencies.mean()), 2),
+                    'p50': round(float(p50), 2),
+                    'p90': round(float(p90), 2),
+                    'p95': round(float(p95), 2),
+                    'p99': round(float(p99), 2),
+                    'max': round(float(latencies.max()), 2)
+                }
+            }
+
+        return summary
+
+    def wait_for_server(self, timeout=120):
+        """Poll /health until the server answers"""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            try:
+                if requests.get(self.base_url + '/health', timeout=2).status_code == 200:
+                    return True
+            except requests.RequestException:
+                pass
+            time.sleep(1)
+        return False
+
+    def run(self):
+        """Run every stage in the profile and collect the report"""
+        if not self.wait_for_server():
+            raise RuntimeError(f"Inference server at {self.base_url} did not become healthy")
+
+        sampler = None
+        if self.server_pid:
+            sampler = RSSSampler(self.server_pid, self.profile.get('rss_interval', 1.0))
+            sampler.start()
+
+        stages = []
+        try:
+            for stage in self.profile.get('stages', [{'concurrency': 50, 'duration': 30}]):
+                result = self.run_stage(stage['concurrency'], stage['duration'])
+                if sampler and sampler.samples:
+                    result['rss_mb_at_end'] = sampler.samples[-1]['rss_mb']
+                stages.append(result)
+
+                overall = result['endpoints'].get('all', {})
+                logger.info(
+                    f"  {overall.get('throughput_rps', 0)} req/s, "
+                    f"p50 {overall.get('latency_ms', {}).get('p50')} ms, "
+                    f"p99 {overall.get('latency_ms', {}).get('p99')} ms, "
+                    f"errors {overall.get('error_rate', 0):.2%}"
+                )
+        finally:
+            if sampler:
+                sampler.stop()
+
+        return {
+            'profile': self.profile,
+            'stages': stages,
+            'rss_timeline': sampler.samples if sampler else []
+        }
+
+def main():
+    """Run a load test from the command line"""
+    parser = argparse.ArgumentParser(description="Load test the ISL inference server")
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, help="Traffic profile JSON file")
+    parser.add_argument('--server-pid', type=int, help="PID of a running server to sample RSS from")
+    parser.add_argument('--spawn-server', action='store_true', help="Start a local inference server for the run")
+    parser.add_argument('--output', default="ml-models/logs/load_test_report.json", help="Report output path")
+    args = parser.parse_args()
+
+    profile = load_profile(args.profile)
+
+    server_process = None
+    server_pid = args.server_pid
+    if args.spawn_server:
+        # Serve on the host and port the profile targets
+        target = urlparse(profile.get('base_url', 'http://localhost:5001'))
+        if target.scheme != 'http':
+            parser.error(f"--spawn-server starts a plain HTTP server, profile targets {target.scheme}://")
+        env = dict(os.environ, ISL_SERVER_HOST=target.hostname, ISL_SERVER_PORT=str(target.port or 80))
+        server_script = Path(__file__).parent / "start_inference_server.py"
+        server_process = subprocess.Popen([sys.executable, str(server_script)], env=env)
+        server_pid = server_process.pid
+        logger.info(f"Started inference server on {target.hostname}:{target.port or 80} (pid {server_pid})")
+
+    try:
+        report = LoadTestRunner(profile, server_pid=server_pid).run()
+    finally:
+        if server_process:
+            server_process.terminate()
+            server_process.wait()
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    logger.info(f"Load test report written to {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Batched evaluation of published ISL model versions
+Loads a version's saved artifacts, streams the test set through the models in
+batches, and reports accuracy per class, the confusion pairs and latency and
+throughput per batch size, optionally gated against a baseline report
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import time
+from pathlib import Path
+import logging
+
+import numpy as np
+import tensorflow as tf
+
+from speech_to_isl import ISLDataProcessor, load_sign_table, embedding_input_dim
+from corpus_reader import TextCorpusReader
+from distillation import clamp_token_ids
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZES = (1, 8, 32, 128)
+DEFAULT_REPORT_PATH = "ml-models/logs/evaluation.json"
+DEFAULT_MAX_ACCURACY_DROP = 0.01      # absolute
+DEFAULT_MAX_LATENCY_INCREASE = 0.20   # relative, per batch size
+LATENCY_REPEATS = 30
+
+class ClassificationMetrics:
+    """Streaming confusion counts over a fixed sign table"""
+
+    def __init__(self, signs):
+        self.signs = list(signs)
+        self.confusion = np.zeros((len(self.signs), len(self.signs)), dtype=np.int64)
+        self.unknown_labels = 0
+
+    def update(self, predicted_ids, label_ids):
+        """Add a batch; labels of -1 (not in the sign table) are counted apart"""
+        known = label_ids >= 0
+        self.unknown_labels += int(np.count_nonzero(~known))
+        np.add.at(self.confusion, (label_ids[known], predicted_ids[known]), 1)
+
+    def summary(self):
+        support = self.confusion.sum(axis=1)
+        predicted = self.confusion.sum(axis=0)
+        correct = np.diag(self.confusion)
+        total = int(support.sum())
+        per_class = {
+            sign: {
+                'support': int(support[i]),
+                'accuracy': round(float(correct[i] / support[i]), 4) if support[i] else None,
+                'precision': round(float(correct[i] / predicted[i]), 4) if predicted[i] else None
+            }
+            for i, sign in enumerate(self.signs) if support[i] or predicted[i]
+        }
+        # Off-diagonal cells only, most frequent confusions first
+        true_ids, predicted_ids = np.nonzero(self.confusion * (1 - np.eye(len(self.signs), dtype=np.int64)))
+        confusions = sorted(
+            ([self.signs[t], self.signs[p], int(self.confusion[t, p])] for t, p in zip(true_ids, predicted_ids)),
+            key=lambda cell: -cell[2]
+        )
+        return {
+            'samples': total,
+            'unknown_label_samples': self.unknown_labels,
+            'accuracy': round(float(correct.sum() / total), 4) if total else None,
+            'per_class': per_class,
+            'confusions': confusions
+        }
+
+def map_labels(labels, sign_table):
+    """Indices of label names in a sign table, -1 where absent"""
+    class_index = {sign: idx for idx, sign in enumerate(sign_table)}
+    return np.array([class_index.get(label, -1) for label in labels], dtype=np.int64)
+
+# ==== Test set streams ==== #
+
+def text_batches(test_dir, vocabulary, signs, vocab_limit, batch_size):
+    """Yield (token_ids, label_ids) batches from the text test files"""
+    reader = TextCorpusReader(vocabulary, chunk_size=batch_size)
+    unk_idx = vocabulary.get('<UNK>', 0)
+    for token_ids, label_ids in reader.iter_chunks(sorted(Path(test_dir).glob("text_data/*.txt"))):
+        if vocab_limit is not None:
+            token_ids = clamp_token_ids(token_ids, vocab_limit, unk_idx)
+        yield token_ids, map_labels(reader.label_names()[label_ids], signs)
+
+def speech_batches(test_dir, data_processor, signs, batch_size):
+    """Yield (mfcc_features, label_ids) batches from the audio test files"""
+    features, labels = [], []
+    for audio_file in sorted(Path(test_dir).glob("audio_data/**/*.wav")):
+        mfccs = data_processor.extract_audio_features(str(audio_file))
+        if mfccs is None:
+            continue
+        features.append(mfccs)
+        labels.append(audio_file.stem.split('_')[0])
+        if len(features) == batch_size:
+            yield np.array(features, dtype=np.float32), map_labels(labels, signs)
+            features, labels = [], []
+    if features:
+        yield np.array(features, dtype=np.float32), map_labels(labels, signs)
+
+# ==== Evaluation ==== #
+
+def measure_batch_latency(model, sample, batch_sizes, repeats=LATENCY_REPEATS):
+    """p50/p95 latency and throughput of direct model calls per batch size"""
+    results = {}
+    for batch_size in batch_sizes:
+        batch = np.resize(sample, (batch_size,) + sample.shape[1:])
+        model(batch, training=False)  # trace once before timing
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(batch, training=False)
+            timings.append(time.perf_counter() - start)
+        p50 = float(np.median(timings))
+        results[str(batch_size)] = {
+            'latency_ms_p50': round(p50 * 1000.0, 3),
+            'latency_ms_p95': round(float(np.percentile(timings, 95)) * 1000.0, 3),
+            'samples_per_sec': round(batch_size / p50, 1)
+        }
+    return results
+
+def evaluate_stream(model, signs, batches, batch_sizes):
+    """Accuracy over a batch stream, then latency per batch size on its first batch"""
+    metrics = ClassificationMetrics(signs)
+    sample = None
+    start = time.perf_counter()
+    for inputs, label_ids in batches:
+        if sample is None:
+            sample = np.array(inputs)
+        predictions = model(inputs, training=False).numpy()
+        metrics.update(np.argmax(predictions, axis=-1), label_ids)
+    elapsed = time.perf_counter() - start
+
+    summary = metrics.summary()
+    if sample is None:
+        return None
+    summary['evaluation_seconds'] = round(elapsed, 3)
+    summary['batches'] = measure_batch_latency(model, sample, batch_sizes)
+    return summary
+
+def evaluate_version(version_dir, test_dir, batch_sizes=DEFAULT_BATCH_SIZES, report_path=None):
+    """Evaluate the text and speech models saved in a version directory"""
+    version_dir = Path(version_dir)
+    data_processor = ISLDataProcessor()
+    vocabulary_path = version_dir / "vocabulary.json"
+    if vocabulary_path.exists():
+        with open(vocabulary_path, 'r', encoding='utf-8') as f:
+            vocabulary = json.load(f)
+    else:
+        vocabulary = data_processor.load_vocabulary()
+
+    report = {'version': version_dir.name, 'test_dir': str(test_dir), 'batch_sizes': list(batch_sizes), 'models': {}}
+    stream_batch_size = max(batch_sizes)
+
+    text_model_path = version_dir / "text_to_isl_model.h5"
+    if text_model_path.exists():
+        model = tf.keras.models.load_model(text_model_path)
+        signs = load_sign_table(version_dir / "text_sign_table.json")
+        batches = text_batches(test_dir, vocabulary, signs, embedding_input_dim(model), stream_batch_size)
+        report['models']['text'] = evaluate_stream(model, signs, batches, batch_sizes)
+
+    speech_model_path = version_dir / "speech_to_isl_model.h5"
+    if speech_model_path.exists():
+        model = tf.keras.models.load_model(speech_model_path)
+        signs = load_sign_table(version_dir / "speech_sign_table.json")
+        batches = speech_batches(test_dir, data_processor, signs, stream_batch_size)
+        report['models']['speech'] = evaluate_stream(model, signs, batches, batch_sizes)
+
+    report['models'] = {name: result for name, result in report['models'].items() if result is not None}
+    for name, result in report['models'].items():
+        logger.info(f"{name}: accuracy {result['accuracy']} on {result['samples']} samples, "
+                    + ", ".join(f"batch {size}: {stats['latency_ms_p50']} ms / {stats['samples_per_sec']} samples/s"
+                                for size, stats in result['batches'].items()))
+
+    if report_path is not None:
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+def check_regressions(report, baseline, max_accuracy_drop=DEFAULT_MAX_ACCURACY_DROP,
+                      max_latency_increase=DEFAULT_MAX_LATENCY_INCREASE):
+    """Failures of a report against a baseline report (empty when it passes)"""
+    failures = []
+    for name, base in baseline['models'].items():
+        current = report['models'].get(name)
+        if current is None:
+            failures.append(f"{name}: model missing from this evaluation")
+            continue
+        if base['accuracy'] is not None and current['accuracy'] is not None:
+            drop = base['accuracy'] - current['accuracy']
+            if drop > max_accuracy_drop:
+                failures.append(f"{name}: accuracy {current['accuracy']:.4f} is {drop:.4f} below baseline {base['accuracy']:.4f}")
+        for batch_size, base_stats in base['batches'].items():
+            stats = current['batches'].get(batch_size)
+            if stats is None:
+                continue
+            limit = base_stats['latency_ms_p50'] * (1.0 + max_latency_increase)
+            if stats['latency_ms_p50'] > limit:
+                failures.append(f"{name}: batch {batch_size} p50 latency {stats['latency_ms_p50']} ms "
+                                f"exceeds {limit:.3f} ms (baseline {base_stats['latency_ms_p50']} ms)")
+    return failures
+
+def main():
+    """Evaluate a model version from the command line, gating on a baseline"""
+    parser = argparse.ArgumentParser(description="Batched evaluation of a published ISL model version")
+    parser.add_argument('--version-dir', help="Model version directory (default: newest published version)")
+    parser.add_argument('--test-dir', default="ml-models/data/test", help="Test data directory")
+    parser.add_argument('--batch-sizes', default=','.join(map(str, DEFAULT_BATCH_SIZES)),
+                        help="Comma-separated batch sizes to time")
+    parser.add_argument('--report', default=DEFAULT_REPORT_PATH, help="Report file")
+    parser.add_argument('--baseline', help="Baseline report to compare against; exits 1 on regression")
+    parser.add_argument('--save-baseline', help="Also write this report as the new baseline")
+    parser.add_argument('--max-accuracy-drop', type=float, default=DEFAULT_MAX_ACCURACY_DROP,
+                        help="Allowed absolute accuracy drop")
+    parser.add_argument('--max-latency-increase', type=float, default=DEFAULT_MAX_LATENCY_INCREASE,
+                        help="Allowed relative p50 latency increase per batch size")
+    args = parser.parse_args()
+
+    version_dir = args.version_dir
+    if version_dir is None:
+        versions_dir = Path("ml-models/models/versions")
+        published = sorted(p for p in versions_dir.glob("*") if (p / "manifest.json").exists())
+        if not published:
+            parser.error("No published model version to evaluate")
+        version_dir = published[-1]
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+    report = evaluate_version(version_dir, args.test_dir, batch_sizes, args.report)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logger.info(f"Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        failures = check_regressions(report, baseline, args.max_accuracy_drop, args.max_latency_increase)
+        for failure in failures:
+            logger.error(f"Regression: {failure}")
+        if failures:
+            sys.exit(1)
+        logger.info(f"No regressions against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
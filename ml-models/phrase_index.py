@@ -0,0 +1,118 @@
+"""
+Phrase index for dictionary lookups of known ISL phrases
+Maps exact vocabulary phrases straight to signs without running the neural model
+"""
+
+import json
+from pathlib import Path
+import logging
+
+from text_normalization import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PHRASE_INDEX_PATH = "ml-models/data/phrase_index.json"
+
+class PhraseIndex:
+    """Hashed n-gram table with greedy longest-match segmentation"""
+
+    def __init__(self):
+        self.table = {}
+        self.ambiguous = set()
+        self.max_ngram = 0
+
+    def __len__(self):
+        return len(self.table)
+
+    def tokenize(self, text):
+        """Split text into normalized lookup tokens"""
+        return tokenize(text)
+
+    def add(self, text, sign):
+        """Register a phrase; phrases seen with different signs are left to the model"""
+        key = tuple(self.tokenize(text))
+        if not key or key in self.ambiguous:
+            return
+
+        existing = self.table.get(key)
+        if existing is not None and existing != sign:
+            del self.table[key]
+            self.ambiguous.add(key)
+            return
+
+        self.table[key] = sign
+        self.max_ngram = max(self.max_ngram, len(key))
+
+    def segment(self, tokens):
+        """Greedy longest-match over tokens
+
+        Returns spans in order; matched spans carry their sign, unmatched spans
+        have sign None and should be sent to the model.
+        """
+        spans = []
+        unmatched_start = None
+        position = 0
+
+        while position < len(tokens):
+            sign = None
+            for length in range(min(self.max_ngram, len(tokens) - position), 0, -1):
+                sign = self.table.get(tuple(tokens[position:position + length]))
+                if sign is not None:
+                    break
+
+            if sign is None:
+                if unmatched_start is None:
+                    unmatched_start = position
+                position += 1
+                continue
+
+            if unmatched_start is not None:
+                spans.append({'sign': None, 'start': unmatched_start, 'end': position})
+                unmatched_start = None
+            spans.append({'sign': sign, 'start': position, 'end': position + length})
+            position += length
+
+        if unmatched_start is not None:
+            spans.append({'sign': None, 'start': unmatched_start, 'end': len(tokens)})
+
+        return spans
+
+    def add_text_file(self, text_file):
+        """Add every 'text<TAB>sign' line of a training file"""
+        with open(text_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if '\t' in line:
+                    text, sign = line.rstrip('\n').split('\t', 1)
+                    self.add(text, sign.strip())
+
+    def save(self, path):
+        """Write the index as JSON"""
+        data = {
+            'phrases': {' '.join(key): sign for key, sign in self.table.items()},
+            'ambiguous': [' '.join(key) for key in self.ambiguous]
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        logger.info(f"Phrase index with {len(self.table)} phrases saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        index = cls()
+        index.ambiguous = {tuple(phrase.split()) for phrase in data.get('ambiguous', [])}
+        for phrase, sign in data['phrases'].items():
+            key = tuple(phrase.split())
+            index.table[key] = sign
+            index.max_ngram = max(index.max_ngram, len(key))
+        return index
+
+def load_phrase_index(path=DEFAULT_PHRASE_INDEX_PATH):
+    """Load the phrase index if it has been built, else None"""
+    if not Path(path).exists():
+        return None
+    index = PhraseIndex.load(path)
+    logger.info(f"Phrase index loaded ({len(index)} phrases, up to {index.max_ngram} tokens)")
+    return index
@@ -0,0 +1,304 @@
+"""
+Content-addressed sign clip library for concatenative synthesis
+Caches per-sign landmark arrays and video clips loaded by
+slt.models.ConcatenativeSynthesis, so repeated signs are read from local disk
+instead of being re-extracted, and drives parallel batch generation of landmark
+sequences into the training data directories
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import hashlib
+import random
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import logging
+
+import numpy as np
+
+from augmentation import HANDS, HAND_POINTS, stable_int
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIBRARY_DIR = "ml-models/data/sign_library"
+DEFAULT_OUTPUT_DIR = "ml-models/data/train/video_data"
+
+# MediaPipe embeddings in slt: 33 pose points then 2 x 21 hand points, each (x, y, z, visibility, presence)
+POSE_POINTS = 33
+
+def content_digest(data):
+    """blake2b digest used as the object name"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def ref_name(resource):
+    """Flat, filesystem-safe reference file name for an slt resource name"""
+    return resource.replace('/', '__')
+
+def save_npy(path, array):
+    """np.save to an exact path (np.save on a name appends .npy)"""
+    with open(path, 'wb') as f:
+        np.save(f, array)
+
+def to_hand_landmarks(landmarks):
+    """Reduce an slt (frames, 75, features) landmark array to our (frames, 126) hand layout"""
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    if landmarks.ndim == 3 and landmarks.shape[1] == POSE_POINTS + HANDS * HAND_POINTS:
+        hands = landmarks[:, POSE_POINTS:, :3]
+        return np.ascontiguousarray(hands.reshape(len(landmarks), HANDS * HAND_POINTS * 3))
+    return landmarks.reshape(len(landmarks), -1)
+
+class SignClipLibrary:
+    """On-disk cache of per-sign assets, stored once per distinct content
+
+    ``objects/<aa>/<digest>.<ext>`` hold the data and ``refs/<resource>`` hold
+    the digest for each slt resource name, so identical clips under different
+    labels share one object. Every file is written to a temporary name and
+    renamed, so concurrent generation workers can share one library.
+    """
+
+    def __init__(self, root=DEFAULT_LIBRARY_DIR, offline=False):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.refs_dir = self.root / "refs"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.refs_dir.mkdir(parents=True, exist_ok=True)
+        self.offline = offline
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0}
+
+    def object_path(self, digest, extension):
+        return self.objects_dir / digest[:2] / f"{digest}{extension}"
+
+    def lookup(self, resource):
+        """Object path cached for an slt resource name, or None"""
+        ref_path = self.refs_dir / ref_name(resource)
+        if not ref_path.exists():
+            return None
+        object_name = ref_path.read_text(encoding='utf-8').strip()
+        path = self.objects_dir / object_name[:2] / object_name
+        return path if path.exists() else None
+
+    def write_atomic(self, path, write):
+        """Write through a temporary file in the same directory, then rename"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def store_bytes(self, resource, data, extension):
+        """Store raw asset bytes under their content digest and reference them"""
+        digest = content_digest(data)
+        path = self.object_path(digest, extension)
+        if not path.exists():
+            self.write_atomic(path, lambda tmp: tmp.write_bytes(data))
+            self.stats['stored'] += 1
+        self.write_atomic(self.refs_dir / ref_name(resource), lambda tmp: tmp.write_text(path.name, encoding='utf-8'))
+        return path
+
+    def store_landmarks(self, resource, landmarks):
+        """Store a landmark array as a float32 .npy object"""
+        array = np.ascontiguousarray(landmarks, dtype=np.float32)
+        header = f"{array.shape}".encode('ascii')
+        digest = content_digest(header + array.tobytes())
+        path = self.object_path(digest, ".npy")
+        if not path.exists():
+            self.write_atomic(path, lambda tmp: save_npy(tmp, array))
+            self.stats['stored'] += 1
+        self.write_atomic(self.refs_dir / ref_name(resource), lambda tmp: tmp.write_text(path.name, encoding='utf-8'))
+        return path
+
+    def store_file(self, resource, file_path):
+        """Store an extracted slt asset file"""
+        file_path = Path(file_path)
+        if file_path.suffix == '.mp4':
+            return self.store_bytes(resource, file_path.read_bytes(), '.mp4')
+        import sign_language_translator as slt
+        return self.store_landmarks(resource, slt.Landmarks.load(str(file_path)).numpy())
+
+    def load(self, model, label):
+        """Sign object for a label, loading (and caching) it through slt on a miss"""
+        import sign_language_translator as slt
+
+        resource = model._prepare_resource_name(label)
+        path = self.lookup(resource)
+        if path is not None:
+            self.stats['hits'] += 1
+            if path.suffix == '.npy':
+                return model.sign_format(np.load(path))
+            return model.sign_format.load(str(path))
+
+        self.stats['misses'] += 1
+        if self.offline:
+            raise FileNotFoundError(f"'{resource}' is not in the sign library (offline mode)")
+
+        sign = model.sign_format.load_asset(resource, progress_bar=False)
+        if resource.endswith('.mp4'):
+            self.store_file(resource, Path(slt.Assets.ROOT_DIR, *resource.split('/')))
+        else:
+            self.store_landmarks(resource, sign.numpy())
+        return sign
+
+    def prepopulate(self, asset_dir=None):
+        """Import every asset already extracted under the slt assets directory
+
+        Works offline: only local files are read, nothing is downloaded.
+        """
+        if asset_dir is None:
+            import sign_language_translator as slt
+            asset_dir = slt.Assets.ROOT_DIR
+        asset_dir = Path(asset_dir)
+
+        imported = 0
+        for subdir, pattern in (("landmarks", "*.csv"), ("landmarks", "*.npy"), ("videos", "*.mp4")):
+            for file_path in sorted((asset_dir / subdir).glob(pattern)):
+                resource = f"{subdir}/{file_path.name}"
+                if self.lookup(resource) is not None:
+                    continue
+                try:
+                    self.store_file(resource, file_path)
+                    imported += 1
+                except Exception as e:
+                    logger.warning(f"Could not import {file_path}: {e}")
+
+        logger.info(f"Imported {imported} assets from {asset_dir} into {self.root}")
+        return imported
+
+class CachedConcatenativeSynthesis:
+    """ConcatenativeSynthesis.translate with sign lookups served by a SignClipLibrary"""
+
+    def __init__(self, model, library):
+        self.model = model
+        self.library = library
+
+    def sign_labels(self, text, rng=random):
+        """Tokenize, restructure and map text to sign labels (slt's translate steps)"""
+        model = self.model
+        keys = model.sign_language.SignDictKeys
+        labels = []
+        text = model.text_language.preprocess(text)
+        for sentence in model.text_language.sentence_tokenize(text):
+            tokens = model.text_language.tokenize(sentence)
+            tags = model.text_language.get_tags(tokens)
+            tokens, tags, contexts = model.sign_language.restructure_sentence(tokens, tags=tags)
+            for sign_dict in model.sign_language.tokens_to_sign_dicts(tokens, tags=tags, contexts=contexts):
+                labels.extend(rng.choices(sign_dict[keys.SIGNS.value], weights=sign_dict[keys.WEIGHTS.value], k=1)[0])
+        return labels
+
+    def translate(self, text, rng=random):
+        """Translate text to a concatenated sign"""
+        signs = [self.library.load(self.model, label) for label in self.sign_labels(text, rng)]
+        return self.model.sign_format.concatenate(signs)
+
+# ==== Batch generation ==== #
+
+_worker = {}
+
+def init_generation_worker(text_language, sign_language, embedding_model, library_dir, offline):
+    """Build one landmark model and library handle per worker process"""
+    import sign_language_translator as slt
+    model = slt.models.ConcatenativeSynthesis(
+        text_language=text_language, sign_language=sign_language,
+        sign_format="landmarks", sign_embedding_model=embedding_model
+    )
+    _worker['synthesis'] = CachedConcatenativeSynthesis(model, SignClipLibrary(library_dir, offline=offline))
+
+def generate_chunk(samples, output_dir, seed):
+    """Worker: translate (text, sign) samples and save (frames, 126) landmark .npy files
+
+    Outputs are named ``<sign>_<digest>.npy`` like the audio data, and existing
+    files are skipped so interrupted runs can resume.
+    """
+    synthesis = _worker['synthesis']
+    output_dir = Path(output_dir)
+    counts = {'written': 0, 'skipped': 0, 'failed': 0}
+
+    for text, sign in samples:
+        name = sign.replace(' ', '-').replace('_', '-')
+        output_path = output_dir / f"{name}_{stable_int(text) % 16 ** 12:012x}.npy"
+        if output_path.exists():
+            counts['skipped'] += 1
+            continue
+        try:
+            landmarks = synthesis.translate(text, rng=random.Random(stable_int(f"{seed}\t{text}")))
+            array = to_hand_landmarks(landmarks.numpy())
+            synthesis.library.write_atomic(output_path, lambda tmp: save_npy(tmp, array))
+            counts['written'] += 1
+        except Exception as e:
+            logger.warning(f"Could not generate '{text}': {e}")
+            counts['failed'] += 1
+
+    counts.update({f"library_{key}": value for key, value in synthesis.library.stats.items()})
+    synthesis.library.stats = dict.fromkeys(synthesis.library.stats, 0)
+    return counts
+
+def read_samples(sentences_file):
+    """Read 'text<TAB>sign' lines; plain lines use the text itself as the sign label"""
+    samples = []
+    with open(sentences_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                continue
+            text, _, sign = line.partition('\t')
+            samples.append((text, sign.strip() or text.strip()))
+    return samples
+
+def generate_landmark_dataset(samples, output_dir=DEFAULT_OUTPUT_DIR, text_language="hindi",
+                              sign_language="pk-sl", embedding_model="mediapipe-image",
+                              library_dir=DEFAULT_LIBRARY_DIR, offline=False, workers=None,
+                              chunk_size=256, seed=42):
+    """Translate many sentences in parallel into landmark training files"""
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    chunks = [samples[i:i + chunk_size] for i in range(0, len(samples), chunk_size)]
+    totals = {}
+
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1,
+        initializer=init_generation_worker,
+        initargs=(text_language, sign_language, embedding_model, str(library_dir), offline)
+    ) as pool:
+        for counts in pool.map(generate_chunk, chunks, [str(output_dir)] * len(chunks), [seed] * len(chunks)):
+            for key, value in counts.items():
+                totals[key] = totals.get(key, 0) + value
+
+    lookups = totals.get('library_hits', 0) + totals.get('library_misses', 0)
+    hit_rate = totals.get('library_hits', 0) / lookups if lookups else 0.0
+    logger.info(
+        f"Generated {totals.get('written', 0)} landmark sequences "
+        f"({totals.get('skipped', 0)} already present, {totals.get('failed', 0)} failed), "
+        f"sign library hit rate {hit_rate:.1%}"
+    )
+    return totals
+
+def main():
+    """Pre-populate the sign library or generate landmark training data"""
+    parser = argparse.ArgumentParser(description="Cached sign clip library for concatenative synthesis")
+    parser.add_argument('--library-dir', default=DEFAULT_LIBRARY_DIR, help="Sign library directory")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    prepopulate = subparsers.add_parser('prepopulate', help="Import locally extracted slt assets (offline)")
+    prepopulate.add_argument('--asset-dir', help="slt assets directory (default: slt.Assets.ROOT_DIR)")
+
+    generate = subparsers.add_parser('generate', help="Translate sentences into landmark training files")
+    generate.add_argument('--sentences', required=True, help="File of 'text<TAB>sign' or plain text lines")
+    generate.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help="Landmark output directory")
+    generate.add_argument('--text-language', default="hindi", help="slt text language code")
+    generate.add_argument('--sign-language', default="pk-sl", help="slt sign language code")
+    generate.add_argument('--embedding-model', default="mediapipe-image", help="slt sign embedding model")
+    generate.add_argument('--offline', action='store_true', help="Only use signs already in the library")
+    generate.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.command == 'prepopulate':
+        SignClipLibrary(args.library_dir).prepopulate(args.asset_dir)
+    else:
+        generate_landmark_dataset(
+            read_samples(args.sentences), args.output_dir, args.text_language, args.sign_language,
+            args.embedding_model, args.library_dir, args.offline, args.workers
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Nearest-neighbour index over sign landmark embeddings
+Landmark sequences are embedded into fixed-length vectors (resampled in time,
+each hand normalized relative to its wrist) and stored in an on-disk IVF index
+that supports incremental inserts and fast top-k "closest sign" queries
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import time
+from pathlib import Path
+import logging
+
+import numpy as np
+
+from augmentation import HANDS, HAND_POINTS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIGN_INDEX_DIR = "ml-models/data/sign_index"
+EMBEDDING_FRAMES = 16
+MIDDLE_MCP = 9  # MediaPipe hand point used as the hand-size reference
+
+# ==== Embedding ==== #
+
+def resample_frames(sequence, num_frames=EMBEDDING_FRAMES):
+    """Linearly resample a (frames, features) sequence to a fixed frame count"""
+    sequence = np.asarray(sequence, dtype=np.float32)
+    if len(sequence) == 1:
+        return np.repeat(sequence, num_frames, axis=0)
+    source = np.linspace(0.0, len(sequence) - 1, num_frames)
+    lower = np.floor(source).astype(int)
+    upper = np.minimum(lower + 1, len(sequence) - 1)
+    weight = (source - lower)[:, None]
+    return sequence[lower] * (1.0 - weight) + sequence[upper] * weight
+
+def embed_landmarks(sequence, num_frames=EMBEDDING_FRAMES):
+    """Embed a (frames, 126) landmark sequence as a unit-length vector
+
+    Per frame and hand, the 20 finger points are taken relative to the wrist
+    and divided by the wrist-to-middle-knuckle distance, so the shape does not
+    depend on position or hand size. The wrist track is kept relative to its
+    first frame so the motion is still represented. Missing hands stay zero.
+    """
+    frames = resample_frames(sequence, num_frames).reshape(num_frames, HANDS, HAND_POINTS, 3)
+    present = np.any(frames != 0, axis=(2, 3))
+
+    wrist = frames[:, :, :1, :]
+    shape = frames[:, :, 1:, :] - wrist
+    size = np.linalg.norm(shape[:, :, MIDDLE_MCP - 1, :], axis=-1)
+    shape = shape / np.where(size > 1e-6, size, 1.0)[:, :, None, None]
+    shape = np.where(present[:, :, None, None], shape, 0.0)
+
+    first_seen = np.argmax(present, axis=0)
+    origin = wrist[first_seen, np.arange(HANDS)]
+    motion = np.where(present[:, :, None], wrist[:, :, 0, :] - origin[None, :, 0, :], 0.0)
+
+    vector = np.concatenate([shape.ravel(), motion.ravel()]).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+def embedding_dim(num_frames=EMBEDDING_FRAMES):
+    return num_frames * HANDS * ((HAND_POINTS - 1) * 3 + 3)
+
+def sign_for_file(stem, signs):
+    """Sign of a '<sign>_<id>' landmark file, matching multi-word sign names first"""
+    for sign in sorted(signs, key=len, reverse=True):
+        for name in (sign, sign.replace('_', '-')):
+            if stem == name or stem.startswith(name + '_') or stem.startswith(name + '-aug'):
+                return sign
+    return None
+
+# ==== Index ==== #
+
+def kmeans(vectors, num_clusters, iterations=20, seed=42):
+    """Lloyd's k-means on squared Euclidean distance"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), num_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = nearest_centroids(vectors, centroids)
+        for cluster in range(num_clusters):
+            members = vectors[assignments == cluster]
+            if len(members):
+                centroids[cluster] = members.mean(axis=0)
+    return centroids
+
+def nearest_centroids(vectors, centroids, count=1):
+    """Index of the closest centroid(s) for each vector"""
+    distances = (
+        np.sum(vectors ** 2, axis=1, keepdims=True)
+        - 2.0 * vectors @ centroids.T
+        + np.sum(centroids ** 2, axis=1)
+    )
+    if count == 1:
+        return np.argmin(distances, axis=1)
+    count = min(count, len(centroids))
+    return np.argpartition(distances, count - 1, axis=1)[:, :count]
+
+class SignIndex:
+    """On-disk IVF index of sign embeddings
+
+    Vectors, their inverted-list IDs and their item records are appended to
+    flat files; ``meta.json`` holds the committed count and is replaced last,
+    so a crash mid-insert never exposes a partial row. Until enough vectors
+    exist to train the coarse quantizer, queries scan every vector.
+    """
+
+    def __init__(self, index_dir=DEFAULT_SIGN_INDEX_DIR, dim=None, min_train=256):
+        self.index_dir = Path(index_dir)
+        self.meta_path = self.index_dir / "meta.json"
+        self.vectors_path = self.index_dir / "vectors.f32"
+        self.lists_path = self.index_dir / "lists.i32"
+        self.items_path = self.index_dir / "items.jsonl"
+        self.centroids_path = self.index_dir / "centroids.npy"
+        self.min_train = min_train
+
+        if self.meta_path.exists():
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {'dim': dim or embedding_dim(), 'count': 0, 'trained_count': 0,
+                         'embedding_frames': EMBEDDING_FRAMES}
+        self.dim = self.meta['dim']
+        self.refresh()
+
+    def __len__(self):
+        return self.meta['count']
+
+    def refresh(self):
+        """Map the committed rows into memory and rebuild the inverted lists"""
+        count = self.meta['count']
+        if count:
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(count, self.dim))
+            self.lists = np.fromfile(self.lists_path, dtype=np.int32, count=count)
+            with open(self.items_path, 'r', encoding='utf-8') as f:
+                self.items = [json.loads(line) for _, line in zip(range(count), f)]
+        else:
+            self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+            self.lists = np.zeros(0, dtype=np.int32)
+            self.items = []
+
+        self.centroids = np.load(self.centroids_path) if self.centroids_path.exists() else None
+        self.inverted = {}
+        if self.centroids is not None:
+            order = np.argsort(self.lists, kind='stable')
+            boundaries = np.searchsorted(self.lists[order], np.arange(len(self.centroids) + 1))
+            self.inverted = {
+                cluster: order[boundaries[cluster]:boundaries[cluster + 1]]
+                for cluster in range(len(self.centroids))
+            }
+        self.sources = {item.get('source') for item in self.items}
+        sign_codes = {}
+        self.sign_ids = np.array(
+            [sign_codes.setdefault(item['sign'], len(sign_codes)) for item in self.items], dtype=np.int32
+        )
+
+    def save_meta(self):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.meta_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp_path, self.meta_path)
+
+    def truncate_uncommitted(self):
+        """Drop rows a crashed insert wrote past the committed count"""
+        count = self.meta['count']
+        for path, row_bytes in ((self.vectors_path, self.dim * 4), (self.lists_path, 4)):
+            if path.exists() and path.stat().st_size > count * row_bytes:
+                with open(path, 'r+b') as f:
+                    f.truncate(count * row_bytes)
+        if self.items_path.exists():
+            with open(self.items_path, 'r', encoding='utf-8') as f:
+                lines = [line for _, line in zip(range(count), f)]
+            with open(self.items_path, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+
+    def add(self, vectors, items):
+        """Append embeddings with their item records (``sign``, ``source``)"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if not len(vectors):
+            return 0
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.truncate_uncommitted()
+        if self.centroids is not None:
+            lists = nearest_centroids(vectors, self.centroids).astype(np.int32)
+        else:
+            lists = np.full(len(vectors), -1, dtype=np.int32)
+
+        with open(self.vectors_path, 'ab') as f:
+            f.write(vectors.tobytes())
+        with open(self.lists_path, 'ab') as f:
+            f.write(lists.tobytes())
+        with open(self.items_path, 'a', encoding='utf-8') as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+
+        self.meta['count'] += len(vectors)
+        self.save_meta()
+
+        # Retrain the coarse quantizer once there is enough data, and again whenever it quadruples
+        if self.meta['count'] >= self.min_train and self.meta['count'] >= 4 * self.meta['trained_count']:
+            self.train()
+        else:
+            self.refresh()
+        return len(vectors)
+
+    def train(self, num_lists=None, seed=42):
+        """(Re)cluster all vectors into ~sqrt(N) inverted lists"""
+        self.refresh()
+        vectors = np.asarray(self.vectors)
+        num_lists = num_lists or max(1, int(np.sqrt(len(vectors))))
+        centroids = kmeans(vectors, num_lists, seed=seed).astype(np.float32)
+        lists = nearest_centroids(vectors, centroids).astype(np.int32)
+
+        np.save(self.centroids_path.with_suffix('.tmp.npy'), centroids)
+        os.replace(self.centroids_path.with_suffix('.tmp.npy'), self.centroids_path)
+        lists.tofile(self.lists_path)
+
+        self.meta.update({'trained_count': len(vectors), 'num_lists': num_lists})
+        self.save_meta()
+        self.refresh()
+        logger.info(f"Trained sign index quantizer: {len(vectors)} vectors in {num_lists} lists")
+
+    def candidates(self, vector, nprobe):
+        """Row IDs in the nprobe inverted lists nearest to a vector (all rows before training)"""
+        if self.centroids is None:
+            return np.arange(len(self))
+        probes = nearest_centroids(vector[None], self.centroids, count=nprobe).ravel()
+        return np.concatenate([self.inverted[cluster] for cluster in probes])
+
+    def query(self, sequence, k=5, nprobe=4):
+        """Top-k distinct signs closest to a (frames, 126) landmark sequence
+
+        Each sign is ranked by its closest stored example. When the probed lists
+        hold fewer than k signs, more lists are probed.
+        """
+        start = time.perf_counter()
+        vector = embed_landmarks(sequence, self.meta['embedding_frames'])
+        num_lists = len(self.centroids) if self.centroids is not None else 1
+
+        rows, row_distances = np.zeros(0, dtype=int), np.zeros(0, dtype=np.float32)
+        while len(self):
+            candidates = self.candidates(vector, nprobe)
+            distances = np.sum((self.vectors[candidates] - vector) ** 2, axis=1)
+
+            # Closest example per sign: sort by distance, keep each sign's first row
+            order = np.argsort(distances)
+            _, first = np.unique(self.sign_ids[candidates[order]], return_index=True)
+            best = np.sort(first)[:k]
+            rows, row_distances = candidates[order[best]], distances[order[best]]
+            if len(rows) == k or nprobe >= num_lists:
+                break
+            nprobe *= 2
+
+        matches = [
+            {'sign': self.items[row]['sign'], 'distance': float(np.sqrt(max(distance, 0.0))),
+             'source': self.items[row].get('source')}
+            for row, distance in zip(rows, row_distances)
+        ]
+        return {'matches': matches, 'query_ms': round((time.perf_counter() - start) * 1000.0, 3)}
+
+def build_sign_index(data_dir="ml-models/data", index_dir=DEFAULT_SIGN_INDEX_DIR):
+    """Add landmark files of signs listed in sign_mappings.json to the index
+
+    Only files not indexed yet are embedded, so re-running is incremental.
+    """
+    data_dir = Path(data_dir)
+    mappings_file = data_dir / "sign_mappings.json"
+    signs = set()
+    if mappings_file.exists():
+        with open(mappings_file, 'r', encoding='utf-8') as f:
+            signs = set(json.load(f))
+
+    index = SignIndex(index_dir)
+    vectors = []
+    items = []
+    unknown = 0
+    for landmark_file in sorted(data_dir.glob("*/video_data/**/*.npy")):
+        source = str(landmark_file.relative_to(data_dir))
+        if source in index.sources:
+            continue
+        sign = sign_for_file(landmark_file.stem, signs)
+        if sign is None:
+            unknown += 1
+            continue
+        sequence = np.load(landmark_file)
+        if sequence.ndim != 2 or not len(sequence):
+            continue
+        vectors.append(embed_landmarks(sequence, index.meta['embedding_frames']))
+        items.append({'sign': sign, 'source': source})
+
+    added = index.add(np.array(vectors), items) if vectors else 0
+    if unknown:
+        logger.warning(f"Skipped {unknown} landmark files whose sign is not in sign_mappings.json")
+    logger.info(f"Sign index: {added} new sequences, {len(index)} total")
+    return added
+
+def load_sign_index(index_dir=DEFAULT_SIGN_INDEX_DIR):
+    """Load the sign index if it has been built, else None"""
+    if not (Path(index_dir) / "meta.json").exists():
+        return None
+    index = SignIndex(index_dir)
+    logger.info(f"Sign index loaded ({len(index)} sequences)")
+    return index
+
+def main():
+    """Build or query the sign landmark index from the command line"""
+    parser = argparse.ArgumentParser(description="Nearest-neighbour index over sign landmark embeddings")
+    parser.add_argument('--index-dir', default=DEFAULT_SIGN_INDEX_DIR, help="Index directory")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Index new video_data landmark files")
+    build.add_argument('--data-dir', default="ml-models/data", help="Dataset directory")
+
+    query = subparsers.add_parser('query', help="Find the signs closest to a landmark .npy file")
+    query.add_argument('landmarks', help="(frames, 126) landmark .npy file")
+    query.add_argument('--top-k', type=int, default=5)
+    query.add_argument('--nprobe', type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_sign_index(args.data_dir, args.index_dir)
+    else:
+        index = SignIndex(args.index_dir)
+        print(json.dumps(index.query(np.load(args.landmarks), k=args.top_k, nprobe=args.nprobe),
+                         indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Streaming ISL sign recognition over hand landmarks
+Keeps a ring buffer of per-frame landmark vectors for every client session and
+classifies sliding windows, batching all sessions that are due into a single
+model call per tick
+"""
+
+import threading
+import time
+import uuid
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LANDMARK_FEATURES = 126  # 2 hands x 21 points x (x, y, z), as in extract_hand_landmarks
+
+class LandmarkRingBuffer:
+    """Fixed-capacity ring of per-frame landmark vectors"""
+
+    def __init__(self, capacity, feature_dim=LANDMARK_FEATURES):
+        self.data = np.zeros((capacity, feature_dim), dtype=np.float32)
+        self.position = 0
+        self.count = 0
+
+    def push(self, frames):
+        """Append (n, feature_dim) frames, overwriting the oldest"""
+        capacity = len(self.data)
+        frames = frames[-capacity:]
+        n = len(frames)
+        end = self.position + n
+        if end <= capacity:
+            self.data[self.position:end] = frames
+        else:
+            split = capacity - self.position
+            self.data[self.position:] = frames[:split]
+            self.data[:n - split] = frames[split:]
+        self.position = end % capacity
+        self.count = min(self.count + n, capacity)
+
+    def window(self, out):
+        """Copy the buffered frames, oldest first, into ``out``, zero-padding at the front"""
+        capacity = len(self.data)
+        out[:capacity - self.count] = 0.0
+        if self.count < capacity:
+            out[capacity - self.count:] = self.data[:self.count]
+        else:
+            split = capacity - self.position
+            out[:split] = self.data[self.position:]
+            out[split:] = self.data[:self.position]
+        return out
+
+class RecognitionSession:
+    """Buffered frames and latest result of one streaming client"""
+
+    def __init__(self, session_id, window):
+        self.id = session_id
+        self.buffer = LandmarkRingBuffer(window)
+        self.frames_total = 0
+        self.pending_frames = 0
+        self.last_frame_at = None
+        self.last_seen = time.monotonic()
+        self.result = None
+        self.result_seq = 0
+        self.updated = threading.Condition()
+
+class StreamingSignRecognizer(threading.Thread):
+    """Classify sliding landmark windows of all active sessions on a fixed tick
+
+    A session is due once ``stride`` new frames have arrived since its last
+    classification (and at least ``min_frames`` in total). All due windows are
+    stacked into one batch for ``classify(windows) -> [top_k candidates]``.
+    """
+
+    def __init__(self, classify, window=32, stride=4, min_frames=8, tick_interval=0.02,
+                 session_ttl=60.0, max_sessions=256):
+        super().__init__(daemon=True)
+        self.classify = classify
+        self.window = window
+        self.stride = stride
+        self.min_frames = min_frames
+        self.tick_interval = tick_interval
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.batch = np.zeros((max_sessions, window, LANDMARK_FEATURES), dtype=np.float32)
+        self.stats = {'ticks': 0, 'windows': 0, 'max_batch': 0, 'last_tick_ms': 0.0, 'errors': 0}
+
+    def open_session(self):
+        """Start a session and return its ID"""
+        with self.lock:
+            self.expire_sessions()
+            if len(self.sessions) >= self.max_sessions:
+                raise RuntimeError("Too many active recognition sessions")
+            session = RecognitionSession(uuid.uuid4().hex, self.window)
+            self.sessions[session.id] = session
+        return session.id
+
+    def close_session(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def get_session(self, session_id):
+        with self.lock:
+            session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown recognition session: {session_id}")
+        return session
+
+    def push(self, session_id, frames):
+        """Buffer one (126,) frame or an (n, 126) frame batch for a session"""
+        frames = np.asarray(frames, dtype=np.float32)
+        if frames.ndim == 1:
+            frames = frames[np.newaxis]
+        if frames.ndim != 2 or frames.shape[1] != LANDMARK_FEATURES:
+            raise ValueError(f"Expected frames of {LANDMARK_FEATURES} landmark values, got shape {frames.shape}")
+
+        session = self.get_session(session_id)
+        with self.lock:
+            session.buffer.push(frames)
+            session.frames_total += len(frames)
+            session.pending_frames += len(frames)
+            session.last_frame_at = time.perf_counter()
+            session.last_seen = time.monotonic()
+        return session.result_seq
+
+    def wait_for_result(self, session_id, after_seq, timeout):
+        """Block until the session has a result newer than ``after_seq`` (or timeout)"""
+        session = self.get_session(session_id)
+        with session.updated:
+            session.updated.wait_for(lambda: session.result_seq > after_seq, timeout=timeout)
+            if session.result_seq > after_seq:
+                return session.result_seq, session.result
+        return after_seq, None
+
+    def expire_sessions(self):
+        """Drop sessions idle for longer than the TTL (caller holds the lock)"""
+        cutoff = time.monotonic() - self.session_ttl
+        for session_id in [s.id for s in self.sessions.values() if s.last_seen < cutoff]:
+            del self.sessions[session_id]
+
+    def tick(self):
+        """Classify every due session in one batch"""
+        with self.lock:
+            due = [
+                session for session in self.sessions.values()
+                if session.pending_frames >= self.stride and session.frames_total >= self.min_frames
+            ]
+            for row, session in enumerate(due):
+                session.buffer.window(self.batch[row])
+                session.pending_frames = 0
+            arrival = [session.last_frame_at for session in due]
+            frames = [session.frames_total for session in due]
+        if not due:
+            return 0
+
+        try:
+            candidates = self.classify(self.batch[:len(due)])
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Streaming recognition failed: {e}")
+            return 0
+
+        done = time.perf_counter()
+        for session, top_k, arrived, frame in zip(due, candidates, arrival, frames):
+            with session.updated:
+                session.result = {
+                    'sign': top_k[0]['sign'],
+                    'confidence': top_k[0]['confidence'],
+                    'top_k': top_k,
+                    'frame': frame,
+                    'latency_ms': round((done - arrived) * 1000.0, 2)
+                }
+                session.result_seq += 1
+                session.updated.notify_all()
+
+        self.stats['windows'] += len(due)
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(due))
+        return len(due)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            self.tick()
+            elapsed = time.perf_counter() - start
+            self.stats['ticks'] += 1
+            self.stats['last_tick_ms'] = round(elapsed * 1000.0, 3)
+            if self.stats['ticks'] % 500 == 0:
+                with self.lock:
+                    self.expire_sessions()
+            self.stop_event.wait(max(0.0, self.tick_interval - elapsed))
+
+    def stop(self):
+        self.stop_event.set()
+
+    def info(self):
+        """Describe the recognizer for /models/info"""
+        with self.lock:
+            active = len(self.sessions)
+        return dict(self.stats, active_sessions=active, window=self.window, stride=self.stride,
+                    tick_interval_ms=self.tick_interval * 1000.0)
@@ -6,24 +6,277 @@ Based on: https://github.com/Sijosaju/Speech-to-Indian-Sign-Language-using-3D-Av
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras.models import Sequential, Model
-from tensorflow.keras.layers import LSTM, Dense, Dropout, Input, Embedding, Attention
+from tensorflow.keras.layers import LSTM, Dense, Dropout, Input, Embedding, Attention, Bidirectional
 from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, Callback
 import librosa
 import cv2
 import mediapipe as mp
 import json
 import pickle
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
 import matplotlib.pyplot as plt
 from pathlib import Path
 import logging
+import time
+
+from text_normalization import tokenize
+from corpus_reader import TextCorpusReader, RowView, split_rows, remap_label_ids
+from keyframe_compiler import load_compiled_mappings, COMPILED_MAPPINGS_NAME
+from sign_index import sign_for_file
+from training_checkpoints import ResumableBatches, TrainingCheckpointer, fit_resumable, DEFAULT_KEEP_CHECKPOINTS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def save_sign_table(classes, path):
+    """Write label classes as a plain index-to-sign JSON table"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([str(c) for c in classes], f, ensure_ascii=False)
+    logger.info(f"Sign table saved to {path}")
+
+def load_sign_table(path):
+    """Load an index-to-sign table as a NumPy array for fancy-index decoding"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return np.array(json.load(f), dtype=object)
+
+# Spare embedding rows reserved so new words fit without resizing the model
+VOCAB_HEADROOM = 0.5
+VOCAB_BLOCK = 256
+
+def vocab_capacity(vocab_size, headroom=VOCAB_HEADROOM, block=VOCAB_BLOCK):
+    """Embedding rows to allocate for a vocabulary, rounded up to a whole block"""
+    needed = int(np.ceil(vocab_size * (1 + headroom)))
+    return max(block, int(np.ceil(needed / block)) * block)
+
+def embedding_input_dim(model):
+    """Number of token IDs a model's embedding accepts, or None without one"""
+    for layer in model.layers:
+        if isinstance(layer, Embedding):
+            return layer.input_dim
+    return None
+
+def vocabulary_size(vocabulary):
+    """Number of word IDs a vocabulary mapping covers (IDs start at 0)"""
+    return max(vocabulary.values()) + 1
+
+def trained_vocab_limit(manifest, model):
+    """Word IDs a version's text models were trained on; later IDs map to <UNK>
+
+    The embedding capacity includes headroom rows that were never trained, so
+    it is only the fallback for versions whose manifest lacks ``vocab_size``.
+    """
+    return manifest.get('vocab_size') or embedding_input_dim(model)
+
+# Tag 0 marks padding and tokens that carry no sign in sequence mode
+SEQUENCE_OUTSIDE_TAG = 'O'
+
+def build_sequence_tag_table(signs):
+    """Build BIO tag names for sequence mode: 'O', then B-/I- per sign"""
+    tags = [SEQUENCE_OUTSIDE_TAG]
+    for sign in signs:
+        tags.extend([f"B-{sign}", f"I-{sign}"])
+    return tags
+
+def decode_sign_sequence(tag_ids, tag_probs, tag_table, num_tokens):
+    """Collapse per-token BIO tags into ordered sign segments"""
+    segments = []
+    for position in range(num_tokens):
+        tag = tag_table[tag_ids[position]]
+        if tag == SEQUENCE_OUTSIDE_TAG:
+            continue
+        
+        prefix, sign = tag.split('-', 1)
+        current = segments[-1] if segments else None
+        if prefix == 'I' and current and current['sign'] == sign and current['end'] == position:
+            current['end'] = position + 1
+            current['probs'].append(float(tag_probs[position]))
+        else:
+            segments.append({
+                'sign': sign,
+                'start': position,
+                'end': position + 1,
+                'probs': [float(tag_probs[position])]
+            })
+    
+    return [
+        {
+            'sign': segment['sign'],
+            'confidence': float(np.mean(segment['probs'])),
+            'start': segment['start'],
+            'end': segment['end']
+        }
+        for segment in segments
+    ]
+
+# Padded lengths used for variable-length text models; real traffic is mostly
+# one to three words, so most inputs land in the smallest bucket
+LENGTH_BUCKETS = (4, 8, 16, 32, 50)
+
+def token_lengths(token_ids, chunk_rows=65536):
+    """Length of each padded row: position of the last non-padding token + 1
+
+    Works through the rows in chunks, so memory-mapped corpora are never
+    expanded in RAM as a whole.
+    """
+    positions = np.arange(1, token_ids.shape[1] + 1)
+    lengths = np.zeros(len(token_ids), dtype=np.int32)
+    for start in range(0, len(token_ids), chunk_rows):
+        block = np.asarray(token_ids[start:start + chunk_rows])
+        lengths[start:start + len(block)] = np.where(block != 0, positions, 0).max(axis=1)
+    return lengths
+
+def bucket_for_length(length, buckets=LENGTH_BUCKETS):
+    """Smallest bucket that fits a sequence length (the largest one truncates)"""
+    for bucket in buckets:
+        if length <= bucket:
+            return bucket
+    return buckets[-1]
+
+def group_by_bucket(token_ids, buckets=LENGTH_BUCKETS):
+    """Map each bucket to the row indices whose length falls into it"""
+    lengths = token_lengths(token_ids)
+    groups = {}
+    for row, length in enumerate(lengths):
+        groups.setdefault(bucket_for_length(length, buckets), []).append(row)
+    return {bucket: np.array(rows) for bucket, rows in groups.items()}
+
+def make_bucketed_dataset(X, y, buckets, batch_size, shuffle=True, seed=42):
+    """tf.data pipeline of batches whose rows share a length bucket
+
+    Rows are truncated to their bucket width (per-token labels too), and batch
+    order is shuffled every epoch so buckets are interleaved.
+    """
+    X = X if hasattr(X, 'shape') else np.asarray(X)  # memmaps and RowViews are read per batch
+    y = np.asarray(y)
+    batches = []
+    for bucket, rows in group_by_bucket(X, buckets).items():
+        for start in range(0, len(rows), batch_size):
+            batches.append((bucket, rows[start:start + batch_size]))
+    
+    rng = np.random.default_rng(seed)
+    
+    def generate():
+        order = rng.permutation(len(batches)) if shuffle else range(len(batches))
+        for i in order:
+            bucket, rows = batches[i]
+            labels = y[rows, :bucket] if y.ndim == 2 else y[rows]
+            yield X[rows, :bucket].astype(np.int32), labels
+    
+    label_shape = (None, None) if y.ndim == 2 else (None,)
+    return tf.data.Dataset.from_generator(
+        generate,
+        output_signature=(
+            tf.TensorSpec(shape=(None, None), dtype=tf.int32),
+            tf.TensorSpec(shape=label_shape, dtype=tf.as_dtype(y.dtype))
+        )
+    ).prefetch(tf.data.AUTOTUNE)
+
+def make_row_dataset(X, y, batch_size, shuffle=True, seed=42):
+    """tf.data pipeline of fixed-width batches read from X on demand
+
+    For inputs that should not be loaded whole (memory maps, RowViews); each
+    batch reads its rows in ascending order. Shuffled every epoch.
+    """
+    y = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    
+    def generate():
+        order = rng.permutation(len(X)) if shuffle else np.arange(len(X))
+        for start in range(0, len(order), batch_size):
+            rows = np.sort(order[start:start + batch_size])
+            yield np.asarray(X[rows]), y[rows]
+    
+    return tf.data.Dataset.from_generator(
+        generate,
+        output_signature=(
+            tf.TensorSpec(shape=(None,) + tuple(X.shape[1:]), dtype=tf.as_dtype(X.dtype)),
+            tf.TensorSpec(shape=(None,) + y.shape[1:], dtype=tf.as_dtype(y.dtype))
+        )
+    ).prefetch(tf.data.AUTOTUNE)
+
+def cpu_supports_bfloat16():
+    """Check CPU flags for native bfloat16 support (AVX512-BF16 or AMX)"""
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+class TrainingConfig:
+    """Throughput settings for model training"""
+    
+    def __init__(self, batch_size=32, base_batch_size=32, learning_rate=0.001,
+                 scale_learning_rate=True, intra_op_threads=None, inter_op_threads=None,
+                 jit_compile=False, mixed_precision=False, steps_per_execution=1,
+                 length_buckets=None, checkpoint_steps=None, keep_checkpoints=DEFAULT_KEEP_CHECKPOINTS):
+        self.batch_size = batch_size
+        self.base_batch_size = base_batch_size
+        self.learning_rate = learning_rate
+        self.scale_learning_rate = scale_learning_rate
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.jit_compile = jit_compile
+        self.mixed_precision = mixed_precision
+        self.steps_per_execution = steps_per_execution
+        self.length_buckets = tuple(length_buckets) if length_buckets else None
+        # None disables resumable checkpoints; 0 keeps only the per-epoch ones
+        self.checkpoint_steps = checkpoint_steps
+        self.keep_checkpoints = keep_checkpoints
+    
+    def sequence_length(self, default=50):
+        """Model input length: variable when training with length buckets"""
+        return None if self.length_buckets else default
+    
+    def effective_learning_rate(self):
+        """Linearly scale the learning rate with batch size"""
+        if not self.scale_learning_rate:
+            return self.learning_rate
+        return self.learning_rate * self.batch_size / self.base_batch_size
+    
+    def apply_runtime(self):
+        """Configure TensorFlow thread pools and precision policy
+
+        Must run before TensorFlow executes any op; thread settings are
+        process-wide and cannot be changed afterwards.
+        """
+        try:
+            if self.intra_op_threads:
+                tf.config.threading.set_intra_op_parallelism_threads(self.intra_op_threads)
+            if self.inter_op_threads:
+                tf.config.threading.set_inter_op_parallelism_threads(self.inter_op_threads)
+        except RuntimeError as e:
+            logger.warning(f"Thread settings ignored, TensorFlow already initialized: {e}")
+        
+        if self.mixed_precision:
+            if cpu_supports_bfloat16():
+                tf.keras.mixed_precision.set_global_policy('mixed_bfloat16')
+                logger.info("Using mixed_bfloat16 precision")
+            else:
+                logger.warning("CPU lacks native bfloat16 support, keeping float32")
+                self.mixed_precision = False
+    
+    def to_dict(self):
+        config = dict(self.__dict__)
+        config['effective_learning_rate'] = self.effective_learning_rate()
+        return config
+
+class ThroughputCallback(Callback):
+    """Record training samples per second for every epoch"""
+    
+    def __init__(self, num_samples):
+        super().__init__()
+        self.num_samples = num_samples
+        self.epoch_start = None
+    
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch_start = time.perf_counter()
+    
+    def on_epoch_end(self, epoch, logs=None):
+        if logs is not None:
+            logs['samples_per_sec'] = self.num_samples / (time.perf_counter() - self.epoch_start)
+
 class ISLDataProcessor:
     """Process speech and text data for ISL translation"""
     
@@ -80,16 +333,23 @@ class ISLDataProcessor:
         cap.release()
         return np.array(landmarks_sequence)
     
-    def preprocess_text(self, text, max_length=50):
-        """Preprocess text for model input"""
-        # Convert to lowercase and tokenize
-        words = text.lower().split()
+    def preprocess_text(self, text, max_length=50, vocab_limit=None):
+        """Preprocess text for model input
+
+        Words whose ID is beyond ``vocab_limit`` (added to the vocabulary after
+        the model was trained) are mapped to <UNK>.
+        """
+        # Normalize (NFC, case, punctuation, Devanagari variants) and tokenize
+        words = tokenize(text)
         
         # Create word-to-index mapping (this should be loaded from training data)
         word_to_idx = self.load_vocabulary()
         
         # Convert words to indices
-        indices = [word_to_idx.get(word, word_to_idx.get('<UNK>', 0)) for word in words]
+        unk_idx = word_to_idx.get('<UNK>', 0)
+        indices = [word_to_idx.get(word, unk_idx) for word in words]
+        if vocab_limit is not None:
+            indices = [idx if idx < vocab_limit else unk_idx for idx in indices]
         
         # Pad or truncate to max_length
         if len(indices) < max_length:
@@ -114,6 +374,23 @@ class ISLDataProcessor:
                 'food': 15, 'home': 16, 'school': 17, 'book': 18, 'pen': 19
             }
 
+# Text classifier architectures selectable by name
+TEXT_ARCHITECTURES = {
+    'lstm_attention': 'build_text_to_isl_model',
+    'embedding_bag': 'build_embedding_bag_text_model',
+    'cnn': 'build_cnn_text_model'
+}
+
+def measure_latency(model, inputs, repeats=50):
+    """Median and p95 wall-clock ms of direct model calls on a fixed batch"""
+    model(inputs, training=False)  # build/trace once before timing
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model(inputs, training=False)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(timings)), float(np.percentile(timings, 95))
+
 class ISLTranslationModel:
     """Neural network model for Speech/Text to ISL translation"""
     
@@ -122,7 +399,7 @@ class ISLTranslationModel:
         self.embedding_dim = embedding_dim
         self.lstm_units = lstm_units
         self.model = None
-        self.label_encoder = LabelEncoder()
+        self.label_encoder = None  # Fitted by ISLTrainingPipeline during training
         
     def build_text_to_isl_model(self, max_sequence_length=50, num_isl_signs=500):
         """Build text to ISL translation model"""
@@ -156,7 +433,122 @@ class ISLTranslationModel:
         dropout2 = Dropout(0.3)(dense2)
         
         # Output layer for ISL sign classification
-        output = Dense(num_isl_signs, activation='softmax', name='isl_output')(dropout2)
+        output = Dense(num_isl_signs, activation='softmax', name='isl_output', dtype='float32')(dropout2)
+        
+        # Create model
+        model = Model(inputs=text_input, outputs=output)
+        
+        # Compile model
+        model.compile(
+            optimizer=Adam(learning_rate=0.001),
+            loss='sparse_categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        
+        self.model = model
+        return model
+    
+    def build_embedding_bag_text_model(self, max_sequence_length=50, num_isl_signs=500):
+        """Build lightweight text model: masked mean of embeddings + small MLP"""
+        
+        # Input layer for text
+        text_input = Input(shape=(max_sequence_length,), name='text_input')
+        
+        # Masked embedding so padding does not dilute the average
+        embedding = Embedding(
+            input_dim=self.vocab_size,
+            output_dim=self.embedding_dim,
+            input_length=max_sequence_length,
+            mask_zero=True
+        )(text_input)
+        pooled = tf.keras.layers.GlobalAveragePooling1D()(embedding)
+        
+        # Dense layers
+        dense = Dense(128, activation='relu')(pooled)
+        dropout = Dropout(0.3)(dense)
+        
+        # Output layer for ISL sign classification
+        output = Dense(num_isl_signs, activation='softmax', name='isl_output', dtype='float32')(dropout)
+        
+        # Create model
+        model = Model(inputs=text_input, outputs=output)
+        
+        # Compile model
+        model.compile(
+            optimizer=Adam(learning_rate=0.001),
+            loss='sparse_categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        
+        self.model = model
+        return model
+    
+    def build_cnn_text_model(self, max_sequence_length=50, num_isl_signs=500):
+        """Build lightweight text model: single 1D convolution over embeddings"""
+        
+        # Input layer for text
+        text_input = Input(shape=(max_sequence_length,), name='text_input')
+        
+        embedding = Embedding(
+            input_dim=self.vocab_size,
+            output_dim=self.embedding_dim,
+            input_length=max_sequence_length
+        )(text_input)
+        
+        # Trigram-width convolution, max-pooled over time
+        conv = tf.keras.layers.Conv1D(128, 3, padding='same', activation='relu')(embedding)
+        pooled = tf.keras.layers.GlobalMaxPooling1D()(conv)
+        
+        # Dense layers
+        dense = Dense(128, activation='relu')(pooled)
+        dropout = Dropout(0.3)(dense)
+        
+        # Output layer for ISL sign classification
+        output = Dense(num_isl_signs, activation='softmax', name='isl_output', dtype='float32')(dropout)
+        
+        # Create model
+        model = Model(inputs=text_input, outputs=output)
+        
+        # Compile model
+        model.compile(
+            optimizer=Adam(learning_rate=0.001),
+            loss='sparse_categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        
+        self.model = model
+        return model
+    
+    def build_text_model(self, architecture='lstm_attention', max_sequence_length=50, num_isl_signs=500):
+        """Build a text classifier by architecture name (see TEXT_ARCHITECTURES)"""
+        if architecture not in TEXT_ARCHITECTURES:
+            raise ValueError(f"Unknown text architecture: {architecture}")
+        builder = getattr(self, TEXT_ARCHITECTURES[architecture])
+        return builder(max_sequence_length=max_sequence_length, num_isl_signs=num_isl_signs)
+    
+    def build_text_to_isl_sequence_model(self, max_sequence_length=50, num_tags=1001):
+        """Build per-token tagging model that emits the full sign sequence"""
+        
+        # Input layer for text
+        text_input = Input(shape=(max_sequence_length,), name='text_input')
+        
+        # Masked embedding so padding positions are ignored by the loss
+        embedding = Embedding(
+            input_dim=self.vocab_size,
+            output_dim=self.embedding_dim,
+            input_length=max_sequence_length,
+            mask_zero=True
+        )(text_input)
+        
+        # Bidirectional context so multi-word phrases tag consistently
+        lstm = Bidirectional(
+            LSTM(self.lstm_units // 2, return_sequences=True, dropout=0.3)
+        )(embedding)
+        dense = Dense(128, activation='relu')(lstm)
+        dropout = Dropout(0.3)(dense)
+        
+        # One BIO tag distribution per token
+        output = Dense(num_tags, activation='softmax', name='isl_tags', dtype='float32')(dropout)
         
         # Create model
         model = Model(inputs=text_input, outputs=output)
@@ -185,7 +577,32 @@ class ISLTranslationModel:
         dense3 = Dense(64, activation='relu')(dropout2)
         
         # Output layer
-        output = Dense(num_isl_signs, activation='softmax', name='isl_output')(dense3)
+        output = Dense(num_isl_signs, activation='softmax', name='isl_output', dtype='float32')(dense3)
+        
+        # Create model
+        model = Model(inputs=audio_input, outputs=output)
+        
+        # Compile model
+        model.compile(
+            optimizer=Adam(learning_rate=0.001),
+            loss='sparse_categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        
+        self.model = model
+        return model
+    
+    def build_compact_speech_to_isl_model(self, audio_features_dim=13, num_isl_signs=500, hidden_units=64):
+        """Build small speech model with one hidden layer (distillation student)"""
+        
+        # Input layer for audio features
+        audio_input = Input(shape=(audio_features_dim,), name='audio_input')
+        
+        dense = Dense(hidden_units, activation='relu')(audio_input)
+        dropout = Dropout(0.2)(dense)
+        
+        # Output layer
+        output = Dense(num_isl_signs, activation='softmax', name='isl_output', dtype='float32')(dropout)
         
         # Create model
         model = Model(inputs=audio_input, outputs=output)
@@ -200,8 +617,57 @@ class ISLTranslationModel:
         self.model = model
         return model
     
-    def train_model(self, X_train, y_train, X_val, y_val, epochs=100, batch_size=32):
-        """Train the ISL translation model"""
+    def build_landmark_sequence_model(self, window=32, landmark_dim=126, num_isl_signs=500):
+        """Build compact classifier over a sliding window of hand landmark frames"""
+        
+        # Input layer for (frames, 126) landmark windows
+        landmark_input = Input(shape=(window, landmark_dim), name='landmark_input')
+        
+        # Temporal convolutions, average-pooled over the window
+        conv1 = tf.keras.layers.Conv1D(64, 5, padding='same', activation='relu')(landmark_input)
+        conv2 = tf.keras.layers.Conv1D(64, 3, padding='same', activation='relu')(conv1)
+        pooled = tf.keras.layers.GlobalAveragePooling1D()(conv2)
+        
+        # Dense layers
+        dense = Dense(64, activation='relu')(pooled)
+        dropout = Dropout(0.3)(dense)
+        
+        # Output layer for ISL sign classification
+        output = Dense(num_isl_signs, activation='softmax', name='isl_output', dtype='float32')(dropout)
+        
+        # Create model
+        model = Model(inputs=landmark_input, outputs=output)
+        
+        # Compile model
+        model.compile(
+            optimizer=Adam(learning_rate=0.001),
+            loss='sparse_categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        
+        self.model = model
+        return model
+    
+    def configure_training(self, training_config, learning_rate=None):
+        """Recompile the model with the training config's optimizer and graph settings"""
+        self.model.compile(
+            optimizer=Adam(learning_rate=learning_rate or training_config.effective_learning_rate()),
+            loss='sparse_categorical_crossentropy',
+            metrics=['accuracy'],
+            jit_compile=training_config.jit_compile,
+            steps_per_execution=training_config.steps_per_execution
+        )
+    
+    def train_model(self, X_train, y_train, X_val, y_val, epochs=100, batch_size=32,
+                    training_config=None, learning_rate=None, checkpoint_dir=None):
+        """Train the ISL translation model
+
+        With ``checkpoint_dir`` (and checkpointing enabled in the training
+        config) training resumes from the newest checkpoint found there.
+        """
+        if training_config is not None:
+            self.configure_training(training_config, learning_rate)
+            batch_size = training_config.batch_size
         
         # Callbacks
         early_stopping = EarlyStopping(
@@ -217,18 +683,102 @@ class ISLTranslationModel:
             mode='max'
         )
         
-        # Train model
-        history = self.model.fit(
-            X_train, y_train,
-            validation_data=(X_val, y_val),
-            epochs=epochs,
-            batch_size=batch_size,
-            callbacks=[early_stopping, model_checkpoint],
-            verbose=1
-        )
+        callbacks = [early_stopping, model_checkpoint, ThroughputCallback(len(X_train))]
+        
+        # Train model, on length-bucketed batches when configured and the
+        # model takes variable-length token IDs
+        variable_length = len(self.model.input_shape) == 2 and self.model.input_shape[1] is None
+        bucketed = training_config is not None and training_config.length_buckets and variable_length
+        if checkpoint_dir is not None and training_config is not None and training_config.checkpoint_steps is not None:
+            bucket_rows = group_by_bucket(X_train, training_config.length_buckets) if bucketed else None
+            batches = ResumableBatches(X_train, y_train, batch_size, bucket_rows)
+            if bucketed:
+                validation_data = make_bucketed_dataset(
+                    X_val, y_val, training_config.length_buckets, batch_size, shuffle=False
+                )
+            elif not isinstance(X_val, np.ndarray) or isinstance(X_val, np.memmap):
+                validation_data = make_row_dataset(X_val, y_val, batch_size, shuffle=False)
+            else:
+                validation_data = (X_val, y_val)
+            checkpointer = TrainingCheckpointer(
+                checkpoint_dir, batches.num_batches, every_steps=training_config.checkpoint_steps,
+                keep=training_config.keep_checkpoints, tracked=[early_stopping, model_checkpoint]
+            )
+            history = fit_resumable(self.model, batches, validation_data, epochs, callbacks, checkpointer)
+        elif bucketed:
+            buckets = training_config.length_buckets
+            history = self.model.fit(
+                make_bucketed_dataset(X_train, y_train, buckets, batch_size),
+                validation_data=make_bucketed_dataset(X_val, y_val, buckets, batch_size, shuffle=False),
+                epochs=epochs,
+                callbacks=callbacks,
+                verbose=1
+            )
+        elif not isinstance(X_train, np.ndarray) or isinstance(X_train, np.memmap):
+            # Out-of-core inputs are streamed batch by batch instead of copied into RAM
+            history = self.model.fit(
+                make_row_dataset(X_train, y_train, batch_size),
+                validation_data=make_row_dataset(X_val, y_val, batch_size, shuffle=False),
+                epochs=epochs,
+                callbacks=callbacks,
+                verbose=1
+            )
+        else:
+            history = self.model.fit(
+                X_train, y_train,
+                validation_data=(X_val, y_val),
+                epochs=epochs,
+                batch_size=batch_size,
+                callbacks=callbacks,
+                verbose=1
+            )
         
         return history
     
+    def resize(self, vocab_size=None, num_classes=None, learning_rate=0.001):
+        """Grow the embedding and/or output layer, keeping all trained weights
+
+        Existing embedding rows and output columns are copied into the larger
+        layers; only the new rows and columns start from fresh initialization.
+        """
+        if self.model is None:
+            raise ValueError("Model not built or loaded")
+        
+        def clone_layer(layer):
+            config = layer.get_config()
+            if vocab_size is not None and isinstance(layer, Embedding):
+                if vocab_size < config['input_dim']:
+                    raise ValueError("Embedding can only grow")
+                config['input_dim'] = vocab_size
+            if num_classes is not None and layer.name == 'isl_output':
+                if num_classes < config['units']:
+                    raise ValueError("Output layer can only grow")
+                config['units'] = num_classes
+            return layer.__class__.from_config(config)
+        
+        old_model = self.model
+        model = tf.keras.models.clone_model(old_model, clone_function=clone_layer)
+        
+        for old_layer, new_layer in zip(old_model.layers, model.layers):
+            weights = []
+            for old_weight, new_weight in zip(old_layer.get_weights(), new_layer.get_weights()):
+                if old_weight.shape != new_weight.shape:
+                    new_weight[tuple(slice(0, dim) for dim in old_weight.shape)] = old_weight
+                    old_weight = new_weight
+                weights.append(old_weight)
+            new_layer.set_weights(weights)
+        
+        model.compile(
+            optimizer=Adam(learning_rate=learning_rate),
+            loss='sparse_categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        
+        if vocab_size is not None:
+            self.vocab_size = vocab_size
+        self.model = model
+        return model
+    
     def predict_isl_signs(self, input_data):
         """Predict ISL signs from input data"""
         if self.model is None:
@@ -260,6 +810,12 @@ class ISLAvatarGenerator:
     def load_sign_mappings(self):
         """Load ISL sign to animation mappings"""
         mappings_path = Path("ml-models/data/sign_mappings.json")
+        compiled_path = mappings_path.with_name(COMPILED_MAPPINGS_NAME)
+        # Prefer the keyframe-reduced mappings unless the source was edited since
+        if compiled_path.exists() and (
+            not mappings_path.exists() or compiled_path.stat().st_mtime >= mappings_path.stat().st_mtime
+        ):
+            return load_compiled_mappings(compiled_path)
         if mappings_path.exists():
             with open(mappings_path, 'r') as f:
                 return json.load(f)
@@ -296,17 +852,18 @@ class ISLAvatarGenerator:
         current_time = 0
         for sign in isl_signs:
             if sign in self.sign_to_animation:
-                sign_data = self.sign_to_animation[sign].copy()
+                sign_data = self.sign_to_animation[sign]
                 
-                # Adjust timing based on current position
-                for keyframe in sign_data['keyframes']:
-                    keyframe['time'] += current_time
+                # Adjust timing based on current position (on copies, the mappings are shared)
+                keyframes = [
+                    dict(keyframe, time=keyframe['time'] + current_time) for keyframe in sign_data['keyframes']
+                ]
                 
                 animation_data['signs'].append({
                     'sign': sign,
                     'start_time': current_time,
                     'end_time': current_time + sign_data['duration'],
-                    'keyframes': sign_data['keyframes']
+                    'keyframes': keyframes
                 })
                 
                 current_time += sign_data['duration'] + 0.2  # Add pause between signs
@@ -324,81 +881,218 @@ class ISLAvatarGenerator:
 class ISLTrainingPipeline:
     """Complete training pipeline for ISL translation"""
     
-    def __init__(self):
+    def __init__(self, models_dir="ml-models/models", training_config=None, memmap_dir=None):
+        self.models_dir = Path(models_dir)
+        # Where text corpora are memory-mapped; None keeps them in RAM
+        self.memmap_dir = Path(memmap_dir) if memmap_dir else None
+        self.models_dir.mkdir(parents=True, exist_ok=True)
+        self.training_config = training_config
+        if training_config is not None:
+            training_config.apply_runtime()
         self.data_processor = ISLDataProcessor()
         self.text_model = ISLTranslationModel()
+        self.text_sequence_model = ISLTranslationModel()
         self.speech_model = ISLTranslationModel()
+        self.landmark_model = ISLTranslationModel()
         self.avatar_generator = ISLAvatarGenerator()
         
-    def prepare_training_data(self, data_dir):
-        """Prepare training data from dataset"""
+    def checkpoint_dir(self, name):
+        """Resumable checkpoint directory for a model, or None when checkpointing is off"""
+        if self.training_config is None or self.training_config.checkpoint_steps is None:
+            return None
+        return self.models_dir / 'checkpoints' / name
+    
+    def sequence_length(self):
+        """Text model input length for this pipeline's training config"""
+        if self.training_config is None:
+            return 50
+        return self.training_config.sequence_length()
+    
+    def prepare_training_data(self, data_dir, memmap_dir=None):
+        """Prepare training data from dataset
+
+        Text corpora are streamed in chunks; with ``memmap_dir`` (default: the
+        pipeline's) the token IDs are written to a memory-mapped file instead of
+        being held in RAM. Text labels are int IDs into ``text_label_names``.
+        """
         data_dir = Path(data_dir)
-        
-        # Load text-ISL pairs
-        text_data = []
-        isl_labels = []
+        memmap_dir = memmap_dir or self.memmap_dir
         
         # Load speech-ISL pairs
         speech_data = []
         speech_labels = []
         
-        # Process training files
-        for text_file in data_dir.glob("text_data/*.txt"):
-            with open(text_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                for line in lines:
-                    if '\t' in line:
-                        text, isl_sign = line.strip().split('\t')
-                        text_processed = self.data_processor.preprocess_text(text)
-                        text_data.append(text_processed)
-                        isl_labels.append(isl_sign)
+        # Stream text-ISL pairs
+        reader = TextCorpusReader(self.data_processor.load_vocabulary())
+        memmap_path = Path(memmap_dir) / f"{data_dir.name}_text_tokens.int32" if memmap_dir else None
+        text_data, text_label_ids = reader.read(sorted(data_dir.glob("text_data/*.txt")), memmap_path)
+        text_label_names = reader.label_names()
         
-        # Process audio files
-        for audio_file in data_dir.glob("audio_data/*.wav"):
+        # Process audio files, including augmented copies in aug-shard-* subdirectories
+        for audio_file in sorted(data_dir.glob("audio_data/**/*.wav")):
             features = self.data_processor.extract_audio_features(str(audio_file))
             if features is not None:
                 speech_data.append(features)
                 # Get corresponding label from filename or metadata
-                label = audio_file.stem.split('_')[0]  # Assuming filename format: sign_001.wav
+                label = audio_file.stem.split('_')[0]  # Assuming filename format: sign_001.wav (or sign_001-aug0.wav)
                 speech_labels.append(label)
         
         return {
-            'text_data': np.array(text_data),
-            'text_labels': np.array(isl_labels),
+            'text_data': text_data,
+            'text_label_ids': text_label_ids,
+            'text_label_names': text_label_names,
+            'text_stats': dict(reader.stats),
             'speech_data': np.array(speech_data),
             'speech_labels': np.array(speech_labels)
         }
     
-    def train_text_to_isl_model(self, data_dir, epochs=100):
-        """Train text to ISL translation model"""
+    def train_text_to_isl_model(self, data_dir, epochs=100, warm_start_dir=None,
+                                architecture='lstm_attention'):
+        """Train text to ISL translation model
+
+        With ``warm_start_dir`` the previous model is fine-tuned instead of
+        trained from scratch: its sign order is kept, new signs are appended,
+        and the embedding/output layers grow in place.
+        """
         logger.info("Starting text-to-ISL model training...")
         
         # Prepare data
         data = self.prepare_training_data(data_dir)
+        if not len(data['text_label_ids']):
+            raise ValueError(f"No text samples found in {Path(data_dir) / 'text_data'}")
+        
+        from sklearn.preprocessing import LabelEncoder
+        
+        vocabulary = self.data_processor.load_vocabulary()
+        capacity = vocab_capacity(vocabulary_size(vocabulary))
+        
+        # Stable class order: previous signs keep their index, new ones go last
+        classes = sorted(set(data['text_label_names']))
+        if warm_start_dir is not None:
+            warm_start_dir = Path(warm_start_dir)
+            previous_signs = list(load_sign_table(warm_start_dir / 'text_sign_table.json'))
+            classes = previous_signs + [c for c in classes if c not in set(previous_signs)]
         
         # Encode labels
-        label_encoder = LabelEncoder()
-        encoded_labels = label_encoder.fit_transform(data['text_labels'])
+        _, encoded_labels = remap_label_ids(data['text_label_ids'], data['text_label_names'], classes)
+        
+        # Split by row indices; memory-mapped token IDs stay on disk
+        train_rows, val_rows = split_rows(len(encoded_labels), test_size=0.2, seed=42)
+        X_train, X_val = RowView(data['text_data'], train_rows), RowView(data['text_data'], val_rows)
+        y_train, y_val = encoded_labels[train_rows], encoded_labels[val_rows]
+        
+        # Build and train model
+        num_classes = len(classes)
+        if warm_start_dir is not None:
+            logger.info(f"Warm-starting from {warm_start_dir}")
+            self.text_model.load_model(str(warm_start_dir / 'text_to_isl_model.h5'))
+            current_capacity = embedding_input_dim(self.text_model.model)
+            self.text_model.resize(
+                vocab_size=max(capacity, current_capacity),
+                num_classes=num_classes,
+                learning_rate=0.0001
+            )
+            fine_tune_lr = 0.1 * (self.training_config.effective_learning_rate() if self.training_config else 0.001)
+        else:
+            fine_tune_lr = None
+            self.text_model.vocab_size = capacity
+            self.text_model.build_text_model(
+                architecture, max_sequence_length=self.sequence_length(), num_isl_signs=num_classes
+            )
+        
+        history = self.text_model.train_model(
+            X_train, y_train, X_val, y_val, epochs=epochs,
+            training_config=self.training_config, learning_rate=fine_tune_lr,
+            checkpoint_dir=self.checkpoint_dir('text')
+        )
+        
+        # Save model, sign table and the vocabulary it was trained with
+        self.text_model.save_model(str(self.models_dir / 'text_to_isl_model.h5'))
+        save_sign_table(classes, self.models_dir / 'text_sign_table.json')
+        with open(self.models_dir / 'vocabulary.json', 'w', encoding='utf-8') as f:
+            json.dump(vocabulary, f, ensure_ascii=False)
+        
+        # LabelEncoder assumes sorted classes, so only pickle it when that holds
+        if classes == sorted(classes):
+            label_encoder = LabelEncoder()
+            label_encoder.fit(classes)
+            with open(self.models_dir / 'text_label_encoder.pkl', 'wb') as f:
+                pickle.dump(label_encoder, f)
+        
+        logger.info("Text-to-ISL model training completed!")
+        return history
+    
+    def prepare_sequence_training_data(self, data_dir, num_samples=5000, max_phrases=4,
+                                       max_length=50, seed=42):
+        """Compose multi-phrase sentences with per-token BIO sign tags"""
+        data_dir = Path(data_dir)
+        
+        # Collect phrase-sign pairs
+        pairs = []
+        for text_file in data_dir.glob("text_data/*.txt"):
+            with open(text_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if '\t' in line:
+                        text, isl_sign = line.strip().split('\t')
+                        if tokenize(text):
+                            pairs.append((text, isl_sign))
+        
+        if not pairs:
+            raise ValueError(f"No text training data found in {data_dir}")
+        
+        tag_table = build_sequence_tag_table(sorted({sign for _, sign in pairs}))
+        tag_index = {tag: idx for idx, tag in enumerate(tag_table)}
+        
+        rng = np.random.default_rng(seed)
+        X = np.zeros((num_samples, max_length), dtype=np.int32)
+        Y = np.zeros((num_samples, max_length), dtype=np.int32)
+        
+        for i in range(num_samples):
+            words = []
+            tags = []
+            for j in rng.integers(0, len(pairs), size=rng.integers(1, max_phrases + 1)):
+                text, isl_sign = pairs[j]
+                phrase_words = tokenize(text)
+                words.extend(phrase_words)
+                tags.append(tag_index[f"B-{isl_sign}"])
+                tags.extend([tag_index[f"I-{isl_sign}"]] * (len(phrase_words) - 1))
+            
+            X[i] = self.data_processor.preprocess_text(" ".join(words), max_length)
+            tags = tags[:max_length]
+            Y[i, :len(tags)] = tags
+        
+        return X, Y, tag_table
+    
+    def train_text_to_isl_sequence_model(self, data_dir, epochs=100, num_samples=5000):
+        """Train per-token text to ISL sequence model"""
+        logger.info("Starting text-to-ISL sequence model training...")
+        from sklearn.model_selection import train_test_split
+        
+        # Prepare data
+        X, Y, tag_table = self.prepare_sequence_training_data(data_dir, num_samples=num_samples)
         
         # Split data
         X_train, X_val, y_train, y_val = train_test_split(
-            data['text_data'], encoded_labels, test_size=0.2, random_state=42
+            X, Y, test_size=0.2, random_state=42
         )
         
         # Build and train model
-        num_classes = len(label_encoder.classes_)
-        self.text_model.build_text_to_isl_model(num_isl_signs=num_classes)
+        vocabulary = self.data_processor.load_vocabulary()
+        self.text_sequence_model.vocab_size = vocab_capacity(vocabulary_size(vocabulary))
+        self.text_sequence_model.build_text_to_isl_sequence_model(
+            max_sequence_length=self.sequence_length(), num_tags=len(tag_table)
+        )
         
-        history = self.text_model.train_model(
-            X_train, y_train, X_val, y_val, epochs=epochs
+        history = self.text_sequence_model.train_model(
+            X_train, y_train, X_val, y_val, epochs=epochs,
+            training_config=self.training_config, checkpoint_dir=self.checkpoint_dir('text_sequence')
         )
         
-        # Save model and label encoder
-        self.text_model.save_model('ml-models/models/text_to_isl_model.h5')
-        with open('ml-models/models/text_label_encoder.pkl', 'wb') as f:
-            pickle.dump(label_encoder, f)
+        # Save model and tag table
+        self.text_sequence_model.save_model(str(self.models_dir / 'text_to_isl_sequence_model.h5'))
+        save_sign_table(tag_table, self.models_dir / 'text_sequence_tags.json')
         
-        logger.info("Text-to-ISL model training completed!")
+        logger.info("Text-to-ISL sequence model training completed!")
         return history
     
     def train_speech_to_isl_model(self, data_dir, epochs=100):
@@ -408,6 +1102,9 @@ class ISLTrainingPipeline:
         # Prepare data
         data = self.prepare_training_data(data_dir)
         
+        from sklearn.preprocessing import LabelEncoder
+        from sklearn.model_selection import train_test_split
+        
         # Encode labels
         label_encoder = LabelEncoder()
         encoded_labels = label_encoder.fit_transform(data['speech_labels'])
@@ -422,50 +1119,223 @@ class ISLTrainingPipeline:
         self.speech_model.build_speech_to_isl_model(num_isl_signs=num_classes)
         
         history = self.speech_model.train_model(
-            X_train, y_train, X_val, y_val, epochs=epochs
+            X_train, y_train, X_val, y_val, epochs=epochs,
+            training_config=self.training_config, checkpoint_dir=self.checkpoint_dir('speech')
         )
         
         # Save model and label encoder
-        self.speech_model.save_model('ml-models/models/speech_to_isl_model.h5')
-        with open('ml-models/models/speech_label_encoder.pkl', 'wb') as f:
+        self.speech_model.save_model(str(self.models_dir / 'speech_to_isl_model.h5'))
+        with open(self.models_dir / 'speech_label_encoder.pkl', 'wb') as f:
             pickle.dump(label_encoder, f)
+        save_sign_table(label_encoder.classes_, self.models_dir / 'speech_sign_table.json')
         
         logger.info("Speech-to-ISL model training completed!")
         return history
     
-    def evaluate_models(self, test_data_dir):
-        """Evaluate trained models on test data"""
-        logger.info("Evaluating models...")
+    def prepare_landmark_windows(self, data_dir, window=32, windows_per_sequence=4, seed=42):
+        """Cut training windows from (frames, 126) landmark sequences in video_data
+
+        Windows are taken at random offsets, and sequences shorter than the
+        window are zero-padded at the front, matching the streaming ring buffer.
+        Files are labelled with their sign_mappings.json key; others are skipped.
+        """
+        rng = np.random.default_rng(seed)
+        windows = []
+        labels = []
+        known_signs = set(self.avatar_generator.sign_to_animation)
+        unknown = 0
+        
+        for landmark_file in sorted(Path(data_dir).glob("video_data/**/*.npy")):
+            # Handles multi-word signs (good_morning_001.npy) and library clips (thank-you_<hash>.npy)
+            label = sign_for_file(landmark_file.stem, known_signs)
+            if label is None:
+                unknown += 1
+                continue
+            sequence = np.load(landmark_file).astype(np.float32)
+            if sequence.ndim != 2 or not len(sequence):
+                continue
+            
+            for _ in range(windows_per_sequence if len(sequence) > window else 1):
+                end = rng.integers(window, len(sequence) + 1) if len(sequence) > window else len(sequence)
+                sample = np.zeros((window, sequence.shape[1]), dtype=np.float32)
+                frames = sequence[max(0, end - window):end]
+                sample[window - len(frames):] = frames
+                windows.append(sample)
+                labels.append(label)
+        
+        if unknown:
+            logger.warning(f"Skipped {unknown} landmark files whose sign is not in sign_mappings.json")
+        return np.array(windows), np.array(labels)
+    
+    def train_landmark_model(self, data_dir, epochs=100, window=32):
+        """Train sliding-window landmark classifier for streaming recognition"""
+        logger.info("Starting landmark-to-ISL model training...")
         
-        # Load test data
-        test_data = self.prepare_training_data(test_data_dir)
+        from sklearn.model_selection import train_test_split
         
-        # Load label encoders
-        with open('ml-models/models/text_label_encoder.pkl', 'rb') as f:
-            text_label_encoder = pickle.load(f)
+        windows, labels = self.prepare_landmark_windows(data_dir, window=window)
+        if not len(windows):
+            raise ValueError(f"No landmark sequences found in {data_dir}")
         
-        with open('ml-models/models/speech_label_encoder.pkl', 'rb') as f:
-            speech_label_encoder = pickle.load(f)
+        # Encode labels
+        classes = sorted(set(labels))
+        class_index = {sign: idx for idx, sign in enumerate(classes)}
+        encoded_labels = np.array([class_index[label] for label in labels])
         
-        # Evaluate text model
-        text_encoded_labels = text_label_encoder.transform(test_data['text_labels'])
-        text_loss, text_accuracy = self.text_model.model.evaluate(
-            test_data['text_data'], text_encoded_labels, verbose=0
+        # Split data
+        X_train, X_val, y_train, y_val = train_test_split(
+            windows, encoded_labels, test_size=0.2, random_state=42
         )
         
-        # Evaluate speech model
-        speech_encoded_labels = speech_label_encoder.transform(test_data['speech_labels'])
-        speech_loss, speech_accuracy = self.speech_model.model.evaluate(
-            test_data['speech_data'], speech_encoded_labels, verbose=0
+        # Build and train model
+        self.landmark_model.build_landmark_sequence_model(window=window, num_isl_signs=len(classes))
+        
+        history = self.landmark_model.train_model(
+            X_train, y_train, X_val, y_val, epochs=epochs,
+            training_config=self.training_config, checkpoint_dir=self.checkpoint_dir('landmark')
         )
         
-        results = {
-            'text_model': {'loss': text_loss, 'accuracy': text_accuracy},
-            'speech_model': {'loss': speech_loss, 'accuracy': speech_accuracy}
-        }
+        # Save model and sign table
+        self.landmark_model.save_model(str(self.models_dir / 'landmark_model.h5'))
+        save_sign_table(classes, self.models_dir / 'landmark_sign_table.json')
         
-        logger.info(f"Evaluation results: {results}")
-        return results
+        logger.info("Landmark-to-ISL model training completed!")
+        return history
+    
+    def compare_text_architectures(self, train_data_dir, test_data_dir, architectures=None,
+                                   epochs=30, report_path="ml-models/logs/text_architectures.md"):
+        """Train each text architecture and tabulate test accuracy against CPU latency"""
+        architectures = architectures or list(TEXT_ARCHITECTURES)
+        test_data = self.prepare_training_data(test_data_dir)
+        models_dir = self.models_dir
+        rows = []
+        
+        for architecture in architectures:
+            # Keep each candidate's artifacts apart from the main model
+            self.models_dir = models_dir / "architectures" / architecture
+            self.models_dir.mkdir(parents=True, exist_ok=True)
+            self.text_model = ISLTranslationModel()
+            self.train_text_to_isl_model(train_data_dir, epochs=epochs, architecture=architecture)
+            model = self.text_model.model
+            
+            # Score test samples whose sign the model knows
+            signs = load_sign_table(self.models_dir / 'text_sign_table.json')
+            known, y_test = remap_label_ids(test_data['text_label_ids'], test_data['text_label_names'], signs)
+            X_test = np.asarray(test_data['text_data'][np.flatnonzero(known)])
+            accuracy = float(np.mean(np.argmax(model.predict(X_test, verbose=0), axis=1) == y_test)) if len(y_test) else 0.0
+            
+            single_ms, single_p95 = measure_latency(model, X_test[:1] if len(X_test) else np.zeros((1, 50), np.int32))
+            batch = np.resize(X_test, (64, X_test.shape[1])) if len(X_test) else np.zeros((64, 50), np.int32)
+            batch_ms, _ = measure_latency(model, batch)
+            
+            rows.append({
+                'architecture': architecture,
+                'parameters': int(model.count_params()),
+                'test_accuracy': accuracy,
+                'test_samples': int(len(y_test)),
+                'latency_ms_batch1': single_ms,
+                'latency_ms_batch1_p95': single_p95,
+                'throughput_batch64': 64 / (batch_ms / 1000.0)
+            })
+        
+        self.models_dir = models_dir
+        
+        baseline = next((row for row in rows if row['architecture'] == 'lstm_attention'), rows[0])
+        lines = [
+            "| Architecture | Params | Test accuracy | Latency p50 (ms, batch 1) | p95 | Speedup | Samples/sec (batch 64) |",
+            "|---|---|---|---|---|---|---|"
+        ]
+        for row in rows:
+            speedup = baseline['latency_ms_batch1'] / row['latency_ms_batch1']
+            lines.append(
+                f"| {row['architecture']} | {row['parameters']:,} | {row['test_accuracy']:.4f} | "
+                f"{row['latency_ms_batch1']:.2f} | {row['latency_ms_batch1_p95']:.2f} | "
+                f"{speedup:.1f}x | {row['throughput_batch64']:.0f} |"
+            )
+        table = "\n".join(lines)
+        
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w') as f:
+            f.write(table + "\n")
+        with open(Path(report_path).with_suffix('.json'), 'w') as f:
+            json.dump(rows, f, indent=2)
+        
+        logger.info(f"Text architecture comparison:\n{table}")
+        return rows
+    
+    def evaluate_models(self, test_data_dir):
+        """Evaluate the models saved in ``models_dir`` on test data
+
+        Runs the batched evaluation over the saved artifacts (not the models in
+        memory) and writes ``evaluation.json`` next to them, so each published
+        version carries a report later versions can be gated against.
+        """
+        from model_evaluation import evaluate_version
+        
+        logger.info("Evaluating models...")
+        return evaluate_version(self.models_dir, test_data_dir, report_path=self.models_dir / 'evaluation.json')
+
+def benchmark_worker(data_dir, config_kwargs, epochs, results):
+    """Train a text model with one config in a fresh process and report throughput"""
+    config = TrainingConfig(**config_kwargs)
+    pipeline = ISLTrainingPipeline(models_dir="ml-models/checkpoints/benchmark", training_config=config)
+    history = pipeline.train_text_to_isl_model(data_dir, epochs=epochs)
+    
+    # The first epoch includes graph tracing/compilation, so report it separately
+    throughput = history.history.get('samples_per_sec', [])
+    steady = throughput[1:] or throughput
+    results.put({
+        'config': config.to_dict(),
+        'first_epoch_samples_per_sec': throughput[0] if throughput else None,
+        'samples_per_sec': float(np.median(steady)) if steady else None,
+        'best_val_accuracy': max(history.history.get('val_accuracy', [0.0]))
+    })
+
+DEFAULT_BENCHMARK_CONFIGS = [
+    {'batch_size': 32},
+    {'batch_size': 128},
+    {'batch_size': 128, 'steps_per_execution': 16},
+    {'batch_size': 128, 'steps_per_execution': 16, 'jit_compile': True},
+    {'batch_size': 128, 'steps_per_execution': 16, 'jit_compile': True, 'mixed_precision': True},
+    {'batch_size': 256, 'steps_per_execution': 16, 'jit_compile': True}
+]
+
+def benchmark_training_configs(data_dir, configs=None, epochs=3, report_path="ml-models/logs/training_benchmark.json"):
+    """Compare samples/sec and validation accuracy across training configs
+
+    Each config trains in its own process because thread pools and the
+    precision policy are process-wide.
+    """
+    import multiprocessing
+    
+    if not any(Path(data_dir).glob("text_data/*.txt")):
+        raise ValueError(f"No text corpus files in {Path(data_dir) / 'text_data'}")
+    
+    context = multiprocessing.get_context('spawn')
+    reports = []
+    for config_kwargs in configs or DEFAULT_BENCHMARK_CONFIGS:
+        results = context.Queue()
+        process = context.Process(target=benchmark_worker, args=(data_dir, config_kwargs, epochs, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0 or results.empty():
+            logger.warning(f"Benchmark failed for config {config_kwargs}")
+            continue
+        report = results.get()
+        reports.append(report)
+        logger.info(
+            f"{config_kwargs}: {report['samples_per_sec']:.0f} samples/sec, "
+            f"val accuracy {report['best_val_accuracy']:.4f}"
+        )
+    
+    if not reports:
+        raise RuntimeError("Every training benchmark config failed, no report written")
+    
+    Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(reports, f, indent=2)
+    logger.info(f"Training benchmark written to {report_path}")
+    return reports
 
 def main():
     """Main training function"""
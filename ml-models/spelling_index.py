@@ -0,0 +1,292 @@
+"""
+Spelling index for out-of-vocabulary words
+Maps typos and transliteration variants to the closest known word using a
+character bigram inverted index and a bounded edit distance, so they reach the
+phrase index and the text model instead of becoming <UNK>
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+import logging
+
+import numpy as np
+
+from text_normalization import tokenize
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPELLING_INDEX_PATH = "ml-models/data/spelling_index.json"
+GRAM_SIZE = 2
+MIN_TOKEN_LENGTH = 3
+CACHE_SIZE = 50000
+
+def max_edit_distance(token):
+    """Edit-distance bound for a token: stricter for short words"""
+    return 1 if len(token) <= 4 else 2
+
+def char_grams(word, n=GRAM_SIZE):
+    """Character n-grams of a word with boundary markers"""
+    padded = f"^{word}$"
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+def edit_distance(a, b, bound):
+    """Optimal string alignment distance, or ``bound + 1`` once it is exceeded"""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > bound:
+            return bound + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+class SpellingIndex:
+    """Character bigram postings over known words, queried with a q-gram filter
+
+    A word within edit distance k of a token shares at least
+    ``max(grams) - (GRAM_SIZE + 1) * k`` bigrams with it (a transposition
+    touches three); only words passing that count and the length filter are
+    compared with the exact distance.
+    """
+
+    def __init__(self, words=()):
+        self.words = []
+        self.word_ids = {}
+        self.postings = {}
+        self.cache = {}
+        self.stats = {'lookups': 0, 'known': 0, 'corrected': 0, 'unmatched': 0, 'skipped': 0}
+        for word in words:
+            self.add(word)
+        self.freeze()
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word):
+        if word in self.word_ids or not word or word.startswith('<'):
+            return
+        word_id = len(self.words)
+        self.words.append(word)
+        self.word_ids[word] = word_id
+        for gram in char_grams(word):
+            self.postings.setdefault(gram, []).append(word_id)
+
+    def freeze(self):
+        """Convert postings to arrays once all words are added"""
+        self.postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in self.postings.items()}
+        self.lengths = np.array([len(word) for word in self.words], dtype=np.int32)
+        self.gram_counts = np.array([len(char_grams(word)) for word in self.words], dtype=np.int32)
+        self.cache = {}
+
+    def lookup(self, token):
+        """(closest known word, distance) for a token, or None if nothing is close enough"""
+        self.stats['lookups'] += 1
+        if token in self.word_ids:
+            self.stats['known'] += 1
+            return token, 0
+        if len(token) < MIN_TOKEN_LENGTH or any(char.isdigit() for char in token):
+            self.stats['skipped'] += 1
+            return None
+
+        if token in self.cache:
+            match = self.cache[token]
+        else:
+            match = self.search(token)
+            if len(self.cache) >= CACHE_SIZE:
+                self.cache.clear()
+            self.cache[token] = match
+        self.stats['corrected' if match else 'unmatched'] += 1
+        return match
+
+    def search(self, token):
+        bound = max_edit_distance(token)
+        grams = char_grams(token)
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return None
+
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.words))
+        missing = np.maximum(self.gram_counts, len(grams)) - shared
+        candidates = np.flatnonzero(
+            (missing <= (GRAM_SIZE + 1) * bound) & (shared > 0) & (np.abs(self.lengths - len(token)) <= bound)
+        )
+        # Visit candidates by their distance lower bound, most shared grams first,
+        # and stop once no remaining candidate can beat the best match
+        lower_bounds = -(-missing[candidates] // (GRAM_SIZE + 1))
+        candidates = candidates[np.lexsort((-shared[candidates], lower_bounds))]
+        lower_bounds = np.sort(lower_bounds)
+
+        best = None
+        for word_id, lower_bound in zip(candidates, lower_bounds):
+            if best is not None and lower_bound >= best[1]:
+                break
+            distance = edit_distance(token, self.words[word_id], bound if best is None else best[1] - 1)
+            if best is None and distance <= bound or best is not None and distance < best[1]:
+                best = (self.words[word_id], int(distance))
+        return best
+
+    def correct(self, tokens):
+        """Tokens with OOV words replaced, plus the corrections made"""
+        corrected = []
+        corrections = []
+        for token in tokens:
+            match = self.lookup(token)
+            if match is not None and match[1] > 0:
+                corrections.append({'token': token, 'word': match[0], 'distance': match[1]})
+                token = match[0]
+            corrected.append(token)
+        return corrected, corrections
+
+    def info(self):
+        attempted = self.stats['corrected'] + self.stats['unmatched']
+        return dict(
+            self.stats,
+            words=len(self.words),
+            hit_rate=round(self.stats['corrected'] / attempted, 4) if attempted else None
+        )
+
+    def save(self, path):
+        """Write the words and bigram postings as JSON"""
+        data = {
+            'gram_size': GRAM_SIZE,
+            'words': self.words,
+            'postings': {gram: ids.tolist() for gram, ids in self.postings.items()}
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        logger.info(f"Spelling index with {len(self.words)} words saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        index = cls()
+        index.words = data['words']
+        index.word_ids = {word: word_id for word_id, word in enumerate(index.words)}
+        index.postings = data['postings']
+        index.freeze()
+        return index
+
+def build_spelling_index(vocabulary, phrases=(), path=DEFAULT_SPELLING_INDEX_PATH):
+    """Index vocabulary words and the words of known sign phrases"""
+    words = list(vocabulary)
+    for phrase in phrases:
+        words.extend(tokenize(phrase))
+    index = SpellingIndex(words)
+    index.save(path)
+    return index
+
+def load_spelling_index(path=DEFAULT_SPELLING_INDEX_PATH):
+    """Load the spelling index if it has been built, else None"""
+    if not Path(path).exists():
+        return None
+    index = SpellingIndex.load(path)
+    logger.info(f"Spelling index loaded ({len(index)} words)")
+    return index
+
+# ==== Benchmark ==== #
+
+def misspell(word, rng, edits):
+    """Apply random deletions, insertions, substitutions and transpositions"""
+    alphabet = sorted(set(word)) + list('aeiourstnlh')
+    chars = list(word)
+    for _ in range(edits):
+        operation = rng.choice(('delete', 'insert', 'substitute', 'transpose'))
+        position = rng.randrange(len(chars))
+        if operation == 'delete' and len(chars) > 1:
+            del chars[position]
+        elif operation == 'insert':
+            chars.insert(position, rng.choice(alphabet))
+        elif operation == 'transpose' and position + 1 < len(chars):
+            chars[position], chars[position + 1] = chars[position + 1], chars[position]
+        else:
+            chars[position] = rng.choice(alphabet)
+    return ''.join(chars)
+
+def misspelling_corpus(words, num_tokens=100000, seed=42):
+    """(misspelled token, intended word) pairs; each token gets its word's edit budget"""
+    rng = random.Random(seed)
+    words = [word for word in words if len(word) >= MIN_TOKEN_LENGTH]
+    corpus = []
+    for _ in range(num_tokens):
+        word = rng.choice(words)
+        corpus.append((misspell(word, rng, rng.randint(1, max_edit_distance(word))), word))
+    return corpus
+
+def benchmark(index, num_tokens=100000, seed=42):
+    """Accuracy, hit rate and per-token latency over a synthetic misspelling corpus"""
+    corpus = misspelling_corpus(index.words, num_tokens, seed)
+    timings = np.empty(len(corpus))
+    correct = matched = 0
+    for i, (token, word) in enumerate(corpus):
+        index.cache.clear()  # time the index, not the memo
+        start = time.perf_counter()
+        match = index.lookup(token)
+        timings[i] = time.perf_counter() - start
+        if match is not None:
+            matched += 1
+            correct += match[0] == word
+    return {
+        'tokens': len(corpus),
+        'words': len(index),
+        'hit_rate': round(matched / len(corpus), 4),
+        'accuracy': round(correct / len(corpus), 4),
+        'precision': round(correct / matched, 4) if matched else None,
+        'mean_us': round(float(timings.mean()) * 1e6, 2),
+        'p50_us': round(float(np.percentile(timings, 50)) * 1e6, 2),
+        'p99_us': round(float(np.percentile(timings, 99)) * 1e6, 2)
+    }
+
+def main():
+    """Build, query or benchmark the spelling index from the command line"""
+    parser = argparse.ArgumentParser(description="Character n-gram spelling index for OOV words")
+    parser.add_argument('--index', default=DEFAULT_SPELLING_INDEX_PATH, help="Index file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('build', help="Index vocabulary.json and phrase_index.json")
+    query = subparsers.add_parser('query', help="Correct the tokens of a text")
+    query.add_argument('text')
+    bench = subparsers.add_parser('benchmark', help="Measure accuracy and latency on synthetic misspellings")
+    bench.add_argument('--tokens', type=int, default=100000)
+    bench.add_argument('--report', default="ml-models/logs/spelling_benchmark.json")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        data_dir = Path(args.index).parent
+        with open(data_dir / "vocabulary.json", 'r', encoding='utf-8') as f:
+            vocabulary = json.load(f)
+        phrases = []
+        if (data_dir / "phrase_index.json").exists():
+            with open(data_dir / "phrase_index.json", 'r', encoding='utf-8') as f:
+                phrases = list(json.load(f)['phrases'])
+        build_spelling_index(vocabulary, phrases, args.index)
+    elif args.command == 'query':
+        index = SpellingIndex.load(args.index)
+        print(json.dumps(index.correct(tokenize(args.text)), indent=2, ensure_ascii=False))
+    else:
+        report = benchmark(SpellingIndex.load(args.index), args.tokens)
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Spelling benchmark: {json.dumps(report)}")
+
+if __name__ == "__main__":
+    main()
@@ -13,13 +13,21 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 if __name__ == "__main__":
+    host = os.environ.get('ISL_SERVER_HOST', '0.0.0.0')
+    port = int(os.environ.get('ISL_SERVER_PORT', '5001'))
     logger.info("Starting ISL Inference Server...")
-    logger.info("Server will be available at http://localhost:5001")
+    logger.info(f"Server will be available at http://localhost:{port}")
     logger.info("Endpoints:")
     logger.info("  - GET  /health - Health check")
     logger.info("  - POST /translate/text - Translate text to ISL")
     logger.info("  - POST /translate/speech - Translate speech to ISL")
     logger.info("  - POST /avatar/preview - Generate avatar preview")
     logger.info("  - GET  /models/info - Model information")
+    logger.info("  - POST /models/reload - Hot reload a model version")
+    logger.info("  - POST /recognize/frames - Stream landmark frames for sign recognition")
+    logger.info("  - WS   /recognize/stream - Persistent sign recognition session")
+    logger.info("  - POST /signs/lookup - Closest signs to an example landmark sequence")
+    logger.info("  - GET  /lessons/bundles - Precompiled lesson bundles")
+    logger.info("  - GET  /lessons/<id>/bundle - Lesson bundle (supports range requests)")
     
-    app.run(host='0.0.0.0', port=5001, debug=False)
\ No newline at end of file
+    app.run(host=host, port=port, debug=False)
\ No newline at end of file
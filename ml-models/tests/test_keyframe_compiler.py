@@ -0,0 +1,48 @@
+"""
+Tests for the keyframe compiler's error bound on compiled sign entries
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+
+import numpy as np
+
+from keyframe_compiler import compile_keyframes, decode_sign, DEFAULT_TOLERANCE
+
+def sine_keyframes(count, spacing, frequency):
+    times = np.arange(count) * spacing
+    return [
+        {'time': float(t), 'right_hand': [float(np.sin(2 * np.pi * frequency * t)), 0.5, 0.0], 'left_hand': [0, 0, 0]}
+        for t in times
+    ]
+
+class CompileKeyframesTest(unittest.TestCase):
+
+    def test_dense_track_stays_within_tolerance_and_is_simplified(self):
+        # At 2.5 ms spacing, rounding times to whole ms alone breaks the bound
+        keyframes = sine_keyframes(400, 0.0025, frequency=4)
+        entry, max_error = compile_keyframes(keyframes, duration=1.0)
+
+        self.assertLessEqual(max_error, DEFAULT_TOLERANCE)
+        self.assertLess(len(entry['times']), len(keyframes) // 3)
+
+    def test_sparse_track_keeps_whole_millisecond_times(self):
+        keyframes = sine_keyframes(50, 0.02, frequency=1)
+        entry, max_error = compile_keyframes(keyframes, duration=1.0)
+
+        self.assertLessEqual(max_error, DEFAULT_TOLERANCE)
+        self.assertTrue(all(isinstance(t, int) for t in entry['times']))
+
+    def test_decoded_sign_round_trips_times(self):
+        keyframes = sine_keyframes(50, 0.02, frequency=1)
+        entry, _ = compile_keyframes(keyframes, duration=1.0, time_offset=0.5)
+        decoded = decode_sign(entry, time_offset=0.5)
+
+        self.assertEqual(decoded['duration'], 1.0)
+        self.assertAlmostEqual(decoded['keyframes'][-1]['time'], keyframes[-1]['time'], places=3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests for cutting landmark training windows out of video_data sequences
+Needs the training stack (TensorFlow, MediaPipe); skipped where it is not installed
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from speech_to_isl import ISLTrainingPipeline
+except ImportError as e:
+    ISLTrainingPipeline = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = ""
+
+@unittest.skipIf(ISLTrainingPipeline is None, f"training stack unavailable: {IMPORT_ERROR}")
+class PrepareLandmarkWindowsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        root = Path(self.tmp_dir.name)
+        self.data_dir = root / "data"
+        video_dir = self.data_dir / "video_data"
+        video_dir.mkdir(parents=True)
+
+        rng = np.random.default_rng(0)
+        np.save(video_dir / "good_morning_001.npy", rng.random((40, 126), dtype=np.float32))
+        np.save(video_dir / "thank-you_3f9a2c.npy", rng.random((10, 126), dtype=np.float32))
+        np.save(video_dir / "unknown_sign_001.npy", rng.random((40, 126), dtype=np.float32))
+
+        self.pipeline = ISLTrainingPipeline(models_dir=str(root / "models"))
+        self.pipeline.avatar_generator.sign_to_animation = {
+            'good_morning': {'keyframes': [], 'duration': 1.0},
+            'thank_you': {'keyframes': [], 'duration': 1.0},
+            'good': {'keyframes': [], 'duration': 1.0},
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_windows_are_labelled_with_sign_mapping_keys(self):
+        windows, labels = self.pipeline.prepare_landmark_windows(
+            self.data_dir, window=32, windows_per_sequence=4
+        )
+
+        # good_morning is long enough for 4 windows, thank-you gets one padded window
+        self.assertEqual(windows.shape, (5, 32, 126))
+        self.assertEqual(sorted(set(labels)), ['good_morning', 'thank_you'])
+        self.assertEqual(list(labels).count('good_morning'), 4)
+
+        padded = windows[list(labels).index('thank_you')]
+        self.assertFalse(padded[:22].any())
+        self.assertTrue(padded[22:].any())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Tests for the two-level translation cache against its local stand-in backends
+Runs without a Redis server: LocalRedisServer speaks the RESP subset the
+client uses, and SQLite uses a temporary database file
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import threading
+import time
+import unittest
+
+from translation_cache import (
+    TranslationCache, LocalRedisServer, RedisCacheBackend, SQLiteCacheBackend, cache_key
+)
+
+WORKERS = 8
+
+class SharedBackendTests:
+    """Cases run against each shared backend; subclasses provide make_backend()"""
+
+    def make_cache(self, **kwargs):
+        # One TranslationCache per simulated worker process, all on one backend
+        kwargs.setdefault('lease_seconds', 5.0)
+        return TranslationCache(self.make_backend(), **kwargs)
+
+    def run_workers(self, caches, key, compute):
+        results = [None] * len(caches)
+        barrier = threading.Barrier(len(caches))
+
+        def worker(i):
+            barrier.wait()
+            results[i] = caches[i].get_or_compute(key, compute)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(caches))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_misses_compute_once_across_workers(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'signs': ['hello']}
+
+        caches = [self.make_cache() for _ in range(WORKERS)]
+        results = self.run_workers(caches, cache_key('text', 'hello'), compute)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'signs': ['hello']}] * WORKERS)
+
+    def test_concurrent_misses_compute_once_within_worker(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'signs': ['thank_you']}
+
+        cache = self.make_cache()
+        results = self.run_workers([cache] * WORKERS, cache_key('text', 'thank you'), compute)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'signs': ['thank_you']}] * WORKERS)
+        self.assertEqual(cache.stats['misses'], 1)
+
+    def test_entries_expire_after_ttl(self):
+        key = cache_key('text', 'good morning')
+        self.make_cache(ttl=0.3).get_or_compute(key, lambda: {'signs': ['good_morning']})
+
+        # A fresh worker (empty L1) sees the shared entry, then not after the TTL
+        self.assertEqual(self.make_cache().lookup(key), {'signs': ['good_morning']})
+        time.sleep(0.5)
+        self.assertIsNone(self.make_cache().lookup(key))
+
+    def test_failed_compute_releases_lease(self):
+        key = cache_key('text', 'failing')
+        cache = self.make_cache()
+
+        def fail():
+            raise RuntimeError("model unavailable")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute(key, fail)
+        self.assertIsNone(cache.backend.get(f"{key}:lease"))
+
+        # The next worker computes right away instead of waiting out the lease
+        start = time.monotonic()
+        self.assertEqual(self.make_cache().get_or_compute(key, lambda: {'signs': []}), {'signs': []})
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_waiter_takes_over_when_holder_fails(self):
+        key = cache_key('text', 'takeover')
+        holder, waiter = self.make_cache(), self.make_cache()
+        errors = []
+
+        def fail_slowly():
+            time.sleep(0.2)
+            raise RuntimeError("model unavailable")
+
+        def run_holder():
+            try:
+                holder.get_or_compute(key, fail_slowly)
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=run_holder)
+        thread.start()
+        time.sleep(0.05)
+        start = time.monotonic()
+        value = waiter.get_or_compute(key, lambda: {'signs': ['hello']})
+        elapsed = time.monotonic() - start
+        thread.join()
+
+        self.assertEqual(value, {'signs': ['hello']})
+        self.assertEqual(len(errors), 1)
+        self.assertLess(elapsed, 1.0)
+
+class LocalRedisCacheTest(SharedBackendTests, unittest.TestCase):
+
+    def setUp(self):
+        self.server = LocalRedisServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def make_backend(self):
+        return RedisCacheBackend.from_url(self.server.url)
+
+class SQLiteCacheTest(SharedBackendTests, unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cache.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_backend(self):
+        return SQLiteCacheBackend(self.path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Text normalization for ISL translation
+Shared by data preparation, training and serving so that the vocabulary,
+phrase index and model inputs all see the same tokens
+"""
+
+import re
+import unicodedata
+
+DEVANAGARI_START = 0x0900
+DEVANAGARI_END = 0x097F
+
+# Zero-width joiners change rendering only, never the word
+ZERO_WIDTH_CHARS = dict.fromkeys(map(ord, '​‌‍﻿'))
+
+# Visually identical Devanagari spellings that NFC leaves distinct
+DEVANAGARI_VARIANTS = [
+    ('अा', 'आ'),  # अ + ा -> आ
+    ('एे', 'ऐ'),  # ए + े -> ऐ
+    ('ाे', 'ो'),  # ा + े -> ो
+    ('ाै', 'ौ'),  # ा + ै -> ौ
+    ('।', ' '),             # danda
+    ('॥', ' ')              # double danda
+]
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+def is_devanagari(char):
+    """Check whether a character belongs to the Devanagari block"""
+    return DEVANAGARI_START <= ord(char) <= DEVANAGARI_END
+
+def normalize_text(text):
+    """Return NFC, case-folded text with punctuation removed and spacing collapsed"""
+    text = unicodedata.normalize('NFC', text).translate(ZERO_WIDTH_CHARS)
+    for variant, canonical in DEVANAGARI_VARIANTS:
+        text = text.replace(variant, canonical)
+    text = text.casefold()
+
+    chars = []
+    previous_script = None
+    for char in text:
+        category = unicodedata.category(char)
+
+        # Punctuation and symbols separate tokens
+        if category[0] in ('P', 'S'):
+            chars.append(' ')
+            previous_script = None
+            continue
+
+        # Combining marks (matras, nukta, virama) stay attached to their base
+        if category[0] == 'M':
+            chars.append(char)
+            continue
+
+        if char.isspace():
+            chars.append(' ')
+            previous_script = None
+            continue
+
+        # Split where Latin and Devanagari run together, e.g. "helloनमस्ते"
+        script = 'deva' if is_devanagari(char) else 'other'
+        if previous_script is not None and script != previous_script:
+            chars.append(' ')
+        chars.append(char)
+        previous_script = script
+
+    return WHITESPACE_RE.sub(' ', ''.join(chars)).strip()
+
+def tokenize(text):
+    """Normalize text and split it into tokens"""
+    normalized = normalize_text(text)
+    return normalized.split(' ') if normalized else []
@@ -6,59 +6,284 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from speech_to_isl import ISLTrainingPipeline
+from speech_to_isl import (
+    ISLTrainingPipeline, TrainingConfig, TEXT_ARCHITECTURES, LENGTH_BUCKETS, benchmark_training_configs,
+    vocabulary_size
+)
 from data_preparation import ISLDatasetBuilder
+from training_checkpoints import TrainingPreempted, DEFAULT_CHECKPOINT_STEPS, DEFAULT_KEEP_CHECKPOINTS
+import argparse
+import json
 import logging
+import shutil
+import time
+from pathlib import Path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def latest_model_version_dir():
+    """Newest published model version directory, if any"""
+    versions_dir = Path("ml-models/models/versions")
+    if not versions_dir.exists():
+        return None
+    published = sorted(p for p in versions_dir.iterdir() if (p / "manifest.json").exists())
+    return published[-1] if published else None
+
+def latest_unfinished_version_dir():
+    """Newest model version directory that was never published, if any"""
+    versions_dir = Path("ml-models/models/versions")
+    if not versions_dir.exists():
+        return None
+    unfinished = sorted(p for p in versions_dir.iterdir() if p.is_dir() and not (p / "manifest.json").exists())
+    return unfinished[-1] if unfinished else None
+
+class TrainingProgress:
+    """Stages completed in a version directory, so a resumed run skips them"""
+    
+    def __init__(self, models_dir):
+        self.path = Path(models_dir) / "progress.json"
+        self.completed = {}
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.completed = json.load(f)
+    
+    def run_stage(self, name, train):
+        """Run a training stage unless a previous run finished it; True if it produced a model"""
+        if name in self.completed:
+            logger.info(f"Skipping {name}: completed by a previous run")
+            return self.completed[name]
+        trained = train() is not None
+        self.completed[name] = trained
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.completed, f, indent=2)
+        os.replace(tmp_path, self.path)
+        return trained
+
 def main():
     """Main training function"""
+    parser = argparse.ArgumentParser(description="Train ISL translation models")
+    parser.add_argument(
+        '--warm-start', nargs='?', const='latest', default=None,
+        help="Fine-tune the text model from a previous version directory (default: latest)"
+    )
+    parser.add_argument('--batch-size', type=int, default=32, help="Training batch size")
+    parser.add_argument('--no-lr-scaling', action='store_true', help="Keep the learning rate fixed when raising the batch size")
+    parser.add_argument('--intra-op-threads', type=int, help="TensorFlow intra-op thread pool size")
+    parser.add_argument('--inter-op-threads', type=int, help="TensorFlow inter-op thread pool size")
+    parser.add_argument('--jit-compile', action='store_true', help="Compile training steps with XLA")
+    parser.add_argument('--mixed-precision', action='store_true', help="Use bfloat16 mixed precision if the CPU supports it")
+    parser.add_argument('--steps-per-execution', type=int, default=1, help="Training steps per tf.function call")
+    parser.add_argument(
+        '--no-length-buckets', action='store_true',
+        help="Train fixed-length (50 token) text models instead of length-bucketed ones"
+    )
+    parser.add_argument(
+        '--text-architecture', default='lstm_attention', choices=sorted(TEXT_ARCHITECTURES),
+        help="Text classifier architecture"
+    )
+    parser.add_argument(
+        '--compare-architectures', action='store_true',
+        help="Train every text architecture and write a latency/accuracy table instead of training"
+    )
+    parser.add_argument(
+        '--distill', nargs='?', const='latest', default=None,
+        help="Distill a teacher version directory (default: latest) into a compact student version"
+    )
+    parser.add_argument(
+        '--benchmark-training', action='store_true',
+        help="Compare samples/sec across training configs instead of training"
+    )
+    parser.add_argument(
+        '--resume', nargs='?', const='latest', default=None,
+        help="Continue an interrupted run in its version directory (default: newest unpublished)"
+    )
+    parser.add_argument(
+        '--checkpoint-steps', type=int, default=DEFAULT_CHECKPOINT_STEPS,
+        help="Training steps between resumable checkpoints (0: only at epoch end)"
+    )
+    parser.add_argument('--keep-checkpoints', type=int, default=DEFAULT_KEEP_CHECKPOINTS,
+                        help="Resumable checkpoints kept per model")
+    args = parser.parse_args()
+    
+    training_config = TrainingConfig(
+        batch_size=args.batch_size,
+        scale_learning_rate=not args.no_lr_scaling,
+        intra_op_threads=args.intra_op_threads,
+        inter_op_threads=args.inter_op_threads,
+        jit_compile=args.jit_compile,
+        mixed_precision=args.mixed_precision,
+        steps_per_execution=args.steps_per_execution,
+        length_buckets=None if args.no_length_buckets else LENGTH_BUCKETS
+    )
+    
+    resume_dir = None
+    if args.resume == 'latest':
+        resume_dir = latest_unfinished_version_dir()
+        if resume_dir is None:
+            logger.error("No unfinished model version to resume")
+            return
+    elif args.resume:
+        resume_dir = Path(args.resume)
+        if (resume_dir / "manifest.json").exists():
+            logger.error(f"{resume_dir} is already published")
+            return
+    
     logger.info("Starting ISL model training pipeline...")
     
-    # Step 1: Prepare data
-    logger.info("Step 1: Preparing dataset...")
-    builder = ISLDatasetBuilder()
+    # Step 1: Prepare data; a resumed run must see the dataset it was started on
+    if resume_dir is None:
+        logger.info("Step 1: Preparing dataset...")
+        builder = ISLDatasetBuilder()
+        
+        # Create synthetic dataset
+        synthetic_stats = builder.create_synthetic_dataset()
+        augmented_count = builder.augment_dataset()
+        builder.build_phrase_index()
+        builder.build_spelling_index()
+        builder.build_sign_index()
+        validation = builder.validate_dataset()
+        
+        if validation['issues']:
+            logger.error(f"Dataset validation failed: {validation['issues']}")
+            return
+        
+        logger.info("Dataset preparation completed successfully!")
+    else:
+        logger.info(f"Step 1: Skipped, resuming {resume_dir} on the existing dataset")
     
-    # Create synthetic dataset
-    synthetic_stats = builder.create_synthetic_dataset()
-    augmented_count = builder.augment_dataset()
-    validation = builder.validate_dataset()
+    if args.benchmark_training:
+        benchmark_training_configs("ml-models/data/train")
+        return
     
-    if validation['issues']:
-        logger.error(f"Dataset validation failed: {validation['issues']}")
+    if args.distill:
+        from distillation import DistillationPipeline
+        teacher_dir = latest_model_version_dir() if args.distill == 'latest' else Path(args.distill)
+        if teacher_dir is None:
+            logger.error("No published model version to distill")
+            return
+        student_dir = Path("ml-models/models/versions") / f"{time.strftime('%Y%m%d-%H%M%S')}-distilled"
+        DistillationPipeline(teacher_dir, student_dir, training_config=training_config).run(
+            "ml-models/data/train", "ml-models/data/test"
+        )
         return
     
-    logger.info("Dataset preparation completed successfully!")
+    if args.compare_architectures:
+        comparison = ISLTrainingPipeline(
+            models_dir="ml-models/checkpoints/comparison", training_config=training_config
+        )
+        comparison.compare_text_architectures("ml-models/data/train", "ml-models/data/test")
+        return
     
     # Step 2: Train models
     logger.info("Step 2: Training models...")
-    pipeline = ISLTrainingPipeline()
+    # Only full runs checkpoint; comparison and benchmark runs are disposable
+    training_config.checkpoint_steps = args.checkpoint_steps
+    training_config.keep_checkpoints = args.keep_checkpoints
+    # Each run publishes into its own version directory for hot reload
+    model_version = resume_dir.name if resume_dir else time.strftime("%Y%m%d-%H%M%S")
+    models_dir = f"ml-models/models/versions/{model_version}"
+    logger.info(f"Writing model artifacts to {models_dir}")
+    # Text corpora are memory-mapped next to the checkpoints, removed on publish
+    pipeline = ISLTrainingPipeline(
+        models_dir=models_dir, training_config=training_config,
+        memmap_dir=os.path.join(models_dir, "checkpoints", "corpus")
+    )
+    progress = TrainingProgress(models_dir)
+    
+    warm_start_dir = None
+    if args.warm_start == 'latest':
+        warm_start_dir = latest_model_version_dir()
+        if warm_start_dir is None:
+            logger.warning("No published model version to warm-start from, training from scratch")
+    elif args.warm_start:
+        warm_start_dir = Path(args.warm_start)
     
     try:
         # Train text-to-ISL model
         logger.info("Training text-to-ISL model...")
-        text_history = pipeline.train_text_to_isl_model("ml-models/data", epochs=50)
+        text_trained = progress.run_stage('text_model', lambda: pipeline.train_text_to_isl_model(
+            "ml-models/data", epochs=50, warm_start_dir=warm_start_dir,
+            architecture=args.text_architecture
+        ))
+        
+        # Train text-to-ISL sequence model for multi-sign sentences
+        logger.info("Training text-to-ISL sequence model...")
+        try:
+            sequence_trained = progress.run_stage('text_sequence_model', lambda: pipeline.train_text_to_isl_sequence_model(
+                "ml-models/data/train", epochs=50
+            ))
+        except TrainingPreempted:
+            raise
+        except Exception as e:
+            logger.warning(f"Sequence model training skipped: {e}")
+            sequence_trained = False
         
         # Train speech-to-ISL model (if audio data available)
         logger.info("Training speech-to-ISL model...")
         try:
-            speech_history = pipeline.train_speech_to_isl_model("ml-models/data", epochs=50)
+            speech_trained = progress.run_stage('speech_model', lambda: pipeline.train_speech_to_isl_model(
+                "ml-models/data", epochs=50
+            ))
+        except TrainingPreempted:
+            raise
         except Exception as e:
             logger.warning(f"Speech model training skipped: {e}")
-            speech_history = None
+            speech_trained = False
+        
+        # Train landmark model for streaming recognition (if landmark data available)
+        logger.info("Training landmark-to-ISL model...")
+        try:
+            landmark_trained = progress.run_stage('landmark_model', lambda: pipeline.train_landmark_model(
+                "ml-models/data/train", epochs=50
+            ))
+        except TrainingPreempted:
+            raise
+        except Exception as e:
+            logger.warning(f"Landmark model training skipped: {e}")
+            landmark_trained = False
         
         # Step 3: Evaluate models
         logger.info("Step 3: Evaluating models...")
         try:
             results = pipeline.evaluate_models("ml-models/data/test")
-            logger.info(f"Evaluation results: {results}")
+            logger.info("Evaluation accuracy: " + ", ".join(
+                f"{name} {result['accuracy']}" for name, result in results['models'].items()
+            ))
         except Exception as e:
             logger.warning(f"Model evaluation skipped: {e}")
         
+        # Publish the version; the inference server only loads versions with a manifest
+        with open(os.path.join(models_dir, "vocabulary.json"), 'r', encoding='utf-8') as f:
+            trained_vocab_size = vocabulary_size(json.load(f))
+        manifest = {
+            'version': model_version,
+            'created_at': time.time(),
+            'text_model': text_trained,
+            'warm_start_from': str(warm_start_dir) if warm_start_dir else None,
+            'training_config': training_config.to_dict(),
+            'text_architecture': args.text_architecture,
+            # Words added to the vocabulary later map to <UNK> at inference
+            'vocab_size': trained_vocab_size,
+            'text_sequence_model': sequence_trained,
+            'speech_model': speech_trained,
+            'landmark_model': landmark_trained,
+            'resumed': resume_dir is not None
+        }
+        with open(os.path.join(models_dir, "manifest.json"), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(f"Published model version {model_version}")
+        
+        # Resumable state is only needed until the version is published
+        shutil.rmtree(os.path.join(models_dir, "checkpoints"), ignore_errors=True)
+        progress.path.unlink(missing_ok=True)
+        
         logger.info("Training pipeline completed successfully!")
         
+    except TrainingPreempted as e:
+        logger.error(f"{e}; continue with: python ml-models/train_models.py --resume {models_dir}")
+        sys.exit(1)
     except Exception as e:
         logger.error(f"Training failed: {e}")
         raise
@@ -0,0 +1,286 @@
+"""
+Resumable training for ISL models
+Checkpoints weights, optimizer state and the position in the batch stream every
+N steps and at every epoch end (asynchronously where TensorFlow supports it),
+prunes old checkpoints, and replays batches in a per-epoch seeded order so an
+interrupted run continues from the exact batch it stopped at
+"""
+
+import json
+import os
+import signal
+import threading
+from pathlib import Path
+import logging
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.callbacks import Callback, History
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_STEPS = 200
+DEFAULT_KEEP_CHECKPOINTS = 3
+
+class TrainingPreempted(Exception):
+    """Training stopped on SIGTERM after writing a checkpoint"""
+
+class ResumableBatches:
+    """Batch stream whose order depends only on (seed, epoch)
+
+    Without ``bucket_rows`` samples are reshuffled every epoch, as ``fit``
+    does. With ``bucket_rows`` ({width: row indices}) batches are fixed
+    per length bucket and cut to the bucket width, and only their order is
+    shuffled, matching ``make_bucketed_dataset``.
+    """
+
+    def __init__(self, X, y, batch_size, bucket_rows=None, seed=42):
+        self.X = X
+        self.y = np.asarray(y)
+        self.batch_size = batch_size
+        self.seed = seed
+        self.buckets = None
+        if bucket_rows is not None:
+            self.buckets = [
+                (width, rows[start:start + batch_size])
+                for width, rows in bucket_rows.items()
+                for start in range(0, len(rows), batch_size)
+            ]
+            self.num_batches = len(self.buckets)
+        else:
+            self.num_batches = -(-len(X) // batch_size)
+
+    def epoch_batches(self, epoch):
+        """(width, rows) of every batch of an epoch, in order"""
+        rng = np.random.default_rng([self.seed, epoch])
+        if self.buckets is not None:
+            return [self.buckets[i] for i in rng.permutation(self.num_batches)]
+        order = rng.permutation(len(self.X))
+        return [(None, order[start:start + self.batch_size]) for start in range(0, len(order), self.batch_size)]
+
+    def dataset(self, start_epoch, start_step=0):
+        """Endless tf.data stream starting at a given epoch and batch"""
+        def generate():
+            epoch, skip = start_epoch, start_step
+            while True:
+                for width, rows in self.epoch_batches(epoch)[skip:]:
+                    rows = np.sort(rows)  # ascending reads for memory-mapped inputs
+                    if width is None:
+                        yield self.X[rows], self.y[rows]
+                    else:
+                        labels = self.y[rows, :width] if self.y.ndim == 2 else self.y[rows]
+                        yield self.X[rows, :width].astype(np.int32), labels
+                epoch, skip = epoch + 1, 0
+
+        if self.buckets is not None:
+            input_spec = tf.TensorSpec(shape=(None, None), dtype=tf.int32)
+            label_shape = (None, None) if self.y.ndim == 2 else (None,)
+        else:
+            input_spec = tf.TensorSpec(shape=(None,) + tuple(self.X.shape[1:]), dtype=tf.as_dtype(self.X.dtype))
+            label_shape = (None,) + tuple(self.y.shape[1:])
+        return tf.data.Dataset.from_generator(
+            generate,
+            output_signature=(input_spec, tf.TensorSpec(shape=label_shape, dtype=tf.as_dtype(self.y.dtype)))
+        ).prefetch(tf.data.AUTOTUNE)
+
+class TrainingCheckpointer(Callback):
+    """Periodic, pruned checkpoints of model, optimizer and batch position
+
+    ``tracked`` callbacks (EarlyStopping, ModelCheckpoint) have their
+    ``best``/``wait``/``best_epoch`` counters saved too, and EarlyStopping's best
+    weights go to ``best_weights_<i>.npz`` beside the checkpoints, so patience,
+    best-so-far and the weights restored on stopping all survive a restart.
+    Must come after the tracked callbacks in the callback list. On SIGTERM the
+    next batch writes a checkpoint and raises TrainingPreempted; after the last
+    batch of an epoch that happens once the epoch-end work has run.
+    """
+
+    def __init__(self, checkpoint_dir, steps_per_epoch, every_steps=DEFAULT_CHECKPOINT_STEPS,
+                 keep=DEFAULT_KEEP_CHECKPOINTS, tracked=()):
+        super().__init__()
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.steps_per_epoch = steps_per_epoch
+        self.every_steps = every_steps
+        self.keep = keep
+        self.tracked = list(tracked)
+        self.epoch_variable = tf.Variable(0, dtype=tf.int64, trainable=False)
+        self.step_variable = tf.Variable(0, dtype=tf.int64, trainable=False)
+        self.tracked_variables = [
+            {name: tf.Variable(0.0, dtype=tf.float64, trainable=False) for name in ('best', 'wait', 'best_epoch')}
+            for _ in self.tracked
+        ]
+        # Best weights as last written to disk, per tracked callback
+        self.best_weights = [None] * len(self.tracked)
+        self.history_path = self.checkpoint_dir / "history.json"
+        self.epoch_logs = []
+        self.has_state = False
+        self.current_epoch = 0
+        self.step_offset = 0
+        self.last_saved = 0
+        self.preempted = threading.Event()
+        self.previous_handler = None
+        self.manager = None
+        try:
+            self.options = tf.train.CheckpointOptions(experimental_enable_async_checkpoint=True)
+        except TypeError:
+            self.options = tf.train.CheckpointOptions()
+
+    def attach(self, model):
+        """Create the checkpoint for a compiled model"""
+        self.set_model(model)
+        tracked = {
+            f"callback_{i}_{name}": variable
+            for i, variables in enumerate(self.tracked_variables) for name, variable in variables.items()
+        }
+        self.checkpoint = tf.train.Checkpoint(
+            model=model, optimizer=model.optimizer, epoch=self.epoch_variable, step=self.step_variable, **tracked
+        )
+        self.manager = tf.train.CheckpointManager(self.checkpoint, str(self.checkpoint_dir), max_to_keep=self.keep)
+        return self
+
+    def restore(self):
+        """Restore the newest checkpoint; returns (epoch, step) to continue from"""
+        latest = self.manager.latest_checkpoint
+        if latest is None:
+            return 0, 0
+        try:
+            # Create optimizer slots now so they are restored immediately
+            self.model.optimizer.build(self.model.trainable_variables)
+        except (AttributeError, TypeError, ValueError):
+            pass
+        self.checkpoint.restore(latest).expect_partial()
+        self.has_state = True
+        epoch, step = int(self.epoch_variable.numpy()), int(self.step_variable.numpy())
+
+        if self.history_path.exists():
+            with open(self.history_path, 'r') as f:
+                self.epoch_logs = json.load(f)[:epoch]
+        for i in range(len(self.tracked)):
+            path = self.best_weights_path(i)
+            if path.exists():
+                with np.load(path) as data:
+                    self.best_weights[i] = [data[f"arr_{k}"] for k in range(len(data.files))]
+        logger.info(f"Resuming from {latest} at epoch {epoch + 1}, batch {step}")
+        return epoch, step
+
+    def best_weights_path(self, index):
+        return self.checkpoint_dir / f"best_weights_{index}.npz"
+
+    def save_best_weights(self):
+        """Write best weights of tracked callbacks that changed since the last save"""
+        for i, callback in enumerate(self.tracked):
+            weights = getattr(callback, 'best_weights', None)
+            if weights is None or weights is self.best_weights[i]:
+                continue
+            tmp_path = self.checkpoint_dir / f"best_weights_{i}.tmp.npz"
+            np.savez(tmp_path, *weights)
+            os.replace(tmp_path, self.best_weights_path(i))
+            self.best_weights[i] = weights
+
+    def save(self, epoch, step):
+        self.epoch_variable.assign(epoch)
+        self.step_variable.assign(step)
+        for callback, variables in zip(self.tracked, self.tracked_variables):
+            variables['best'].assign(float(callback.best))
+            variables['wait'].assign(float(getattr(callback, 'wait', 0)))
+            variables['best_epoch'].assign(float(getattr(callback, 'best_epoch', 0)))
+        self.save_best_weights()
+        self.manager.save(checkpoint_number=epoch * self.steps_per_epoch + step, options=self.options)
+        self.has_state = True
+
+    def wait_for_writes(self):
+        sync = getattr(self.checkpoint, 'sync', None)
+        if sync is not None:
+            sync()
+
+    def on_train_begin(self, logs=None):
+        # Tracked callbacks reset themselves in their own on_train_begin
+        if self.has_state:
+            for callback, variables, weights in zip(self.tracked, self.tracked_variables, self.best_weights):
+                callback.best = float(variables['best'].numpy())
+                if hasattr(callback, 'wait'):
+                    callback.wait = int(variables['wait'].numpy())
+                if hasattr(callback, 'best_epoch'):
+                    callback.best_epoch = int(variables['best_epoch'].numpy())
+                if weights is not None and getattr(callback, 'restore_best_weights', False):
+                    callback.best_weights = weights
+        if threading.current_thread() is threading.main_thread():
+            self.previous_handler = signal.signal(signal.SIGTERM, lambda signum, frame: self.preempted.set())
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.current_epoch = epoch
+        self.last_saved = self.step_offset
+
+    def on_train_batch_end(self, batch, logs=None):
+        position = self.step_offset + batch + 1
+        # After the last batch the epoch is saved as finished in on_epoch_end instead
+        if self.preempted.is_set() and position < self.steps_per_epoch:
+            self.save(self.current_epoch, position)
+            self.stop(f"Preempted at epoch {self.current_epoch + 1}, batch {position}")
+        if self.every_steps and position - self.last_saved >= self.every_steps and position < self.steps_per_epoch:
+            self.save(self.current_epoch, position)
+            self.last_saved = position
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.epoch_logs.append({key: float(value) for key, value in (logs or {}).items()})
+        tmp_path = self.history_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.epoch_logs, f)
+        os.replace(tmp_path, self.history_path)
+        self.save(epoch + 1, 0)
+        if self.preempted.is_set():
+            self.stop(f"Preempted after epoch {epoch + 1}")
+
+    def on_train_end(self, logs=None):
+        self.wait_for_writes()
+        if self.previous_handler is not None:
+            signal.signal(signal.SIGTERM, self.previous_handler)
+            self.previous_handler = None
+
+    def stop(self, message):
+        """Finish pending writes, restore the signal handler and raise TrainingPreempted"""
+        self.on_train_end()
+        raise TrainingPreempted(message)
+
+    def full_history(self):
+        """Keras-style History covering the epochs before the restart too"""
+        history = History()
+        history.set_model(self.model)
+        history.epoch = list(range(len(self.epoch_logs)))
+        for logs in self.epoch_logs:
+            for key, value in logs.items():
+                history.history.setdefault(key, []).append(value)
+        return history
+
+def fit_resumable(model, batches, validation_data, epochs, callbacks, checkpointer, verbose=1):
+    """``model.fit`` that continues from the checkpointer's newest checkpoint
+
+    An epoch interrupted mid-way is finished first as a shortened epoch, then
+    the remaining epochs run normally.
+    """
+    checkpointer.attach(model)
+    epoch, step = checkpointer.restore()
+    if step >= batches.num_batches:
+        # Written by older versions on a preemption after an epoch's last batch
+        epoch, step = epoch + 1, 0
+    callbacks = list(callbacks) + [checkpointer]
+
+    if step and epoch < epochs:
+        checkpointer.step_offset = step
+        model.fit(
+            batches.dataset(epoch, step), steps_per_epoch=batches.num_batches - step,
+            validation_data=validation_data, initial_epoch=epoch, epochs=epoch + 1,
+            callbacks=callbacks, verbose=verbose
+        )
+        checkpointer.step_offset = 0
+        epoch += 1
+        if model.stop_training:
+            return checkpointer.full_history()
+
+    if epoch < epochs:
+        model.fit(
+            batches.dataset(epoch), steps_per_epoch=batches.num_batches,
+            validation_data=validation_data, initial_epoch=epoch, epochs=epochs,
+            callbacks=callbacks, verbose=verbose
+        )
+    return checkpointer.full_history()
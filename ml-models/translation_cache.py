@@ -0,0 +1,434 @@
+"""
+Two-level translation cache for the ISL inference server
+An in-process LRU sits in front of a pluggable shared backend (SQLite on
+shared memory for workers on one host, or any Redis-protocol server across
+nodes), with request coalescing so concurrent misses compute once
+"""
+
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 3600
+COMPRESS_MIN_BYTES = 256
+
+# ==== Serialization ==== #
+
+def encode_value(value):
+    """Compact JSON, zlib-compressed when large; the first byte flags the format"""
+    data = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return b'z' + zlib.compress(data, 6)
+    return b'j' + data
+
+def decode_value(blob):
+    if blob[:1] == b'z':
+        return json.loads(zlib.decompress(blob[1:]).decode('utf-8'))
+    return json.loads(blob[1:].decode('utf-8'))
+
+def cache_key(*parts):
+    """Short, fixed-length key for arbitrary request parts"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+# ==== Backends ==== #
+
+class MemoryCacheBackend:
+    """Thread-safe LRU with expiry, used as the in-process first level"""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        with self.lock:
+            self.entries[key] = (value, time.time() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def add(self, key, value, ttl=DEFAULT_TTL):
+        """Set only if absent; True if this call set it"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] >= time.time():
+                return False
+            self.entries[key] = (value, time.time() + ttl)
+            return True
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+class SQLiteCacheBackend:
+    """Shared cache for worker processes on one host
+
+    Defaults to a database on /dev/shm (memory-backed) when available. WAL mode
+    lets readers in every worker proceed while one writes.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else "ml-models/checkpoints"
+            path = os.path.join(base, "isl_translation_cache.sqlite")
+        self.path = path
+        self.local = threading.local()
+        connection = self.connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)"
+        )
+        connection.commit()
+
+    def connection(self):
+        """One connection per thread (sqlite3 connections are not thread-safe)"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self.connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires >= ?", (key, time.time())
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        self.connection().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl)
+        )
+
+    def add(self, key, value, ttl=DEFAULT_TTL):
+        connection = self.connection()
+        now = time.time()
+        connection.execute("DELETE FROM cache WHERE key = ? AND expires < ?", (key, now))
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO cache (key, value, expires) VALUES (?, ?, ?)", (key, value, now + ttl)
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        self.connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        self.connection().execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+
+def ttl_millis(ttl):
+    """TTL in whole milliseconds as a RESP argument (sub-second lease TTLs survive)"""
+    return str(max(1, int(ttl * 1000))).encode('ascii')
+
+class RedisCacheBackend:
+    """Minimal Redis-protocol (RESP) client: GET, SET EX [NX], DEL
+
+    Speaks the wire protocol directly, so it works against Redis, KeyDB,
+    Dragonfly or the in-process LocalRedisServer without a client library.
+    """
+
+    def __init__(self, host='localhost', port=6379, db=0, timeout=1.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout = timeout
+        self.local = threading.local()
+
+    @classmethod
+    def from_url(cls, url):
+        parsed = urlparse(url)
+        db = int(parsed.path.lstrip('/') or 0)
+        return cls(parsed.hostname or 'localhost', parsed.port or 6379, db)
+
+    def connect(self):
+        conn = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.local.socket = conn
+        self.local.reader = conn.makefile('rb')
+        if self.db:
+            self.command(b'SELECT', str(self.db).encode('ascii'))
+
+    def command(self, *args):
+        """Send one command and read its reply, reconnecting once on a broken socket"""
+        payload = b'*%d\r\n' % len(args) + b''.join(b'$%d\r\n%s\r\n' % (len(arg), arg) for arg in args)
+        for attempt in (0, 1):
+            try:
+                if getattr(self.local, 'socket', None) is None:
+                    self.connect()
+                self.local.socket.sendall(payload)
+                return self.read_reply()
+            except (OSError, ConnectionError):
+                self.local.socket = None
+                if attempt:
+                    raise
+
+    def read_reply(self):
+        line = self.local.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by cache server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest
+        if kind == b'-':
+            raise RuntimeError(rest.decode('utf-8', 'replace'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self.local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            return [self.read_reply() for _ in range(int(rest))]
+        raise RuntimeError(f"Unexpected reply from cache server: {line!r}")
+
+    def get(self, key):
+        return self.command(b'GET', key.encode('utf-8'))
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        self.command(b'SET', key.encode('utf-8'), value, b'PX', ttl_millis(ttl))
+
+    def add(self, key, value, ttl=DEFAULT_TTL):
+        reply = self.command(b'SET', key.encode('utf-8'), value, b'PX', ttl_millis(ttl), b'NX')
+        return reply == b'OK'
+
+    def delete(self, key):
+        self.command(b'DEL', key.encode('utf-8'))
+
+class LocalRedisServer(socketserver.ThreadingTCPServer):
+    """In-process stand-in speaking the RESP subset RedisCacheBackend uses
+
+    For development and tests without a live Redis; start() serves on a
+    background thread (port 0 picks a free port).
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), LocalRedisHandler)
+        self.store = MemoryCacheBackend(max_entries=1_000_000)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+class LocalRedisHandler(socketserver.StreamRequestHandler):
+    """Handle RESP commands for LocalRedisServer"""
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            name = args[0].upper()
+            if name == b'PING':
+                reply = b'+PONG\r\n'
+            elif name == b'SELECT':
+                reply = b'+OK\r\n'
+            elif name == b'GET':
+                value = store.get(args[1])
+                reply = b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+            elif name == b'SET':
+                options = [a.upper() for a in args[3:]]
+                ttl = DEFAULT_TTL
+                if b'EX' in options:
+                    ttl = int(options[options.index(b'EX') + 1])
+                elif b'PX' in options:
+                    ttl = int(options[options.index(b'PX') + 1]) / 1000.0
+                if b'NX' in options:
+                    reply = b'+OK\r\n' if store.add(args[1], args[2], ttl) else b'$-1\r\n'
+                else:
+                    store.set(args[1], args[2], ttl)
+                    reply = b'+OK\r\n'
+            elif name == b'DEL':
+                store.delete(args[1])
+                reply = b':1\r\n'
+            else:
+                reply = b'-ERR unknown command\r\n'
+            self.wfile.write(reply)
+
+def create_cache_backend(url):
+    """Backend for a cache URL: sqlite:///path, sqlite:// (shared memory) or redis://host:port/db"""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.scheme == 'sqlite':
+        return SQLiteCacheBackend(parsed.path or None)
+    if parsed.scheme == 'redis':
+        return RedisCacheBackend.from_url(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+# ==== Cache ==== #
+
+class TranslationCache:
+    """In-process LRU over an optional shared backend, with request coalescing
+
+    Concurrent misses for one key inside a process wait for a single
+    computation. Across processes, the first worker takes a short lease key in
+    the shared backend and the others poll for its result. Backend failures
+    are logged and treated as misses, so the cache never fails a request.
+    """
+
+    def __init__(self, backend=None, ttl=DEFAULT_TTL, l1_entries=2048, lease_seconds=5.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.lease_seconds = lease_seconds
+        self.l1 = MemoryCacheBackend(l1_entries)
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+        self.stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0, 'coalesced': 0, 'backend_errors': 0}
+
+    def backend_call(self, method, *args):
+        if self.backend is None:
+            return None
+        try:
+            return getattr(self.backend, method)(*args)
+        except Exception as e:
+            self.stats['backend_errors'] += 1
+            logger.warning(f"Translation cache backend {method} failed: {e}")
+            return None
+
+    def lookup(self, key):
+        """Value from L1 or L2 (promoting L2 hits into L1), else None"""
+        value = self.l1.get(key)
+        if value is not None:
+            self.stats['l1_hits'] += 1
+            return value
+        blob = self.backend_call('get', key)
+        if blob is not None:
+            self.stats['l2_hits'] += 1
+            value = decode_value(blob)
+            self.l1.set(key, value, self.ttl)
+            return value
+        return None
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, computing it at most once across concurrent callers"""
+        value = self.lookup(key)
+        if value is not None:
+            return value
+
+        with self.inflight_lock:
+            waiter = self.inflight.get(key)
+            if waiter is None:
+                waiter = self.inflight[key] = {'event': threading.Event(), 'value': None, 'error': None}
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            self.stats['coalesced'] += 1
+            waiter['event'].wait()
+            if waiter['error'] is not None:
+                raise waiter['error']
+            return waiter['value']
+
+        try:
+            value = self.compute_shared(key, compute)
+            waiter['value'] = value
+            return value
+        except Exception as e:
+            waiter['error'] = e
+            raise
+        finally:
+            waiter['event'].set()
+            with self.inflight_lock:
+                self.inflight.pop(key, None)
+
+    def compute_shared(self, key, compute):
+        """Compute under a cross-process lease, or wait for the worker holding it
+
+        A waiter takes over as soon as the lease is released without a result
+        (the holder's compute failed); the lease is always released by its
+        holder, whether or not compute succeeds.
+        """
+        lease_key = f"{key}:lease"
+        # add() returns None when the backend is unreachable: compute without waiting
+        leased = self.backend_call('add', lease_key, b'1', self.lease_seconds)
+        if leased is False:
+            deadline = time.monotonic() + self.lease_seconds
+            while time.monotonic() < deadline:
+                time.sleep(0.01)
+                value = self.lookup(key)
+                if value is not None:
+                    self.stats['coalesced'] += 1
+                    return value
+                leased = self.backend_call('add', lease_key, b'1', self.lease_seconds)
+                if leased is not False:
+                    # The result may have landed just before the lease was released
+                    value = self.lookup(key)
+                    if value is not None:
+                        if leased:
+                            self.backend_call('delete', lease_key)
+                        self.stats['coalesced'] += 1
+                        return value
+                    break
+
+        self.stats['misses'] += 1
+        try:
+            value = compute()
+            self.l1.set(key, value, self.ttl)
+            self.backend_call('set', key, encode_value(value), self.ttl)
+            return value
+        finally:
+            if leased:
+                self.backend_call('delete', lease_key)
+
+    def info(self):
+        lookups = self.stats['l1_hits'] + self.stats['l2_hits'] + self.stats['misses']
+        hits = self.stats['l1_hits'] + self.stats['l2_hits']
+        return dict(
+            self.stats,
+            backend=type(self.backend).__name__ if self.backend else None,
+            hit_rate=round(hits / lookups, 4) if lookups else None
+        )
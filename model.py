@@ -20,4 +20,14 @@ sign_2.save("this-is-an-apple.csv", overwrite=True)
 # ==== Hindi ==== #
 model.text_language = slt.TextLanguageCodes.HINDI
 sign_3 = model.translate("कैसे हैं आप?") # "how-are-you"
-sign_3.save_animation("how-are-you.gif", overwrite=True)
\ No newline at end of file
+sign_3.save_animation("how-are-you.gif", overwrite=True)
+
+# ==== Cached sign clips ==== #
+# Repeated signs are read from a local content-addressed library instead of
+# being re-extracted (see ml-models/sign_clip_library.py for batch generation)
+import sys
+sys.path.append("ml-models")
+from sign_clip_library import SignClipLibrary, CachedConcatenativeSynthesis
+
+cached_model = CachedConcatenativeSynthesis(model, SignClipLibrary())
+sign_4 = cached_model.translate("कैसे हैं आप?")